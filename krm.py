@@ -7,17 +7,42 @@ Gereksinimler:
     pip install pdfplumber reportlab PyMuPDF pytesseract Pillow rich
 
 Kullanım:
-    python krm.py                  # Dizindeki tüm PDF'leri analiz et
+    python krm.py                  # Alt klasörlerdeki tüm KRM PDF'lerini analiz et
     python krm.py rapor.pdf        # Sadece belirtilen PDF'i analiz et
+    python krm.py --portfolio      # Ayrıca tüm raporları tek portföy PDF'inde birleştir
+    python krm.py --batch          # Headless: JSON log/özet, Enter beklemesi yok
+    python krm.py --watch          # Yeni gelen PDF'leri sürekli izle ve işle
+    python krm.py --serve          # HTTP analiz servisi (POST /analyze)
+    python krm.py --rules kurallar.json   # Özel anomali kuralları/eşikleri
+    python krm.py --diff           # Aynı firmanın ardışık raporları arası değişimler
+    python krm.py --resume         # Yarıda kalan çalıştırmaya kaldığı yerden devam et
+    python krm.py --staged         # Önce KRM çıktıları, Findeks OCR sonra (düşük öncelik)
+    python krm.py --bench-parse    # Parse mikro-benchmark'ı
+    python krm.py --profile        # cProfile + collapsed stack (profiles/), en sıcak fonksiyonlar
+
+Python API:
+    from krm import analyze
+    report = analyze("Firma_A/KRM_2024.pdf")   # KrmReport (tipli sonuç)
 """
 
 import pdfplumber
 import sys
+import argparse
+import json
+import logging
+import time
 import re
+import ast
+import hashlib
+import math
+import string
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, NamedTuple, Optional, Tuple, Any
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from difflib import SequenceMatcher
+from functools import lru_cache
 
 # openpyxl imports (Excel export)
 from openpyxl import Workbook
@@ -47,6 +72,7 @@ HIGH_USAGE_THRESHOLD = 95.0
 CRITICAL_USAGE_THRESHOLD = 100.0
 CRITICAL_DELAY_DAYS = 30
 FINDEKS_MATCH_THRESHOLD = 2.5  # Fuzzy matching ile daha yüksek threshold
+FINDEKS_MIN_NAME_SIMILARITY = 0.3  # Bunun altındaki isim benzerliği eşleşme sayılmaz
 
 # Logo çekme kaynakları
 LOGO_SOURCES = [
@@ -57,6 +83,16 @@ LOGO_SOURCES = [
 
 console = Console()
 
+
+def report_console() -> Console:
+    """
+    Kullanıcının açıkça istediği tablolar (--bench-parse, --profile) için konsol.
+
+    Batch modunda ana konsol susturulur; bu tablolar kaybolmasın diye
+    stdout'taki JSON'a karışmadan stderr'e yazılır.
+    """
+    return Console(stderr=True) if console.quiet else console
+
 # ========================================
 # LOGO ÇEKME FONKSİYONLARI
 # ========================================
@@ -146,7 +182,7 @@ def check_and_download_logos() -> None:
     import time
 
     logos_dir = Path("logos")
-    excel_path = Path("2025-11-09_bankalar_listesi.xlsx")
+    excel_path = Path(BANK_LIST_EXCEL)
 
     # Excel dosyası yoksa çık
     if not excel_path.exists():
@@ -211,6 +247,394 @@ def check_and_download_logos() -> None:
     except Exception as e:
         console.print(f"[dim]Logo indirme hatası (devam ediliyor): {str(e)[:50]}[/dim]\n")
 
+# ========================================
+# KURUM KAYDI (KANONİK KURUM LİSTESİ)
+# ========================================
+
+BANK_LIST_EXCEL = "2025-11-09_bankalar_listesi.xlsx"
+INSTITUTION_REGISTRY_FILE = "kurum_kaydi.json"
+INSTITUTION_REGISTRY_VERSION = 2
+
+# OCR okumalarında görülen varyantlar → kurum adı (sıra önemli: ilk içerilen varyant kazanır)
+OCR_BANK_VARIANTS: List[Tuple[str, str]] = [
+    ('garanti bbva', 'Garanti BBVA'),
+    ('garanti', 'Garanti BBVA'),
+    ('ddestekbank', 'DenizBank'),
+    ('denizbank', 'DenizBank'),
+    ('destekbank', 'DenizBank'),
+    ('eprurolbank', 'ING Bank'),
+    ('ing', 'ING Bank'),
+    ('turkishbank', 'TurkishBank'),
+    ('vakifbank', 'Vakıfbank'),
+    ('vakif', 'Vakıfbank'),
+    ('anadolubank', 'Anadolubank'),
+    ('anadolu', 'Anadolubank'),
+    ('qnb', 'QNB Finansbank'),
+    ('yanikredi', 'Yapı Kredi'),
+    ('yapikredi', 'Yapı Kredi'),
+    ('yapi kredi', 'Yapı Kredi'),
+    ('ziraat', 'Ziraat Bankası'),
+    ('halkbank', 'Halkbank'),
+    ('halk', 'Halkbank'),
+    ('isbank', 'İş Bankası'),
+    ('is bankasi', 'İş Bankası'),
+    ('akbank', 'Akbank'),
+    ('akbanik', 'Akbank'),
+    ('teb', 'TEB'),
+    ('sekerbank', 'Şekerbank'),
+    ('seker', 'Şekerbank'),
+    ('finansbank', 'QNB Finansbank'),
+    ('odeabank', 'Odeabank'),
+    ('fibabanka', 'Fibabanka'),
+    ('faktifbank', 'Aktifbank'),
+    ('aktifbank', 'Aktifbank'),
+]
+
+
+class InstitutionRegistry:
+    """
+    Kanonik kurum kaydı: id, görünen ad, takma adlar, OCR varyantları, logo, domain.
+
+    Bankalar listesi Excel'inden bir kez derlenip kurum_kaydi.json'a yazılır;
+    sonraki çalıştırmalar ve worker süreçleri yalnızca JSON'u okur. Excel
+    yoksa OCR varyantlarından oluşan yerleşik kayıt kullanılır.
+
+    Aramalar sözlük üzerinden yapılır:
+        - key_id: normalize_bank_name() anahtarı → kurum id'si
+        - from_logo: logo dosya adı → kurum
+        - from_ocr: OCR metni → kurum (sonuç metin başına memo'lanır)
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], ocr_variants: List[Tuple[str, str]],
+                 source: Optional[Dict[str, Any]] = None) -> None:
+        self.entries: Dict[str, Dict[str, Any]] = {entry['id']: entry for entry in entries}
+        self.ocr_variants = [tuple(item) for item in ocr_variants]
+        self.source = source
+        self.by_key: Dict[str, str] = {}
+        self.by_logo: Dict[str, str] = {}
+        self.ocr_memo: Dict[str, Optional[str]] = {}
+
+        for entry in entries:
+            for alias in entry['aliases']:
+                key = normalize_bank_name(alias)
+                # Boş anahtar (örn. yalnızca "Bank") her kurumla çakışır
+                if key:
+                    self.by_key.setdefault(key, entry['id'])
+            for logo in entry['logos']:
+                self.by_logo[logo] = entry['id']
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def builtin(cls) -> 'InstitutionRegistry':
+        """Excel olmadan: yalnızca OCR varyantlarındaki kurumlar."""
+        entries: Dict[str, Dict[str, Any]] = {}
+        variants = []
+        for variant, name in OCR_BANK_VARIANTS:
+            entry_id = sanitize_logo_filename(name)
+            entry = entries.setdefault(entry_id, {
+                'id': entry_id, 'name': name, 'aliases': [name], 'ocr': [], 'logos': [], 'domain': None
+            })
+            entry['ocr'].append(variant)
+            variants.append((variant, entry_id))
+        return cls(list(entries.values()), variants)
+
+    @classmethod
+    def from_excel(cls, excel_path: Path) -> 'InstitutionRegistry':
+        """
+        Bankalar listesi Excel'inden kaydı derle.
+
+        Excel satırı yalnızca kesin eşleşmede mevcut bir kurumla birleşir:
+        domain'i daha önce görülmüş bir domain'e ya da domain'in ilk etiketi
+        (boşluksuz) bir OCR varyantına eşitse veya normalize adı mevcut bir
+        takma adın normalize haline eşitse. Kelime başı eşleşmesi yapılmaz;
+        Garanti Faktoring, Vakıf Katılım gibi iştirakler ana bankaya
+        katılmaz. Birleşmede görünen ad yerleşik ad olarak kalır.
+        Logo dosya adları check_and_download_logos ile aynı kuralla üretilir.
+        """
+        import openpyxl
+        from urllib.parse import urlparse
+
+        registry = cls.builtin()
+        entries = dict(registry.entries)
+        by_key = dict(registry.by_key)
+        by_domain: Dict[str, str] = {}
+        by_label = {variant.replace(' ', ''): variant_id for variant, variant_id in registry.ocr_variants}
+
+        wb = openpyxl.load_workbook(excel_path, read_only=True)
+        try:
+            for row in wb.active.iter_rows(min_row=2, values_only=True):
+                name = row[0] if row else None
+                # Boş satırlar ve (boşlukla başlayan) kategori başlıkları atlanır
+                if not isinstance(name, str) or not name.strip() or name.startswith(' '):
+                    continue
+                name = name.strip()
+                web = row[6] if len(row) > 6 and isinstance(row[6], str) else ''
+
+                domain = None
+                if web.strip() and web.strip() != 'http://':
+                    netloc = urlparse(web.strip()).netloc or urlparse('http://' + web.strip()).netloc
+                    domain = clean_logo_domain(netloc)
+
+                key = normalize_bank_name(name)
+                entry_id = None
+                if domain:
+                    entry_id = by_domain.get(domain) or by_label.get(domain.split('.')[0])
+                if entry_id is None and key:
+                    entry_id = by_key.get(key)
+
+                if entry_id is None:
+                    entry_id = sanitize_logo_filename(name)
+                    entry = entries.setdefault(entry_id, {
+                        'id': entry_id, 'name': name, 'aliases': [], 'ocr': [], 'logos': [], 'domain': None
+                    })
+                else:
+                    entry = entries[entry_id]
+
+                if name not in entry['aliases']:
+                    entry['aliases'].append(name)
+                logo = sanitize_logo_filename(name)
+                if logo not in entry['logos']:
+                    entry['logos'].append(logo)
+                entry['domain'] = entry['domain'] or domain
+                if domain:
+                    by_domain.setdefault(domain, entry_id)
+                if key:
+                    by_key.setdefault(key, entry_id)
+        finally:
+            wb.close()
+
+        stat = excel_path.stat()
+        source = {'file': excel_path.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        return cls(list(entries.values()), registry.ocr_variants, source)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': INSTITUTION_REGISTRY_VERSION,
+            'source': self.source,
+            'ocr_variants': [list(item) for item in self.ocr_variants],
+            'institutions': list(self.entries.values()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'InstitutionRegistry':
+        return cls(data['institutions'], data['ocr_variants'], data.get('source'))
+
+    def key_id(self, key: str) -> Optional[str]:
+        """normalize_bank_name() anahtarının kurum id'si."""
+        return self.by_key.get(key)
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Kurum adı veya takma adından kayıt."""
+        entry_id = self.by_key.get(normalize_bank_name(name))
+        return self.entries[entry_id] if entry_id else None
+
+    def from_logo(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Logo dosya adından kayıt (akbank_t_a_s.png → Akbank)."""
+        entry_id = self.by_logo.get(Path(filename).stem)
+        return self.entries[entry_id] if entry_id else None
+
+    def from_ocr(self, raw_name: str) -> Optional[Dict[str, Any]]:
+        """
+        OCR metninden kayıt: önce varyantlar (sırayla, içerme), sonra takma adlar.
+
+        Sonuç temizlenmiş metin başına memo'lanır; aynı okuma tekrar
+        taranmaz.
+        """
+        compact = _NON_LOWER_ALPHA_RE.sub('', raw_name.lower().strip())
+        if compact in self.ocr_memo:
+            entry_id = self.ocr_memo[compact]
+        else:
+            entry_id = next((variant_id for variant, variant_id in self.ocr_variants if variant in compact), None)
+            if entry_id is None:
+                entry_id = self.by_key.get(normalize_bank_name(raw_name))
+            self.ocr_memo[compact] = entry_id
+        return self.entries[entry_id] if entry_id else None
+
+
+_INSTITUTION_REGISTRY: Optional[InstitutionRegistry] = None
+
+
+def get_institution_registry() -> InstitutionRegistry:
+    """
+    Süreç içinde önbelleklenmiş kurum kaydı.
+
+    kurum_kaydi.json Excel'den (boyut + mtime ile) güncelse doğrudan
+    okunur; Excel değişmiş veya JSON yoksa yeniden derlenip yazılır.
+    Excel de JSON da yoksa yerleşik kayıt kullanılır.
+    """
+    global _INSTITUTION_REGISTRY
+    if _INSTITUTION_REGISTRY is not None:
+        return _INSTITUTION_REGISTRY
+
+    excel_path = Path(BANK_LIST_EXCEL)
+    registry_path = Path(INSTITUTION_REGISTRY_FILE)
+
+    source = None
+    if excel_path.exists():
+        stat = excel_path.stat()
+        source = {'file': excel_path.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    try:
+        data = json.loads(registry_path.read_text(encoding='utf-8'))
+        if data.get('version') == INSTITUTION_REGISTRY_VERSION and (source is None or data.get('source') == source):
+            _INSTITUTION_REGISTRY = InstitutionRegistry.from_dict(data)
+            return _INSTITUTION_REGISTRY
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    if source is None:
+        _INSTITUTION_REGISTRY = InstitutionRegistry.builtin()
+        return _INSTITUTION_REGISTRY
+
+    try:
+        registry = InstitutionRegistry.from_excel(excel_path)
+    except Exception as e:
+        console.print(f"[dim]Kurum kaydı derlenemedi (yerleşik liste kullanılıyor): {str(e)[:50]}[/dim]")
+        _INSTITUTION_REGISTRY = InstitutionRegistry.builtin()
+        return _INSTITUTION_REGISTRY
+
+    # Geçici dosyaya yazıp değiştir: paralel okuyucular yarım dosya görmesin
+    try:
+        tmp_path = registry_path.with_name(registry_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(registry.to_dict(), ensure_ascii=False, indent=1), encoding='utf-8')
+        tmp_path.replace(registry_path)
+        console.print(f"[dim]🏦 Kurum kaydı derlendi: {len(registry)} kurum → {registry_path.name}[/dim]")
+    except OSError as e:
+        console.print(f"[dim]Kurum kaydı yazılamadı (bellekte kullanılıyor): {e}[/dim]")
+
+    _INSTITUTION_REGISTRY = registry
+    return registry
+
+# ========================================
+# PDF GİRDİSİ (TEK OKUMA)
+# ========================================
+
+PDF_MAX_SIZE_MB = 100        # Tek bir PDF için okuma sınırı
+PDF_BUFFER_CACHE_MB = 256    # Bellekte tutulan PDF'lerin toplam sınırı
+
+
+class PdfBuffer(NamedTuple):
+    """Bir PDF dosyasının bellekteki kopyası ve kimliği."""
+    path: str
+    data: bytes
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+class PdfBufferCache:
+    """
+    PDF dosyalarını bir kez okuyup bellekte tutan LRU cache.
+
+    Sayfa kontrolü, Findeks indeks anahtarı (SHA-256), pdfplumber ve
+    PyMuPDF aynı bytes'ı kullanır; ağ paylaşımındaki bir PDF çalıştırma başına bir kez
+    okunur. Girdiler (boyut, mtime) ile doğrulanır, dosya değişmişse
+    yeniden okunur. Toplam boyut sınırı aşılınca en eski girdiler bırakılır.
+    """
+
+    def __init__(self, max_mb: float = PDF_BUFFER_CACHE_MB) -> None:
+        import threading
+        from collections import OrderedDict
+
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.entries: 'OrderedDict[str, PdfBuffer]' = OrderedDict()
+        self.total = 0
+        # watch modu thread'leri aynı cache'i paylaşır
+        self.lock = threading.Lock()
+
+    def get(self, path: Path, max_size_mb: float = PDF_MAX_SIZE_MB) -> PdfBuffer:
+        """
+        PDF'i cache'ten veya (tek read() ile) diskten döndür.
+
+        Raises:
+            OSError: Dosya okunamazsa
+            ValueError: Dosya max_size_mb sınırını aşıyorsa (okunmadan)
+        """
+        st = path.stat()
+        if st.st_size > max_size_mb * 1024 * 1024:
+            raise ValueError(f"Dosya çok büyük ({st.st_size / (1024 * 1024):.1f} MB > {max_size_mb} MB)")
+
+        key = str(path)
+        with self.lock:
+            buffer = self.entries.get(key)
+            if buffer is not None and buffer.size == st.st_size and buffer.mtime_ns == st.st_mtime_ns:
+                self.entries.move_to_end(key)
+                return buffer
+
+        # mmap yerine tek read(): SMB/NFS'te mmap sayfa hatası başına ağ turu yapar
+        with open(path, 'rb') as f:
+            data = f.read()
+        buffer = PdfBuffer(key, data, len(data), st.st_mtime_ns, hashlib.sha256(data).hexdigest())
+        self.put(buffer)
+        return buffer
+
+    def put(self, buffer: PdfBuffer) -> None:
+        """Girdiyi ekle (worker'a gönderilen kopyalar da buradan eklenir)."""
+        with self.lock:
+            old = self.entries.pop(buffer.path, None)
+            if old is not None:
+                self.total -= old.size
+            self.entries[buffer.path] = buffer
+            self.total += buffer.size
+            while self.total > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.total -= evicted.size
+
+    def drop(self, paths: Optional[List[Path]] = None) -> None:
+        """Verilen PDF'leri (None ise tümünü) bırak."""
+        with self.lock:
+            if paths is None:
+                self.entries.clear()
+                self.total = 0
+                return
+            for path in paths:
+                old = self.entries.pop(str(path), None)
+                if old is not None:
+                    self.total -= old.size
+
+
+_PDF_BUFFERS: Optional[PdfBufferCache] = None
+
+
+def get_pdf_buffers() -> PdfBufferCache:
+    global _PDF_BUFFERS
+    if _PDF_BUFFERS is None:
+        _PDF_BUFFERS = PdfBufferCache()
+    return _PDF_BUFFERS
+
+
+def read_pdf(path: Path, max_size_mb: float = PDF_MAX_SIZE_MB) -> PdfBuffer:
+    """PDF'in bellekteki kopyası (bkz. PdfBufferCache.get)."""
+    return get_pdf_buffers().get(path, max_size_mb)
+
+
+def open_pdfplumber(path: Path) -> Any:
+    """PDF'i bellekteki kopyasından pdfplumber ile aç."""
+    from io import BytesIO
+    return pdfplumber.open(BytesIO(read_pdf(path).data))
+
+
+def open_fitz(path: Path) -> Any:
+    """PDF'i bellekteki kopyasından PyMuPDF ile aç."""
+    import fitz
+    return fitz.open(stream=read_pdf(path).data, filetype='pdf')
+
+
+def adopt_pdf_buffers(*buffers: Optional[PdfBuffer]) -> None:
+    """Ebeveyn süreçte okunmuş PDF'leri bu sürecin cache'ine ekle (worker'lar için)."""
+    cache = get_pdf_buffers()
+    for buffer in buffers:
+        if buffer is not None:
+            cache.put(buffer)
+
+
+def drop_pdf_buffers(*paths: Optional[Path]) -> None:
+    """İşi biten PDF'leri bellekten bırak (argümansız: tümü)."""
+    if _PDF_BUFFERS is not None:
+        _PDF_BUFFERS.drop([p for p in paths if p is not None] if paths else None)
+
 # ========================================
 # GÜVENLİK FONKSİYONLARI
 # ========================================
@@ -232,7 +656,10 @@ def validate_pdf_file(file_path: Path, max_size_mb: int = 100) -> Tuple[bool, st
         - Boyut limiti aşılmış mı?
         - PDF uzantısı var mı?
         - PDF header'ı geçerli mi? (%PDF-)
-        - pdfplumber ile açılabiliyor mu?
+
+    Klasör taramasında çağrıldığı için yalnızca stat ve ilk 8 byte okunur;
+    sayfa sayısı analiz anında, PDF zaten belleğe okunmuşken
+    check_page_count() ile doğrulanır.
     """
     try:
         # 1. Dosya var mı?
@@ -269,24 +696,25 @@ def validate_pdf_file(file_path: Path, max_size_mb: int = 100) -> Tuple[bool, st
         except Exception as e:
             return False, f"Dosya okunamıyor: {e}"
 
-        # 8. pdfplumber ile açılabilirlik testi
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                if len(pdf.pages) == 0:
-                    return False, "PDF boş (sayfa yok)"
-
-                # Aşırı fazla sayfa kontrolü (DOS)
-                if len(pdf.pages) > 1000:
-                    return False, f"PDF çok fazla sayfa içeriyor ({len(pdf.pages)} > 1000)"
-        except Exception as e:
-            return False, f"PDF bozuk veya okunamıyor: {str(e)[:100]}"
-
         return True, "OK"
 
     except Exception as e:
         return False, f"Beklenmeyen hata: {str(e)[:100]}"
 
 
+def check_page_count(page_count: int, max_pages: int = 1000) -> None:
+    """
+    Açılmış PDF'in sayfa sayısını doğrula (boş PDF ve DOS koruması).
+
+    Raises:
+        ValueError: PDF'te sayfa yoksa veya max_pages aşılıyorsa
+    """
+    if page_count == 0:
+        raise ValueError("PDF boş (sayfa yok)")
+    if page_count > max_pages:
+        raise ValueError(f"PDF çok fazla sayfa içeriyor ({page_count} > {max_pages})")
+
+
 def is_safe_path(base_dir: Path, target_path: Path) -> bool:
     """
     Path traversal saldırılarına karşı koruma.
@@ -367,54 +795,114 @@ def safe_glob_pdfs(folder: Path, base_dir: Path) -> List[Path]:
         console.print(f"[red]Klasör tarama hatası: {e}[/red]")
         return []
 
-def register_fonts() -> bool:
+
+_FONTS_REGISTERED: Optional[bool] = None
+_FONT_BYTES: Optional[Dict[str, bytes]] = None
+
+
+def get_font_dir() -> Path:
+    """
+    fonts/ dizinini bul (PyInstaller uyumlu).
+
+    Returns:
+        Font dizininin Path'i
+    """
+    # PyInstaller uyumluluğu için font dizinini bul
+    if getattr(sys, 'frozen', False):
+        # EXE olarak çalışıyorsa
+        base_dir = Path(sys._MEIPASS)  # PyInstaller geçici dizini
+    else:
+        # Python script olarak çalışıyorsa
+        base_dir = Path(__file__).parent
+    return base_dir / "fonts"
+
+
+def load_font_bytes() -> Optional[Dict[str, bytes]]:
+    """
+    DejaVu Sans TTF dosyalarını bir kez okuyup bellekte tut.
+
+    Worker süreçlerine (spawn) initializer argümanı olarak verilebilir;
+    böylece her worker font dosyalarını diskten/ağ paylaşımından tekrar okumaz.
+
+    Returns:
+        {'DejaVuSans': bytes, 'DejaVuSans-Bold': bytes} veya font yoksa None
+    """
+    global _FONT_BYTES
+    if _FONT_BYTES is not None:
+        return _FONT_BYTES
+
+    font_dir = get_font_dir()
+    font_normal = font_dir / "DejaVuSans.ttf"
+    font_bold = font_dir / "DejaVuSans-Bold.ttf"
+
+    if not font_normal.exists():
+        return None
+
+    normal_bytes = font_normal.read_bytes()
+    # Bold yoksa normal fontı kullan
+    bold_bytes = font_bold.read_bytes() if font_bold.exists() else normal_bytes
+
+    _FONT_BYTES = {'DejaVuSans': normal_bytes, 'DejaVuSans-Bold': bold_bytes}
+    return _FONT_BYTES
+
+
+def register_fonts(font_bytes: Optional[Dict[str, bytes]] = None, quiet: bool = False) -> bool:
     """
     Türkçe karakter desteği için DejaVu Sans fontlarını kaydet.
 
-    Fontlar proje içinde fonts/ dizininde bulunur.
+    Fontlar proje içinde fonts/ dizininde bulunur. Kayıt süreç başına bir
+    kez yapılır; sonraki çağrılar önbellekteki sonucu döndürür. Fork ile
+    başlatılan worker'lar ebeveyn süreçte parse edilmiş font nesnelerini
+    devralır, spawn ile başlatılanlar font_bytes ile bellekten parse eder.
+
+    Not: ReportLab TTFont dinamik subsetting yapar; PDF'e tam TTF değil,
+    yalnızca dokümanda kullanılan glifler (Türkçe/Latin alt kümesi) gömülür.
+
+    Args:
+        font_bytes: load_font_bytes() çıktısı (opsiyonel, worker'lar için)
+        quiet: Konsola bilgi mesajı yazılmasın
 
     Returns:
         Font başarıyla yüklendiyse True, yoksa False
     """
+    from io import BytesIO
     from reportlab.pdfbase.pdfmetrics import registerFontFamily
 
-    try:
-        # PyInstaller uyumluluğu için font dizinini bul
-        if getattr(sys, 'frozen', False):
-            # EXE olarak çalışıyorsa
-            base_dir = Path(sys._MEIPASS)  # PyInstaller geçici dizini
-            console.print(f"[dim]🔤 Font aranıyor (EXE modu): {base_dir}[/dim]")
-        else:
-            # Python script olarak çalışıyorsa
-            base_dir = Path(__file__).parent
-            console.print(f"[dim]🔤 Font aranıyor (Script modu): {base_dir}[/dim]")
-
-        font_dir = base_dir / "fonts"
-        font_normal = font_dir / "DejaVuSans.ttf"
-        font_bold = font_dir / "DejaVuSans-Bold.ttf"
+    global _FONTS_REGISTERED
+    if _FONTS_REGISTERED is not None:
+        return _FONTS_REGISTERED
 
-        console.print(f"[cyan]📁 Font dizini:[/cyan] {font_dir}")
-
-        if not font_normal.exists():
-            console.print(f"[red]✗ Font bulunamadı: {font_normal}[/red]")
-            console.print(f"[yellow]  Lütfen DejaVu fontlarını fonts/ dizinine yerleştirin[/yellow]")
-            console.print(f"[dim]  Font dizinindeki dosyalar:[/dim]")
-            try:
-                for f in font_dir.iterdir():
-                    console.print(f"    → {f.name}")
-            except:
-                console.print(f"    [red]Dizin bulunamadı![/red]")
-            return False
+    # Fork ile başlatılan worker: fontlar ebeveyn süreçte zaten kaydedilmiş
+    if 'DejaVuSans' in pdfmetrics.getRegisteredFontNames():
+        _FONTS_REGISTERED = True
+        return True
 
-        # Normal font kaydı
-        pdfmetrics.registerFont(TTFont('DejaVuSans', str(font_normal)))
+    try:
+        if font_bytes is None:
+            font_dir = get_font_dir()
+            if not quiet:
+                mode = "EXE modu" if getattr(sys, 'frozen', False) else "Script modu"
+                console.print(f"[dim]🔤 Font aranıyor ({mode}): {font_dir.parent}[/dim]")
+                console.print(f"[cyan]📁 Font dizini:[/cyan] {font_dir}")
+
+            font_bytes = load_font_bytes()
+
+            if font_bytes is None:
+                font_normal = font_dir / "DejaVuSans.ttf"
+                console.print(f"[red]✗ Font bulunamadı: {font_normal}[/red]")
+                console.print(f"[yellow]  Lütfen DejaVu fontlarını fonts/ dizinine yerleştirin[/yellow]")
+                console.print(f"[dim]  Font dizinindeki dosyalar:[/dim]")
+                try:
+                    for f in font_dir.iterdir():
+                        console.print(f"    → {f.name}")
+                except:
+                    console.print(f"    [red]Dizin bulunamadı![/red]")
+                _FONTS_REGISTERED = False
+                return False
 
-        # Bold font kaydı
-        if font_bold.exists():
-            pdfmetrics.registerFont(TTFont('DejaVuSans-Bold', str(font_bold)))
-        else:
-            # Bold yoksa normal fontı kullan
-            pdfmetrics.registerFont(TTFont('DejaVuSans-Bold', str(font_normal)))
+        # Normal ve bold font kaydı (bellekteki TTF verisinden)
+        pdfmetrics.registerFont(TTFont('DejaVuSans', BytesIO(font_bytes['DejaVuSans'])))
+        pdfmetrics.registerFont(TTFont('DejaVuSans-Bold', BytesIO(font_bytes['DejaVuSans-Bold'])))
 
         # Font ailesini kaydet
         registerFontFamily(
@@ -425,13 +913,33 @@ def register_fonts() -> bool:
             boldItalic='DejaVuSans-Bold'
         )
 
-        console.print(f"[green]✓ Türkçe font yüklendi: DejaVu Sans[/green]")
+        if not quiet:
+            console.print(f"[green]✓ Türkçe font yüklendi: DejaVu Sans[/green]")
+
+        # Önceden Helvetica ile kurulmuş şablon varsa yeniden kurulsun
+        reset_report_template()
+        _FONTS_REGISTERED = True
         return True
 
     except Exception as e:
         console.print(f"[red]✗ Font yükleme hatası: {e}[/red]")
+        _FONTS_REGISTERED = False
         return False
 
+
+def init_render_worker(font_bytes: Optional[Dict[str, bytes]] = None) -> None:
+    """
+    Worker süreç başlatıcısı: fontları kaydet ve rapor şablonunu ısıt.
+
+    ProcessPoolExecutor/multiprocessing.Pool initializer'ı olarak kullanılır:
+        initializer=init_render_worker, initargs=(load_font_bytes(),)
+
+    Args:
+        font_bytes: Ebeveyn süreçte okunmuş font verisi
+    """
+    register_fonts(font_bytes, quiet=True)
+    get_report_template()
+
 def find_column_indices(header: List[Any], column_mapping: Dict[str, List[str]]) -> Dict[str, int]:
     """
     Dinamik kolon indeks bulucu.
@@ -461,6 +969,20 @@ def find_column_indices(header: List[Any], column_mapping: Dict[str, List[str]])
                 break
     return indices
 
+def get_base_dir() -> Path:
+    """
+    Çalışma ana dizinini döndür (EXE'nin veya krm.py'nin bulunduğu dizin).
+
+    Returns:
+        Ana dizinin Path objesi
+    """
+    # PyInstaller uyumluluğu: EXE'nin bulunduğu dizini bul
+    if getattr(sys, 'frozen', False):
+        # EXE olarak çalışıyorsa
+        return Path(sys.executable).parent
+    # Python script olarak çalışıyorsa
+    return Path(__file__).parent
+
 def ensure_output_dir(base_dir: Optional[Path] = None) -> Path:
     """
     Output dizinini oluştur.
@@ -472,18 +994,24 @@ def ensure_output_dir(base_dir: Optional[Path] = None) -> Path:
         Output dizininin Path objesi
     """
     if base_dir is None:
-        # PyInstaller uyumluluğu: EXE'nin bulunduğu dizini bul
-        if getattr(sys, 'frozen', False):
-            # EXE olarak çalışıyorsa
-            base_dir = Path(sys.executable).parent
-        else:
-            # Python script olarak çalışıyorsa
-            base_dir = Path(__file__).parent
+        base_dir = get_base_dir()
 
     output_dir = base_dir / "output"
     output_dir.mkdir(exist_ok=True)
     return output_dir
 
+def is_skipped_folder(folder: Path) -> bool:
+    """output, fonts, .git gibi rapor içermeyen sistem klasörleri mi?"""
+    return folder.name.startswith('.') or folder.name in ['output', 'fonts', '__pycache__', PROFILE_DIRNAME]
+
+def is_krm_pdf(pdf: Path) -> bool:
+    """Dosya adından KRM raporu mu?"""
+    return 'KRM' in pdf.name or 'krm' in pdf.name
+
+def is_findeks_pdf(pdf: Path) -> bool:
+    """Dosya adından Findeks raporu mu?"""
+    return 'Findeks' in pdf.name or 'findeks' in pdf.name or 'FİNDEKS' in pdf.name
+
 def find_folders_with_reports() -> Dict[Path, Dict[str, List[Path]]]:
     """
     Alt klasörlerdeki KRM ve Findeks PDF dosyalarını bul.
@@ -511,7 +1039,7 @@ def find_folders_with_reports() -> Dict[Path, Dict[str, List[Path]]]:
             continue
 
         # output, fonts, .git gibi sistem klasörlerini atla
-        if folder.name.startswith('.') or folder.name in ['output', 'fonts', '__pycache__']:
+        if is_skipped_folder(folder):
             continue
 
         # Bu klasördeki PDF'leri GÜVENLİ ŞEKİLDE bul
@@ -520,8 +1048,8 @@ def find_folders_with_reports() -> Dict[Path, Dict[str, List[Path]]]:
         if not all_pdfs:
             continue
 
-        krm_pdfs = [pdf for pdf in all_pdfs if 'KRM' in pdf.name or 'krm' in pdf.name]
-        findeks_pdfs = [pdf for pdf in all_pdfs if 'Findeks' in pdf.name or 'findeks' in pdf.name or 'FİNDEKS' in pdf.name]
+        krm_pdfs = [pdf for pdf in all_pdfs if is_krm_pdf(pdf)]
+        findeks_pdfs = [pdf for pdf in all_pdfs if is_findeks_pdf(pdf)]
 
         # En azından bir KRM varsa bu klasörü kaydet
         if krm_pdfs:
@@ -582,6 +1110,393 @@ def show_folder_tree(folders: Dict[Path, Dict[str, List[Path]]]) -> None:
     console.print(tree)
     console.print()
 
+# ========================================
+# PARSE DESENLERİ (ÖNCEDEN DERLENMİŞ)
+# ========================================
+
+_SORGU_TARIHI_RE = re.compile(r'Sorgu Tarihi\s+(\d{2}\.\d{2}\.\d{2})')
+_SOURCE_NUMBER_PREFIX_RE = re.compile(r'^\d+[\s\-\.]*')
+_NON_LOWER_ALPHA_RE = re.compile(r'[^a-z\s]')
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+_LEADING_NON_ALPHA_RE = re.compile(r'^[^a-zA-Z]+')
+_FINDEKS_TOPLAM_LINE_RE = re.compile(r'(.{5,40})\s+Toplam\s+[\d.,]+')
+_FINDEKS_DATE_RE = re.compile(r'\d{2}[./]\d{2}[./]\d{4}')
+_FINDEKS_REVIZE_DATE_RE = re.compile(r'(?:Genel\s+Revize|Son\s+Revize|Vade).*?(\d{2}[./]\d{2}[./]\d{4})')
+# Alan başına ayrı desen: literal önekli desenlerde re motoru hızlı önek
+# taraması yapar; tek bir alternation (Grup|Gayri|Nakdi|Toplam) bunu
+# kaybettiği için CPython'da ölçülen sürede daha yavaş kalıyor.
+_FINDEKS_GRUP_RE = re.compile(r'Grup\s+([\d.,]+)')
+_FINDEKS_NAKDI_RE = re.compile(r'Nakdi\s+([\d.,]+)')
+_FINDEKS_GAYRI_RE = re.compile(r'Gayri\s+Nakdi\s+([\d.,]+)')
+_FINDEKS_TOPLAM_RE = re.compile(r'Toplam\s+([\d.,]+)')
+_FINDEKS_RISK_MARKER = 'RISK (TL)'
+
+
+def find_findeks_bank_lines(text: str) -> List[str]:
+    """
+    `_FINDEKS_TOPLAM_LINE_RE.findall(text)` ile birebir aynı sonuç, ~3x hızlı.
+
+    Desenin başındaki `.{5,40}` her karakterde 40 adıma kadar geri izleme
+    yapar. Bunun yerine bir sonraki 'Toplam' literal'i str.find ile bulunur
+    ve arama, önündeki boşluklar + 40 karakterlik pencereden başlatılır:
+    o 'Toplam'a (veya sonrakine) ulaşan hiçbir eşleşme daha önce başlayamaz.
+    """
+    lines: List[str] = []
+    pos = 0
+    while True:
+        toplam = text.find('Toplam', pos + 5)
+        if toplam < 0:
+            break
+        ws_start = toplam
+        while ws_start > pos and text[ws_start - 1].isspace():
+            ws_start -= 1
+        match = _FINDEKS_TOPLAM_LINE_RE.search(text, max(pos, ws_start - 40))
+        if match is None:
+            break
+        lines.append(match.group(1))
+        pos = match.end()
+    return lines
+
+
+def scan_findeks_block(block: str) -> Dict[str, Any]:
+    """
+    Findeks banka bloğundaki limit/risk/revize alanlarını çıkar.
+
+    Desenler modül yüklenirken bir kez derlenir; sonuç eski satır içi
+    re.search/re.findall çağrılarıyla birebir aynıdır: limitler
+    bloktaki ilk eşleşme, riskler 'RISK (TL)' bölümündeki (yoksa bloktaki)
+    son eşleşme; revize tarihi önce bir revize anahtar kelimesinden sonraki
+    tarih, yoksa bloktaki ilk tarih.
+
+    Args:
+        block: Banka isminin çevresindeki OCR metni
+
+    Returns:
+        grup_limit, nakdi_limit, gayrinakdi_limit, toplam_limit, nakdi_risk,
+        gayrinakdi_risk, toplam_risk ve revize_tarihi alanlarını içeren dict
+    """
+    grup = _FINDEKS_GRUP_RE.search(block)
+    nakdi = _FINDEKS_NAKDI_RE.search(block)
+    gayri = _FINDEKS_GAYRI_RE.search(block)
+    toplam = _FINDEKS_TOPLAM_RE.search(block)
+
+    risk_start = block.find(_FINDEKS_RISK_MARKER)
+    risk_section = block[risk_start:] if risk_start >= 0 else block
+    nakdi_risks = _FINDEKS_NAKDI_RE.findall(risk_section)
+    gayri_risks = _FINDEKS_GAYRI_RE.findall(risk_section)
+    toplam_risks = _FINDEKS_TOPLAM_RE.findall(risk_section)
+
+    date_match = _FINDEKS_REVIZE_DATE_RE.search(block)
+    revize_raw = date_match.group(1) if date_match else None
+    if revize_raw is None:
+        date_match = _FINDEKS_DATE_RE.search(block)
+        revize_raw = date_match.group(0) if date_match else None
+
+    return {
+        'grup_limit': parse_number_ocr(grup.group(1)) if grup else 0.0,
+        'nakdi_limit': parse_number_ocr(nakdi.group(1)) if nakdi else 0.0,
+        'gayrinakdi_limit': parse_number_ocr(gayri.group(1)) if gayri else 0.0,
+        'toplam_limit': parse_number_ocr(toplam.group(1)) if toplam else 0.0,
+        'nakdi_risk': parse_number_ocr(nakdi_risks[-1]) if nakdi_risks else 0.0,
+        'gayrinakdi_risk': parse_number_ocr(gayri_risks[-1]) if gayri_risks else 0.0,
+        'toplam_risk': parse_number_ocr(toplam_risks[-1]) if toplam_risks else 0.0,
+        'revize_tarihi': parse_date(revize_raw) if revize_raw else None,
+    }
+
+
+# ----------------------------------------
+# Parse mikro-benchmark'ı (--bench-parse)
+# ----------------------------------------
+
+PARSE_BENCH_BLOCKS = 300
+PARSE_BENCH_REPEAT = 5
+
+_BENCH_BANKS = ['Akbank T.A.S.', 'Turkiye Garanti Bankasi', 'Yapi ve Kredi Bankasi', 'Turkiye Vakiflar Bankasi',
+                'QNB Bank', 'Denizbank', 'ING Bank', 'Turkiye Halk Bankasi', 'Sekerbank', 'Odeabank']
+
+
+def _legacy_scan_findeks_block(block: str) -> Dict[str, Any]:
+    """Eski (alan başına ayrı regex taramalı) Findeks blok parse'ı; benchmark referansı."""
+    grup_limit_match = re.search(r'Grup\s+([\d.,]+)', block)
+    nakdi_limit_match = re.search(r'Nakdi\s+([\d.,]+)', block)
+    gayri_limit_match = re.search(r'Gayri\s+Nakdi\s+([\d.,]+)', block)
+    toplam_limit_match = re.search(r'Toplam\s+([\d.,]+)', block)
+
+    risk_section = block[block.find('RISK (TL)'):] if 'RISK (TL)' in block else block
+    nakdi_risk_matches = re.findall(r'Nakdi\s+([\d.,]+)', risk_section)
+    gayri_risk_matches = re.findall(r'Gayri\s+Nakdi\s+([\d.,]+)', risk_section)
+    toplam_risk_matches = re.findall(r'Toplam\s+([\d.,]+)', risk_section)
+
+    revize_tarihi = None
+    for pattern in [r'(?:Genel\s+Revize|Son\s+Revize|Vade).*?(\d{2}[./]\d{2}[./]\d{4})', r'(\d{2}[./]\d{2}[./]\d{4})']:
+        date_match = re.search(pattern, block)
+        if date_match:
+            revize_tarihi = parse_date(date_match.group(1))
+            break
+
+    return {
+        'grup_limit': parse_number_ocr(grup_limit_match.group(1)) if grup_limit_match else 0.0,
+        'nakdi_limit': parse_number_ocr(nakdi_limit_match.group(1)) if nakdi_limit_match else 0.0,
+        'gayrinakdi_limit': parse_number_ocr(gayri_limit_match.group(1)) if gayri_limit_match else 0.0,
+        'toplam_limit': parse_number_ocr(toplam_limit_match.group(1)) if toplam_limit_match else 0.0,
+        'nakdi_risk': parse_number_ocr(nakdi_risk_matches[-1]) if nakdi_risk_matches else 0.0,
+        'gayrinakdi_risk': parse_number_ocr(gayri_risk_matches[-1]) if gayri_risk_matches else 0.0,
+        'toplam_risk': parse_number_ocr(toplam_risk_matches[-1]) if toplam_risk_matches else 0.0,
+        'revize_tarihi': revize_tarihi,
+    }
+
+
+def build_parse_bench_corpus(count: int = PARSE_BENCH_BLOCKS, seed: int = 7) -> List[str]:
+    """
+    Gerçekçi Findeks OCR blokları üret (sayfa başlığı, limit/risk tabloları,
+    revize satırları ve tipik OCR gürültüsü).
+    """
+    import random
+
+    rng = random.Random(seed)
+
+    def amount() -> str:
+        value = f"{rng.randint(0, 90_000_000):,}".replace(',', '.')
+        return value if rng.random() > 0.05 else value.replace('0', 'O', 1)
+
+    def date() -> str:
+        sep = rng.choice('./')
+        return f"{rng.randint(1, 28):02d}{sep}{rng.randint(1, 12):02d}{sep}{rng.randint(2019, 2026)}"
+
+    blocks = []
+    for _ in range(count):
+        bank = rng.choice(_BENCH_BANKS)
+        lines = [
+            "KKB Kredi Kayit Burosu - Findeks Risk Raporu",
+            f"Rapor Tarihi {date()}  Sayfa {rng.randint(3, 30)}",
+            f"{bank} Toplam {amount()}",
+            "LIMIT (TL)",
+            f"Grup {amount()}",
+            f"Nakdi {amount()}",
+            f"Gayri Nakdi {amount()}",
+            f"Toplam {amount()}",
+        ]
+        if rng.random() > 0.2:
+            lines.append(f"Genel Revize Vadesi : {date()}")
+        if rng.random() > 0.5:
+            lines.append(f"Son Revize Tarihi {date()}")
+        if rng.random() > 0.1:
+            lines.append("RISK (TL)")
+        for _ in range(rng.randint(1, 3)):
+            lines += [f"Nakdi {amount()}", f"Gayri Nakdi {amount()}", f"Toplam {amount()}"]
+        lines.append(f"Gecikme Gun Sayisi {rng.randint(0, 120)}  Kayit {rng.randint(1, 9)}")
+        text = '\n'.join(lines)
+        # Tipik OCR gürültüsü: fazladan boşluklar
+        if rng.random() > 0.7:
+            text = text.replace(' ', '  ', 2)
+        blocks.append(text[:1000])
+    return blocks
+
+
+def _time_per_call(func: Any, inputs: List[Any]) -> float:
+    """inputs üzerinde func'ın çağrı başına en iyi süresi (mikrosaniye)."""
+    best = float('inf')
+    for _ in range(PARSE_BENCH_REPEAT):
+        start = time.perf_counter()
+        for item in inputs:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs) * 1e6
+
+
+def parse_bench_cases() -> List[Tuple[str, Any, Any, List[Any]]]:
+    """(isim, eski_fonksiyon, yeni_fonksiyon, girdiler) benchmark durumları."""
+    blocks = build_parse_bench_corpus()
+    source_names = [f"{i % 40:02d}{' - ' if i % 3 else ' '}{_BENCH_BANKS[i % len(_BENCH_BANKS)]}" for i in range(len(blocks))]
+    pages = ['\n\n'.join(blocks[i:i + 4]) for i in range(0, len(blocks), 4)]
+
+    # KRM tablo sütunları: Türkçe biçimli tutarlar, tekrarlı revize tarihleri
+    import random
+    rng = random.Random(11)
+    def krm_amount() -> str:
+        if rng.random() < 0.15:
+            return rng.choice(['0', ''])
+        return f"{rng.randint(0, 90_000_000):,}".replace(',', '.') + f",{rng.randint(0, 99):02d}"
+
+    number_columns = [[[krm_amount()] for _ in range(40)] for _ in range(len(blocks) // 4)]
+    repeated_dates = [f"{d:02d}/{m:02d}/{y}" for d, m, y in [(15, 9, 25), (1, 3, 24), (30, 6, 2025), (12, 12, 23)]]
+    date_columns = [[[rng.choice(repeated_dates + [''])] for _ in range(40)] for _ in range(len(blocks) // 4)]
+
+    def legacy_number(value: Any) -> float:
+        if not value or value == '0':
+            return 0.0
+        try:
+            return float(str(value).replace('\n', '').replace('.', '').replace(',', '.'))
+        except:
+            return 0.0
+
+    def legacy_date(date_str: Any) -> Optional[datetime]:
+        if not date_str:
+            return None
+        try:
+            parts = str(date_str).strip().split('/')
+            if len(parts) == 3:
+                day, month, year = parts
+                if len(year) == 2:
+                    year = '20' + year if int(year) < 50 else '19' + year
+                return datetime(int(year), int(month), int(day))
+        except:
+            pass
+        return None
+
+    names = [''] * 40
+
+    # Findeks eşleştirme: BDDK/faktoring/leasing evreni büyüklüğünde kurum listesi
+    words = ['Türkiye', 'Anadolu', 'Ege', 'Marmara', 'Karadeniz', 'Akdeniz', 'Doğu', 'Batı', 'Merkez', 'Yıldız',
+             'Kuzey', 'Güney', 'Atlas', 'Vakıf', 'Halk', 'Ziraat', 'Kredi', 'Finans', 'Deniz', 'Kent']
+    kinds = ['Bankası A.Ş.', 'Faktoring A.Ş.', 'Finansal Kiralama A.Ş.', 'Katılım Bankası A.Ş.',
+             'Leasing A.Ş.', 'Finansman A.Ş.', 'Yatırım Bankası A.Ş.']
+    def bench_amount() -> float:
+        return float(rng.choice([0, rng.randint(1, 200) * 50_000]))
+    def bench_values() -> Dict[str, Any]:
+        return {'nakdi_limit': bench_amount(), 'gayrinakdi_limit': bench_amount(), 'toplam_limit': bench_amount(),
+                'nakdi_risk': bench_amount(), 'gayrinakdi_risk': bench_amount(), 'toplam_risk': 0,
+                'revize_tarihi': rng.choice([None, datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 400))])}
+    names_all = [f"{a} {b} {k}" for a in words for b in words if a != b for k in kinds]
+    universe = [dict(bench_values(), kurum=name, sayfa=i) for i, name in enumerate(rng.sample(names_all, 600))]
+    reports = [[(rng.choice(universe)['kurum'].replace('A.Ş.', '').upper(), bench_values()) for _ in range(15)]
+               for _ in range(8)]
+
+    def legacy_matching(report: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[Any, float]]:
+        found = []
+        for kaynak, krm_data in report:
+            best, best_score = None, float('inf')
+            for inst in universe:
+                score = calculate_match_score(krm_data, inst, kaynak)
+                if score < best_score:
+                    best, best_score = inst, score
+            found.append((best['sayfa'], best_score) if best_score <= FINDEKS_MATCH_THRESHOLD else (None, None))
+        return found
+
+    def indexed_matching(report: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[Any, float]]:
+        index = FindeksIndex(universe)
+        found = []
+        for kaynak, krm_data in report:
+            best, best_score = index.best_match(kaynak, krm_data)
+            found.append((best['sayfa'], best_score) if best_score <= FINDEKS_MATCH_THRESHOLD else (None, None))
+        return found
+
+    # Eşdeğerlik: bozulmuş/boş/takma isimler, tekrarlı ve isimsiz kurumlar, eşik sınırındaki değerler
+    eq_rng = random.Random(48)
+    eq_names = eq_rng.sample(names_all, 120) + [f"{bank} A.Ş." for bank in _BENCH_BANKS] + ['BANK A.Ş.', '']
+    eq_universe = []
+    for name in eq_names + eq_rng.sample(eq_names, 20):
+        eq_universe.append(dict(bench_values(), kurum=name, sayfa=len(eq_universe)))
+    def perturb(name: str) -> str:
+        choice = eq_rng.randrange(6)
+        if choice == 0 and len(name) > 4:
+            pos = eq_rng.randrange(len(name))
+            return name[:pos] + name[pos + 1:]
+        if choice == 1:
+            return f"{eq_rng.randint(1, 40):02d} - {name.upper()}"
+        if choice == 2:
+            return name.replace('A.Ş.', '').replace('Bankası', 'Bank')
+        if choice == 3:
+            return f"{name} {eq_rng.choice(words)}"
+        if choice == 4:
+            return eq_rng.choice(names_all)
+        return name
+    def near_values(inst: Dict[str, Any]) -> Dict[str, Any]:
+        values = {k: inst[k] for k in ('nakdi_limit', 'gayrinakdi_limit', 'toplam_limit',
+                                       'nakdi_risk', 'gayrinakdi_risk', 'toplam_risk', 'revize_tarihi')}
+        for key in ('nakdi_limit', 'gayrinakdi_limit', 'nakdi_risk'):
+            values[key] = values[key] * eq_rng.choice([1, 1, 0.95, 1.2, 2])
+        return values
+    eq_reports = []
+    for _ in range(12):
+        report = []
+        for _ in range(20):
+            inst = eq_rng.choice(eq_universe)
+            kaynak = '' if eq_rng.random() < 0.05 else perturb(inst['kurum'] or eq_rng.choice(eq_names))
+            report.append((kaynak, near_values(inst) if eq_rng.random() < 0.7 else bench_values()))
+        eq_reports.append(report)
+
+    def legacy_equivalence(report: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[Any, float]]:
+        found = []
+        for kaynak, krm_data in report:
+            best, best_score = None, float('inf')
+            for inst in eq_universe:
+                score = calculate_match_score(krm_data, inst, kaynak)
+                if score < best_score:
+                    best, best_score = inst, score
+            found.append((best['sayfa'], best_score) if best_score <= FINDEKS_MATCH_THRESHOLD else (None, None))
+        return found
+
+    def indexed_equivalence(report: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[Any, float]]:
+        index = FindeksIndex(eq_universe)
+        found = []
+        for kaynak, krm_data in report:
+            best, best_score = index.best_match(kaynak, krm_data)
+            found.append((best['sayfa'], best_score) if best_score <= FINDEKS_MATCH_THRESHOLD else (None, None))
+        return found
+
+    return [
+        ('Findeks blok alanları', _legacy_scan_findeks_block, scan_findeks_block, blocks),
+        ('KRM sayı sütunu (40 hücre)',
+         lambda rows: [legacy_number(row[0]) for row in rows],
+         lambda rows: convert_number_column(rows, 0, names, ''), number_columns),
+        ('KRM tarih sütunu (40 hücre)',
+         lambda rows: [legacy_date(row[0]) for row in rows],
+         lambda rows: convert_date_column(rows, 0, names, ''), date_columns),
+        ('OCR sayı', lambda text: float(re.sub(r'[^\d]', '', text) or 0), parse_number_ocr,
+         [f"{rng.randint(0, 90_000_000):,}".replace(',', '.') for _ in range(len(blocks))]),
+        ('Findeks banka satırları',
+         lambda text: re.findall(r'(.{5,40})\s+Toplam\s+[\d.,]+', text),
+         find_findeks_bank_lines, pages),
+        ('Kaynak adı temizleme',
+         lambda name: re.sub(r'^\d+[\s\-\.]*', '', name.strip()).strip(),
+         clean_source_name, source_names),
+        (f'Findeks eşleştirme ({len(universe)} kurum)', legacy_matching, indexed_matching, reports),
+        ('Findeks eşleştirme (rastgele eşdeğerlik)', legacy_equivalence, indexed_equivalence, eq_reports),
+    ]
+
+
+def run_parse_benchmark() -> int:
+    """
+    Parse mikro-benchmark'ını çalıştır ve sonuçları tablo olarak yazdır.
+
+    Her durumda önce eski ve yeni yolun aynı sonucu verdiği doğrulanır.
+
+    Returns:
+        EXIT_OK veya (sonuç farkı varsa) EXIT_FAILURES
+    """
+    table = Table(title="Parse Mikro-Benchmark", border_style="cyan", show_header=True)
+    table.add_column("Durum", style="cyan")
+    table.add_column("Girdi", justify="right")
+    table.add_column("Eski (µs/çağrı)", justify="right")
+    table.add_column("Yeni (µs/çağrı)", justify="right")
+    table.add_column("Hızlanma", justify="right", style="green")
+    table.add_column("Sonuç", justify="center")
+
+    all_equal = True
+    for name, legacy, fast, inputs in parse_bench_cases():
+        equal = all(legacy(item) == fast(item) for item in inputs)
+        all_equal = all_equal and equal
+        legacy_us = _time_per_call(legacy, inputs)
+        fast_us = _time_per_call(fast, inputs)
+        table.add_row(
+            name, str(len(inputs)), f"{legacy_us:.1f}", f"{fast_us:.1f}",
+            f"{legacy_us / fast_us:.2f}x" if fast_us else "-",
+            "[green]aynı[/green]" if equal else "[red]FARKLI[/red]"
+        )
+
+    report_console().print(table)
+    return EXIT_OK if all_equal else EXIT_FAILURES
+
+
+UNKNOWN_COMPANY = "Bilinmeyen Firma"
+
+
+def is_known_company(company_name: str) -> bool:
+    """Başlıktan firma adı okunabildi mi? (boş veya "Bilinmeyen Firma" değilse True)"""
+    return bool(company_name and company_name.strip()) and company_name != UNKNOWN_COMPANY
+
+
 def parse_header(pdf: pdfplumber.PDF) -> Tuple[str, str]:
     """
     PDF'den firma bilgilerini çıkar.
@@ -603,13 +1518,48 @@ def parse_header(pdf: pdfplumber.PDF) -> Tuple[str, str]:
                 company_name = lines[i + 1].strip()
                 break
 
-        import re
-        date_match = re.search(r'Sorgu Tarihi\s+(\d{2}\.\d{2}\.\d{2})', text)
+        date_match = _SORGU_TARIHI_RE.search(text)
         report_date = date_match.group(1) if date_match else "Bilinmiyor"
 
         return company_name, report_date
     except:
-        return "Bilinmeyen Firma", "Bilinmiyor"
+        return UNKNOWN_COMPANY, "Bilinmiyor"
+
+# ----------------------------------------
+# Sayı / tarih dönüşümü (sütun bazlı)
+# ----------------------------------------
+
+# Değer yok anlamına gelen hücreler (bozuk sayılmaz)
+_EMPTY_CELL_MARKERS = frozenset({'', '-', '--', '—'})
+PARSE_ISSUE_SAMPLES = 5
+
+
+class ParseIssues:
+    """
+    Parse edilemeyen hücrelerin sayacı.
+
+    Bu hücreler eskisi gibi 0.0 / None'a düşer, ancak artık sessizce değil:
+    sayılar rapor sonucunda 'parse_issues' olarak raporlanır.
+    """
+
+    __slots__ = ('numbers', 'dates', 'samples')
+
+    def __init__(self) -> None:
+        self.numbers = 0
+        self.dates = 0
+        self.samples: List[str] = []
+
+    def add(self, kind: str, where: str, raw: str) -> None:
+        if kind == 'number':
+            self.numbers += 1
+        else:
+            self.dates += 1
+        if len(self.samples) < PARSE_ISSUE_SAMPLES:
+            self.samples.append(f"{where}: {raw.strip()!r}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'numbers': self.numbers, 'dates': self.dates, 'samples': list(self.samples)}
+
 
 def clean_number(value: Any) -> float:
     """
@@ -624,25 +1574,78 @@ def clean_number(value: Any) -> float:
     if not value or value == '0':
         return 0.0
     try:
-        cleaned = str(value).replace('\n', '').replace('.', '').replace(',', '.')
-        return float(cleaned)
+        # Türkçe biçim: '1.234.567,89' -> '1234567.89' (satır sonu yalnızca varsa silinir)
+        text = str(value)
+        if '\n' in text:
+            text = text.replace('\n', '')
+        return float(text.replace('.', '').replace(',', '.'))
     except:
         return 0.0
 
-def parse_date(date_str: Any) -> Optional[datetime]:
+# clean_number()'ın replace zinciriyle aynı: satır sonu ve binlik noktası silinir, ondalık virgül noktaya döner
+_NUMBER_CELL_TABLE = str.maketrans({'\n': None, '.': None, ',': '.'})
+_NUMBER_CELL_SEP = '\x00'
+
+
+def convert_number_column(rows: List[List[Any]], idx: int, names: List[str], field_name: str,
+                          issues: Optional[ParseIssues] = None) -> List[Any]:
     """
-    Tarih string'ini parse et.
+    Tablonun bir sayı sütununu tek seferde float listesine çevir.
+
+    Hücre başına clean_number() ile aynı sonuç (sütun yoksa / satır kısaysa 0).
+    Hızlı yol: tüm hücreler metinse sütun tek string'e birleştirilip tek
+    translate() ile Türkçe biçimden çevrilir ve map(float) ile dönüştürülür.
+    Kısa satır, metin olmayan hücre veya sayıya çevrilemeyen bir hücre
+    varsa hücre bazlı yola düşülür (bozuk hücreler orada sayılır).
 
     Args:
-        date_str: Tarih string'i (dd/mm/yy veya dd/mm/yyyy formatında)
+        rows: Tablo satırları
+        idx: Sütun indeksi (-1: sütun bulunamadı)
+        names: Satırların kaynak isimleri (hata örnekleri için)
+        field_name: Alan adı (hata örnekleri için)
+        issues: Bozuk hücrelerin sayılacağı ParseIssues (opsiyonel)
 
     Returns:
-        datetime objesi veya None (parse edilemezse)
+        rows ile aynı uzunlukta değer listesi
     """
-    if not date_str or date_str == '':
-        return None
+    if idx < 0:
+        return [0] * len(rows)
+
     try:
-        parts = str(date_str).strip().split('/')
+        cells = [row[idx] or '0' for row in rows]
+        parts = _NUMBER_CELL_SEP.join(cells).translate(_NUMBER_CELL_TABLE).split(_NUMBER_CELL_SEP)
+        if len(parts) == len(cells):
+            return list(map(float, parts))
+    except (IndexError, TypeError, ValueError):
+        pass
+
+    values: List[Any] = []
+    append = values.append
+    for i, row in enumerate(rows):
+        if len(row) <= idx:
+            append(0)
+            continue
+        value = row[idx]
+        if not value or value == '0':
+            append(0.0)
+            continue
+        text = value if value.__class__ is str else str(value)
+        try:
+            if '\n' in text:
+                append(float(text.replace('\n', '').replace('.', '').replace(',', '.')))
+            else:
+                append(float(text.replace('.', '').replace(',', '.')))
+        except ValueError:
+            append(0.0)
+            if issues is not None and text.strip() not in _EMPTY_CELL_MARKERS:
+                issues.add('number', f"{names[i]}/{field_name}", text)
+    return values
+
+@lru_cache(maxsize=4096)
+def _parse_date_text(text: str) -> Optional[datetime]:
+    """parse_date()'in önbellekli çekirdeği (revize tarihleri raporlar arasında çok tekrarlanır)."""
+    try:
+        parts = text.strip().split('/')
         if len(parts) == 3:
             day, month, year = parts
             if len(year) == 2:
@@ -652,13 +1655,75 @@ def parse_date(date_str: Any) -> Optional[datetime]:
         pass
     return None
 
-def parse_tables(pdf: pdfplumber.PDF, cutoff_date: Optional[datetime] = None) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+def parse_date(date_str: Any) -> Optional[datetime]:
+    """
+    Tarih string'ini parse et.
+
+    Aynı string'ler önbellekten döner (datetime değiştirilemez, paylaşımı güvenli).
+
+    Args:
+        date_str: Tarih string'i (dd/mm/yy veya dd/mm/yyyy formatında)
+
+    Returns:
+        datetime objesi veya None (parse edilemezse)
+    """
+    if not date_str or date_str == '':
+        return None
+    return _parse_date_text(str(date_str))
+
+def convert_date_column(rows: List[List[Any]], idx: int, names: List[str], field_name: str,
+                        issues: Optional[ParseIssues] = None) -> List[Optional[datetime]]:
+    """
+    Tablonun bir tarih sütununu tek seferde çevir (hücre başına parse_date() ile aynı).
+
+    Boş olmayan ama tarih olarak okunamayan hücreler issues'a sayılır.
+    """
+    if idx < 0:
+        return [None] * len(rows)
+
+    values: List[Optional[datetime]] = []
+    append = values.append
+    for i, row in enumerate(rows):
+        value = row[idx] if len(row) > idx else None
+        if not value:
+            append(None)
+            continue
+        text = str(value)
+        parsed = _parse_date_text(text)
+        append(parsed)
+        if parsed is None and issues is not None and text.strip() not in _EMPTY_CELL_MARKERS:
+            issues.add('date', f"{names[i]}/{field_name}", text)
+    return values
+
+def source_rows(table_rows: List[List[Any]]) -> Tuple[List[List[Any]], List[str]]:
+    """Kaynak satırlarını ve temizlenmiş kaynak isimlerini ayır (boş/toplam satırları atlanır)."""
+    rows: List[List[Any]] = []
+    names: List[str] = []
+    for row in table_rows:
+        if not row or not row[0]:
+            continue
+
+        kaynak = clean_source_name(str(row[0]).strip())
+
+        # Boş veya toplam satırlarını atla
+        if not kaynak or kaynak.lower() in ['toplam', 'genel toplam', 'total']:
+            continue
+
+        rows.append(row)
+        names.append(kaynak)
+    return rows, names
+
+def parse_tables(pdf: pdfplumber.PDF, cutoff_date: Optional[datetime] = None,
+                 issues: Optional[ParseIssues] = None) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
     """
     Limit ve Risk tablolarını parse et.
 
+    Sayı ve tarih sütunları tablo başına tek seferde dönüştürülür.
+
     Args:
         pdf: pdfplumber PDF objesi
         cutoff_date: Pasif kaynak tespiti için cutoff tarihi (opsiyonel, default: 180 gün önce)
+        issues: Okunamayan hücrelerin sayılacağı ParseIssues (opsiyonel)
 
     Returns:
         (limits_dict, risks_dict) tuple'ı
@@ -706,41 +1771,37 @@ def parse_tables(pdf: pdfplumber.PDF, cutoff_date: Optional[datetime] = None) ->
                     revize_vade_idx = indices.get('revize_vade', -1)
                     son_revize_idx = indices.get('son_revize', -1)
 
-                    for row in table[2:]:
-                        if not row or not row[0]:
-                            continue
-
-                        kaynak_raw = str(row[0]).strip()
-                        kaynak = clean_source_name(kaynak_raw)
-
-                        # Boş veya toplam satırlarını atla
-                        if not kaynak or kaynak.lower() in ['toplam', 'genel toplam', 'total']:
-                            continue
-
-                        try:
-                            revize_vade = parse_date(row[revize_vade_idx]) if revize_vade_idx >= 0 and len(row) > revize_vade_idx else None
-                            son_revize = parse_date(row[son_revize_idx]) if son_revize_idx >= 0 and len(row) > son_revize_idx else None
-
-                            latest_revize = None
-                            if revize_vade and son_revize:
-                                latest_revize = max(revize_vade, son_revize)
-                            elif revize_vade:
-                                latest_revize = revize_vade
-                            elif son_revize:
-                                latest_revize = son_revize
-
-                            revize_gecmis = latest_revize and latest_revize < cutoff_date
-
-                            limits[kaynak] = {
-                                'grup': clean_number(row[grup_idx]) if grup_idx >= 0 and len(row) > grup_idx else 0,
-                                'nakdi': clean_number(row[nakdi_idx]) if nakdi_idx >= 0 and len(row) > nakdi_idx else 0,
-                                'gayrinakdi': clean_number(row[gayrinakdi_idx]) if gayrinakdi_idx >= 0 and len(row) > gayrinakdi_idx else 0,
-                                'toplam': clean_number(row[toplam_idx]) if toplam_idx >= 0 and len(row) > toplam_idx else 0,
-                                'revize_tarihi': latest_revize,
-                                'revize_gecmis': revize_gecmis
-                            }
-                        except Exception as e:
-                            continue
+                    rows, names = source_rows(table[2:])
+
+                    grup_col = convert_number_column(rows, grup_idx, names, 'grup', issues)
+                    nakdi_col = convert_number_column(rows, nakdi_idx, names, 'nakdi', issues)
+                    gayrinakdi_col = convert_number_column(rows, gayrinakdi_idx, names, 'gayrinakdi', issues)
+                    toplam_col = convert_number_column(rows, toplam_idx, names, 'toplam', issues)
+                    revize_vade_col = convert_date_column(rows, revize_vade_idx, names, 'revize_vade', issues)
+                    son_revize_col = convert_date_column(rows, son_revize_idx, names, 'son_revize', issues)
+
+                    for i, kaynak in enumerate(names):
+                        revize_vade = revize_vade_col[i]
+                        son_revize = son_revize_col[i]
+
+                        latest_revize = None
+                        if revize_vade and son_revize:
+                            latest_revize = max(revize_vade, son_revize)
+                        elif revize_vade:
+                            latest_revize = revize_vade
+                        elif son_revize:
+                            latest_revize = son_revize
+
+                        revize_gecmis = latest_revize and latest_revize < cutoff_date
+
+                        limits[kaynak] = {
+                            'grup': grup_col[i],
+                            'nakdi': nakdi_col[i],
+                            'gayrinakdi': gayrinakdi_col[i],
+                            'toplam': toplam_col[i],
+                            'revize_tarihi': latest_revize,
+                            'revize_gecmis': revize_gecmis
+                        }
 
                 # Risk tablosu
                 elif "RİSK BİLGİLERİ" in first_cell:
@@ -763,23 +1824,20 @@ def parse_tables(pdf: pdfplumber.PDF, cutoff_date: Optional[datetime] = None) ->
                     toplam_idx = indices.get('toplam', -1)
                     gecikme_idx = indices.get('gecikme', -1)
 
-                    for row in table[2:]:
-                        if not row or not row[0]:
-                            continue
-
-                        kaynak_raw = str(row[0]).strip()
-                        kaynak = clean_source_name(kaynak_raw)
+                    rows, names = source_rows(table[2:])
 
-                        # Boş veya toplam satırlarını atla
-                        if not kaynak or kaynak.lower() in ['toplam', 'genel toplam', 'total']:
-                            continue
+                    nakdi_col = convert_number_column(rows, nakdi_idx, names, 'nakdi_risk', issues)
+                    gayrinakdi_col = convert_number_column(rows, gayrinakdi_idx, names, 'gayrinakdi_risk', issues)
+                    toplam_col = convert_number_column(rows, toplam_idx, names, 'toplam_risk', issues)
+                    gecikme_col = convert_number_column(rows, gecikme_idx, names, 'gecikme', issues)
 
+                    for i, kaynak in enumerate(names):
                         try:
                             risks[kaynak] = {
-                                'nakdi': clean_number(row[nakdi_idx]) if nakdi_idx >= 0 and len(row) > nakdi_idx else 0,
-                                'gayrinakdi': clean_number(row[gayrinakdi_idx]) if gayrinakdi_idx >= 0 and len(row) > gayrinakdi_idx else 0,
-                                'toplam': clean_number(row[toplam_idx]) if toplam_idx >= 0 and len(row) > toplam_idx else 0,
-                                'gecikme': int(clean_number(row[gecikme_idx])) if gecikme_idx >= 0 and len(row) > gecikme_idx else 0,
+                                'nakdi': nakdi_col[i],
+                                'gayrinakdi': gayrinakdi_col[i],
+                                'toplam': toplam_col[i],
+                                'gecikme': int(gecikme_col[i]),
                             }
                         except Exception as e:
                             continue
@@ -792,51 +1850,14 @@ def parse_tables(pdf: pdfplumber.PDF, cutoff_date: Optional[datetime] = None) ->
 def clean_source_name(raw_name: str) -> str:
     """Kaynak ismini temizle (başındaki numaraları çıkar)"""
     # "01 Banka", "02- Banka", "03 - Faktöring" gibi desenleri temizle
-    cleaned = re.sub(r'^\d+[\s\-\.]*', '', raw_name.strip())
+    cleaned = _SOURCE_NUMBER_PREFIX_RE.sub('', raw_name.strip())
     return cleaned.strip()
 
 def clean_bank_name_ocr(raw_name: str) -> str:
-    """OCR hatalarını düzelt ve banka ismini temizle."""
-    bank_mapping = {
-        'garanti bbva': 'Garanti BBVA',
-        'garanti': 'Garanti BBVA',
-        'ddestekbank': 'DenizBank',
-        'denizbank': 'DenizBank',
-        'destekbank': 'DenizBank',
-        'eprurolbank': 'ING Bank',
-        'ing': 'ING Bank',
-        'turkishbank': 'TurkishBank',
-        'vakifbank': 'Vakıfbank',
-        'vakif': 'Vakıfbank',
-        'anadolubank': 'Anadolubank',
-        'anadolu': 'Anadolubank',
-        'qnb': 'QNB Finansbank',
-        'yanikredi': 'Yapı Kredi',
-        'yapikredi': 'Yapı Kredi',
-        'yapi kredi': 'Yapı Kredi',
-        'ziraat': 'Ziraat Bankası',
-        'halkbank': 'Halkbank',
-        'halk': 'Halkbank',
-        'isbank': 'İş Bankası',
-        'is bankasi': 'İş Bankası',
-        'akbank': 'Akbank',
-        'akbanik': 'Akbank',
-        'teb': 'TEB',
-        'sekerbank': 'Şekerbank',
-        'seker': 'Şekerbank',
-        'finansbank': 'QNB Finansbank',
-        'odeabank': 'Odeabank',
-        'fibabanka': 'Fibabanka',
-        'faktifbank': 'Aktifbank',
-        'aktifbank': 'Aktifbank',
-    }
-
-    name_clean = raw_name.lower().strip()
-    name_clean = re.sub(r'[^a-z\s]', '', name_clean)
-
-    for key, value in bank_mapping.items():
-        if key in name_clean:
-            return value
+    """OCR hatalarını düzelt ve banka ismini temizle (bkz. InstitutionRegistry.from_ocr)."""
+    entry = get_institution_registry().from_ocr(raw_name)
+    if entry is not None:
+        return entry['name']
 
     return raw_name.strip().title()
 
@@ -845,7 +1866,10 @@ def parse_number_ocr(text: str) -> float:
     if not text or text == '-':
         return 0.0
     try:
-        cleaned = re.sub(r'[^\d]', '', text)
+        # Hızlı yol: yalnızca binlik/ondalık ayırıcılar varsa regex gerekmez
+        cleaned = text.replace('.', '').replace(',', '')
+        if not cleaned.isdecimal():
+            cleaned = _NON_DIGIT_RE.sub('', text)
         return float(cleaned) if cleaned else 0.0
     except:
         return 0.0
@@ -853,7 +1877,10 @@ def parse_number_ocr(text: str) -> float:
 def logo_filename_to_bank_name(filename: str) -> str:
     """Logo dosya isminden banka ismini çıkar."""
     # akbank_t_a_s.png -> Akbank
-    # turkiye_is_bankasi_a_s.png -> Türkiye İş Bankası
+    # turkiye_is_bankasi_a_s.png -> İş Bankası (kayıttan) / Turkiye Is Bankasi (kayıt dışı)
+    entry = get_institution_registry().from_logo(filename)
+    if entry is not None:
+        return entry['name']
 
     name = Path(filename).stem  # .png'yi çıkar
 
@@ -875,77 +1902,331 @@ def logo_filename_to_bank_name(filename: str) -> str:
 
     return ' '.join(cleaned_parts)
 
-def compare_logos(findeks_logo_path: Path, logos_dir: Path) -> Optional[str]:
+_LOGO_INDEX_CACHE: Dict[str, Tuple[Tuple[Tuple[str, int], ...], List[Dict[str, Any]]]] = {}
+
+def load_logo_index(logos_dir: Path) -> List[Dict[str, Any]]:
     """
-    Findeks logosunu logos klasöründeki logolarla karşılaştır.
+    logos/ klasöründeki logoların hash'lerini hesapla ve süreç içinde önbellekle.
+
+    Önbellek dosya adı + mtime imzasıyla doğrulanır; logo eklenir/değişirse
+    yeniden hesaplanır. Watch/servis modlarında dosyalar arasında sıcak kalır.
 
     Args:
-        findeks_logo_path: Findeks'ten çıkarılan logo dosyası
         logos_dir: Logo veritabanı klasörü
 
     Returns:
-        En benzer bankanın ismi veya None
+        [{'file': dosya_adı, 'avg': hash, 'phash': hash, 'dhash': hash}, ...]
     """
-    try:
-        import imagehash
-        from PIL import Image
+    import imagehash
+    from PIL import Image
 
-        # Findeks logosunu yükle ve normalize et
-        findeks_img = Image.open(findeks_logo_path).convert('RGB')
+    logo_files = sorted(logos_dir.glob('*.png'))
+    signature = tuple((f.name, f.stat().st_mtime_ns) for f in logo_files)
 
-        # Logo çok küçükse atla
-        if findeks_img.size[0] < 20 or findeks_img.size[1] < 20:
-            return None
+    cache_key = str(logos_dir.resolve())
+    cached = _LOGO_INDEX_CACHE.get(cache_key)
+    if cached and cached[0] == signature:
+        return cached[1]
 
-        # Boyutlandır (daha iyi eşleşme için)
-        findeks_img = findeks_img.resize((128, 128), Image.Resampling.LANCZOS)
+    index = []
+    for logo_file in logo_files:
+        try:
+            logo_img = Image.open(logo_file).convert('RGB')
+            logo_img = logo_img.resize((128, 128), Image.Resampling.LANCZOS)
+
+            index.append({
+                'file': logo_file.name,
+                'avg': imagehash.average_hash(logo_img, hash_size=8),
+                'phash': imagehash.phash(logo_img, hash_size=8),
+                'dhash': imagehash.dhash(logo_img, hash_size=8),
+            })
+        except Exception:
+            continue
 
-        # Birden fazla hash algoritması kullan
-        findeks_avg = imagehash.average_hash(findeks_img, hash_size=8)
-        findeks_phash = imagehash.phash(findeks_img, hash_size=8)
-        findeks_dhash = imagehash.dhash(findeks_img, hash_size=8)
+    _LOGO_INDEX_CACHE[cache_key] = (signature, index)
+    return index
 
-        best_match = None
-        best_combined_distance = float('inf')
-        all_matches = []
+# ----------------------------------------
+# Paylaşımlı logo hash tablosu (shared memory)
+# ----------------------------------------
+
+LOGO_HASH_KINDS = ('avg', 'phash', 'dhash')
+LOGO_HASH_BYTES = 8  # 64 bitlik hash, paketlenmiş
+
+_LOGO_TABLE_CACHE: Dict[str, Tuple[List[Dict[str, Any]], 'LogoHashTable']] = {}
+_SHARED_LOGO_TABLE: Optional['LogoHashTable'] = None
+
+
+def pack_image_hashes(*hashes: Any) -> Any:
+    """ImageHash'leri (algoritma, 8 bayt) uint8 matrisine paketle."""
+    import numpy as np
+    return np.stack([np.packbits(np.asarray(h.hash, dtype=bool).ravel()) for h in hashes])
+
+
+class LogoHashTable:
+    """
+    Logo hash matrisi: (logo, algoritma, 8 bayt) uint8.
+
+    Üst süreç tabloyu bir kez shared_memory'e yayınlar (publish); worker'lar
+    attach() ile kopyalamadan bağlanır. Logo isimleri de aynı blokta durur
+    ve yalnızca gerektiğinde çözülür; worker başlangıç maliyeti ve RSS logo
+    sayısıyla büyümez.
+
+    Blok düzeni: [isim ofsetleri (n+1) x uint32][hash matrisi n x 3 x 8][isimler utf-8]
+    """
 
-        # Tüm logoları karşılaştır
-        for logo_file in logos_dir.glob('*.png'):
+    def __init__(self, logos_dir: str, names: Any, matrix: Any, shm: Any = None, owner_pid: Optional[int] = None) -> None:
+        self.logos_dir = logos_dir
+        self._names = names
+        self.matrix = matrix
+        self.shm = shm
+        self.owner_pid = owner_pid
+        self.handle: Optional[Tuple[str, str, int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def name(self, i: int) -> str:
+        """i. logonun dosya adı (paylaşımlı blokta ise yerinde çözülür)."""
+        if isinstance(self._names, list):
+            return self._names[i]
+        offsets, blob = self._names
+        return bytes(blob[offsets[i]:offsets[i + 1]]).decode('utf-8')
+
+    def distances(self, query: Any) -> Any:
+        """Sorgu hash'lerinin (3 x 8) tüm logolara Hamming mesafeleri: (logo, algoritma)."""
+        import numpy as np
+        return _popcount_table()[np.bitwise_xor(self.matrix, query)].sum(axis=2, dtype=np.int32)
+
+    @classmethod
+    def from_index(cls, logos_dir: Path, index: List[Dict[str, Any]]) -> 'LogoHashTable':
+        import numpy as np
+
+        if index:
+            matrix = np.stack([pack_image_hashes(*(logo[kind] for kind in LOGO_HASH_KINDS)) for logo in index])
+        else:
+            matrix = np.zeros((0, len(LOGO_HASH_KINDS), LOGO_HASH_BYTES), dtype=np.uint8)
+        return cls(str(logos_dir.resolve()), [logo['file'] for logo in index], matrix)
+
+    def publish(self) -> Tuple[str, str, int, int]:
+        """
+        Tabloyu shared_memory bloğuna kopyala.
+
+        Returns:
+            Worker'lara verilecek tutamaç: (blok_adı, logo_dizini, logo_sayısı, isim_bayt_sayısı)
+        """
+        import os
+        import numpy as np
+        from multiprocessing import shared_memory
+
+        count = len(self.matrix)
+        encoded = [self.name(i).encode('utf-8') for i in range(count)]
+        offsets = np.zeros(count + 1, dtype=np.uint32)
+        offsets[1:] = np.cumsum([len(e) for e in encoded])
+        names_blob = b''.join(encoded)
+
+        offsets_size = offsets.nbytes
+        matrix_size = self.matrix.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(1, offsets_size + matrix_size + len(names_blob)))
+        shm.buf[:offsets_size] = offsets.tobytes()
+        shm.buf[offsets_size:offsets_size + matrix_size] = self.matrix.tobytes()
+        shm.buf[offsets_size + matrix_size:offsets_size + matrix_size + len(names_blob)] = names_blob
+
+        self.shm = shm
+        self.owner_pid = os.getpid()
+        self.handle = (shm.name, self.logos_dir, count, len(names_blob))
+        return self.handle
+
+    @classmethod
+    def attach(cls, handle: Tuple[str, str, int, int]) -> 'LogoHashTable':
+        """Yayınlanmış bloğa kopyalamadan bağlan."""
+        import numpy as np
+        from multiprocessing import shared_memory
+
+        shm_name, logos_dir, count, names_size = handle
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name, track=False)
+        except TypeError:
+            # Python < 3.13: bağlanan süreç resource_tracker'a kaydolursa çıkışta
+            # bloğu silebilir; yaşam döngüsü yayınlayan üst sürece ait.
+            from multiprocessing import resource_tracker
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args, **kwargs: None
             try:
-                logo_img = Image.open(logo_file).convert('RGB')
-                logo_img = logo_img.resize((128, 128), Image.Resampling.LANCZOS)
-
-                logo_avg = imagehash.average_hash(logo_img, hash_size=8)
-                logo_phash = imagehash.phash(logo_img, hash_size=8)
-                logo_dhash = imagehash.dhash(logo_img, hash_size=8)
-
-                # 3 algoritmanın ortalamasını al
-                avg_distance = findeks_avg - logo_avg
-                phash_distance = findeks_phash - logo_phash
-                dhash_distance = findeks_dhash - logo_dhash
-
-                combined_distance = (avg_distance + phash_distance + dhash_distance) / 3.0
-
-                all_matches.append({
-                    'file': logo_file.name,
-                    'distance': combined_distance,
-                    'avg': avg_distance,
-                    'phash': phash_distance,
-                    'dhash': dhash_distance
-                })
+                shm = shared_memory.SharedMemory(name=shm_name)
+            finally:
+                resource_tracker.register = register
+
+        offsets_size = (count + 1) * 4
+        matrix_size = count * len(LOGO_HASH_KINDS) * LOGO_HASH_BYTES
+        offsets = np.ndarray((count + 1,), dtype=np.uint32, buffer=shm.buf[:offsets_size])
+        matrix = np.ndarray((count, len(LOGO_HASH_KINDS), LOGO_HASH_BYTES), dtype=np.uint8,
+                            buffer=shm.buf[offsets_size:offsets_size + matrix_size])
+        names_blob = shm.buf[offsets_size + matrix_size:offsets_size + matrix_size + names_size]
+        table = cls(logos_dir, (offsets, names_blob), matrix, shm)
+        table.handle = tuple(handle)
+        return table
+
+    def close(self) -> None:
+        """Bloğu bırak; yayınlayan süreçse bloğu siler."""
+        import os
 
-                if combined_distance < best_combined_distance:
-                    best_combined_distance = combined_distance
-                    best_match = logo_file.name
-            except Exception as e:
-                continue
+        if self.shm is None:
+            return
+        # numpy görünümleri bırakılmadan blok kapatılamaz
+        self.matrix = None
+        self._names = []
+        try:
+            self.shm.close()
+            if self.owner_pid == os.getpid():
+                self.shm.unlink()
+        except Exception:
+            pass
+        self.shm = None
+
+
+@lru_cache(maxsize=1)
+def _popcount_table() -> Any:
+    """0-255 arası baytların bit sayıları (Hamming mesafesi için)."""
+    import numpy as np
+    return np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def get_logo_table(logos_dir: Path) -> LogoHashTable:
+    """
+    logos_dir için logo hash tablosu: yayınlanmış/bağlanmış paylaşımlı
+    tablo varsa o, yoksa load_logo_index() üzerinden yerelde oluşturulan.
+    """
+    key = str(logos_dir.resolve())
+    if _SHARED_LOGO_TABLE is not None and _SHARED_LOGO_TABLE.logos_dir == key:
+        return _SHARED_LOGO_TABLE
+
+    index = load_logo_index(logos_dir)
+    cached = _LOGO_TABLE_CACHE.get(key)
+    if cached and cached[0] is index:
+        return cached[1]
+
+    table = LogoHashTable.from_index(logos_dir, index)
+    _LOGO_TABLE_CACHE[key] = (index, table)
+    return table
+
+
+def publish_logo_table(logos_dir: Path) -> Optional[Tuple[str, str, int, int]]:
+    """
+    Logo hash tablosunu bir kez hesaplayıp shared_memory'e yayınla.
+
+    Returns:
+        Worker başlatıcılarına verilecek tutamaç veya (logo yoksa / imagehash
+        ya da numpy kurulu değilse) None
+    """
+    global _SHARED_LOGO_TABLE
+
+    if _SHARED_LOGO_TABLE is not None and _SHARED_LOGO_TABLE.owner_pid is not None:
+        return get_logo_table_handle()
+    if not logos_dir.exists():
+        return None
+
+    try:
+        table = get_logo_table(logos_dir)
+        table.publish()
+    except (ImportError, OSError):
+        return None
+
+    _SHARED_LOGO_TABLE = table
+    return get_logo_table_handle()
+
+
+def get_logo_table_handle() -> Optional[Tuple[str, str, int, int]]:
+    """Bu sürecin yayınladığı tablonun tutamacı (yoksa None)."""
+    table = _SHARED_LOGO_TABLE
+    return table.handle if table is not None and table.owner_pid is not None else None
+
+
+def attach_logo_table(handle: Optional[Tuple[str, str, int, int]]) -> None:
+    """
+    Worker'da logo tablosunu hazırla: tutamaç varsa yayınlanmış bloğa
+    bağlan, yoksa (veya bağlanılamazsa) yerelde hesapla.
+    """
+    global _SHARED_LOGO_TABLE
+
+    if handle is not None:
+        if _SHARED_LOGO_TABLE is not None and _SHARED_LOGO_TABLE.handle == handle:
+            return  # fork ile üst süreçten miras
+        try:
+            _SHARED_LOGO_TABLE = LogoHashTable.attach(handle)
+            return
+        except (ImportError, OSError, ValueError):
+            pass
+
+    logos_dir = Path("logos")
+    if logos_dir.exists():
+        try:
+            get_logo_table(logos_dir)
+        except ImportError:
+            pass  # imagehash yok: logo eşleştirme zaten devre dışı
+
+
+def close_logo_table() -> None:
+    """Paylaşımlı logo tablosunu bırak (yayınlayan süreçte bloğu siler)."""
+    global _SHARED_LOGO_TABLE
+    if _SHARED_LOGO_TABLE is not None:
+        _SHARED_LOGO_TABLE.close()
+        _SHARED_LOGO_TABLE = None
+
+
+def compare_logos(findeks_logo: Any, logos_dir: Path) -> Optional[str]:
+    """
+    Findeks logosunu logos klasöründeki logolarla karşılaştır.
+
+    Args:
+        findeks_logo: Findeks'ten çıkarılan logo (dosya Path'i veya görsel bytes'ı)
+        logos_dir: Logo veritabanı klasörü
+
+    Returns:
+        En benzer bankanın ismi veya None
+    """
+    try:
+        import imagehash
+        from PIL import Image
+
+        # Findeks logosunu yükle ve normalize et
+        if isinstance(findeks_logo, (bytes, bytearray)):
+            import io
+            findeks_logo = io.BytesIO(findeks_logo)
+        findeks_img = Image.open(findeks_logo).convert('RGB')
+
+        # Logo çok küçükse atla
+        if findeks_img.size[0] < 20 or findeks_img.size[1] < 20:
+            return None
+
+        # Boyutlandır (daha iyi eşleşme için)
+        findeks_img = findeks_img.resize((128, 128), Image.Resampling.LANCZOS)
+
+        import numpy as np
+
+        # Birden fazla hash algoritması kullan
+        query = pack_image_hashes(
+            imagehash.average_hash(findeks_img, hash_size=8),
+            imagehash.phash(findeks_img, hash_size=8),
+            imagehash.dhash(findeks_img, hash_size=8),
+        )
+
+        # Tüm logolarla tek vektörel karşılaştırma (tablo paylaşımlı bellekte olabilir)
+        table = get_logo_table(logos_dir)
+        per_hash = table.distances(query)
+        # 3 algoritmanın ortalamasını al
+        combined = per_hash.sum(axis=1) / 3.0
+        order = np.argsort(combined, kind='stable')
+
+        best_match = table.name(int(order[0])) if len(order) else None
+        best_combined_distance = float(combined[order[0]]) if len(order) else float('inf')
 
         # Debug: En iyi 5 eşleşmeyi göster
-        all_matches.sort(key=lambda x: x['distance'])
         console.print(f"[dim]  Logo eşleştirme sonuçları (en iyi 5):[/dim]")
-        for i, match in enumerate(all_matches[:5], 1):
-            bank = logo_filename_to_bank_name(match['file'])
-            console.print(f"[dim]    {i}. {bank}: {match['distance']:.1f} (avg:{match['avg']}, p:{match['phash']}, d:{match['dhash']})[/dim]")
+        for rank, i in enumerate(order[:5], 1):
+            bank = logo_filename_to_bank_name(table.name(int(i)))
+            avg_distance, phash_distance, dhash_distance = per_hash[i]
+            console.print(f"[dim]    {rank}. {bank}: {combined[i]:.1f} (avg:{avg_distance}, p:{phash_distance}, d:{dhash_distance})[/dim]")
 
         # Threshold: 20'den küçük = iyi eşleşme (daha esnek)
         if best_match and best_combined_distance < 20:
@@ -965,6 +2246,298 @@ def compare_logos(findeks_logo_path: Path, logos_dir: Path) -> Optional[str]:
         console.print(f"[yellow]⚠ Logo eşleştirme hatası: {e}[/yellow]")
         return None
 
+_TESSERACT_AVAILABLE: Optional[bool] = None
+
+def setup_tesseract() -> bool:
+    """
+    Tesseract yolunu ayarla ve kullanılabilirliğini kontrol et (süreç başına bir kez).
+
+    EXE içinde paketlenmiş tesseract.exe/tessdata varsa onları kullanır.
+    Sonuç önbelleklenir; her Findeks dosyası için `tesseract --version`
+    alt süreci tekrar başlatılmaz.
+
+    Returns:
+        Tesseract kullanılabiliyorsa True
+    """
+    import shutil
+    import os
+
+    global _TESSERACT_AVAILABLE
+    if _TESSERACT_AVAILABLE is not None:
+        return _TESSERACT_AVAILABLE
+
+    # PyInstaller ile paketlenmiş EXE ise Tesseract path'ini ayarla
+    bundled_cmd = None
+    if getattr(sys, 'frozen', False):
+        # EXE içindeyiz
+        base_path = sys._MEIPASS
+        tesseract_cmd = os.path.join(base_path, 'tesseract.exe')
+        if os.path.exists(tesseract_cmd):
+            bundled_cmd = tesseract_cmd
+            # Tessdata path'ini de ayarla (tesserocr da bunu kullanır)
+            os.environ['TESSDATA_PREFIX'] = os.path.join(base_path, 'tessdata')
+
+    try:
+        import pytesseract
+    except ImportError:
+        _TESSERACT_AVAILABLE = False
+        return False
+
+    if bundled_cmd:
+        pytesseract.pytesseract.tesseract_cmd = bundled_cmd
+
+    try:
+        pytesseract.get_tesseract_version()
+        _TESSERACT_AVAILABLE = True
+    except:
+        _TESSERACT_AVAILABLE = shutil.which('tesseract') is not None
+
+    return _TESSERACT_AVAILABLE
+
+# ----------------------------------------
+# OCR motoru (kalıcı tesserocr / pytesseract yedeği)
+# ----------------------------------------
+
+OCR_BACKENDS = ('auto', 'tesserocr', 'pytesseract')
+OCR_LANG = 'eng'
+
+# Uyarlanabilir çözünürlük: önce düşük zoom + ikili (siyah/beyaz) görsel;
+# sayısal alanlar düşük güvenle okunursa veya regex'e uymazsa yüksek
+# zoom'da gri tonlamalı olarak yeniden render edilir.
+OCR_ZOOM_LADDER = (1.75, 2.5)
+OCR_MIN_NUMERIC_CONF = 75.0
+OCR_BINARIZE_THRESHOLD = 170
+_OCR_BINARIZE_LUT = [255 if i > OCR_BINARIZE_THRESHOLD else 0 for i in range(256)]
+_OCR_NUMBER_TOKEN = re.compile(r'^[\d.,/%()+-]+$')
+_OCR_DIGIT_LOOKALIKES = re.compile(r'^[\dOoIlSB.,/%()+-]+$')
+_OCR_VALUE_LABELS = (
+    ('Toplam', re.compile(r'Toplam\s+[\d.,]+')),
+    ('Nakdi', re.compile(r'Nakdi\s+[\d.,]+')),
+)
+
+
+class OcrPage(NamedTuple):
+    """Bir sayfanın OCR sonucu: düz metin ve (kelime, güven) listesi."""
+    text: str
+    words: List[Tuple[str, float]]
+
+_OCR_BACKEND_PREFERENCE = 'auto'
+_OCR_BACKEND: Optional['OcrBackend'] = None
+_TESSEROCR_ERROR: Optional[str] = None
+
+
+class OcrBackend(ABC):
+    """
+    OCR motoru arayüzü.
+
+    Görseller bellekte (PIL.Image) verilir; motor süreç başına bir kez
+    oluşturulur ve tüm sayfalarda yeniden kullanılır.
+    """
+
+    name = 'base'
+
+    @abstractmethod
+    def recognize(self, img: Any) -> OcrPage:
+        """Görseli OCR'la; metni ve kelime güvenlerini (0-100) döndür."""
+
+    def close(self) -> None:
+        pass
+
+
+class PytesseractBackend(OcrBackend):
+    """Varsayılan yedek: her sayfa için `tesseract` alt süreci başlatır."""
+
+    name = 'pytesseract'
+
+    def __init__(self, lang: str = OCR_LANG) -> None:
+        import pytesseract
+        self._pytesseract = pytesseract
+        self.lang = lang
+
+    def recognize(self, img: Any) -> OcrPage:
+        """
+        image_to_data ile tek çağrıda metin + güven al.
+
+        Metin, image_to_string çıktısıyla aynı düzende (satırlar, paragraflar
+        arasında boş satır) kelimelerden yeniden kurulur.
+        """
+        data = self._pytesseract.image_to_data(img, lang=self.lang, output_type=self._pytesseract.Output.DICT)
+
+        lines: List[str] = []
+        words: List[Tuple[str, float]] = []
+        current: List[str] = []
+        prev_key = None
+        for i, word in enumerate(data['text']):
+            conf = float(data['conf'][i])
+            if conf < 0 or not word.strip():
+                continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            if key != prev_key:
+                if current:
+                    lines.append(' '.join(current))
+                if prev_key is not None and key[:2] != prev_key[:2]:
+                    lines.append('')
+                current = []
+                prev_key = key
+            current.append(word)
+            words.append((word, conf))
+        if current:
+            lines.append(' '.join(current))
+
+        return OcrPage('\n'.join(lines), words)
+
+
+class TesserocrBackend(OcrBackend):
+    """
+    Kalıcı Tesseract motoru (tesserocr / C API).
+
+    Dil modeli bir kez yüklenir; sayfalar alt süreç ve geçici dosya
+    olmadan doğrudan bellekten OCR'lanır.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self, lang: str = OCR_LANG) -> None:
+        import os
+        import threading
+        import tesserocr
+
+        kwargs: Dict[str, Any] = {'lang': lang}
+        tessdata = os.environ.get('TESSDATA_PREFIX')
+        if tessdata:
+            kwargs['path'] = tessdata
+        self.api = tesserocr.PyTessBaseAPI(**kwargs)
+        # PyTessBaseAPI thread-safe değil (watch modu thread'leri için)
+        self.lock = threading.Lock()
+
+    def recognize(self, img: Any) -> OcrPage:
+        with self.lock:
+            self.api.SetImage(img)
+            text = self.api.GetUTF8Text()
+            words = [(word, float(conf)) for word, conf in self.api.MapWordConfidences()]
+        return OcrPage(text, words)
+
+    def close(self) -> None:
+        self.api.End()
+
+
+def configure_ocr_backend(preference: str = 'auto') -> None:
+    """
+    OCR motoru tercihini ayarla (auto: tesserocr varsa o, yoksa pytesseract).
+
+    Tercih değişirse mevcut motor kapatılır; sonraki get_ocr_backend()
+    çağrısında yenisi oluşturulur.
+    """
+    global _OCR_BACKEND_PREFERENCE
+    if preference != _OCR_BACKEND_PREFERENCE:
+        close_ocr_backend()
+    _OCR_BACKEND_PREFERENCE = preference
+
+
+def get_ocr_backend() -> Optional[OcrBackend]:
+    """
+    Süreç içinde önbelleklenmiş OCR motorunu döndür.
+
+    Returns:
+        OcrBackend veya hiçbir motor kullanılamıyorsa None
+    """
+    global _OCR_BACKEND, _TESSEROCR_ERROR
+    if _OCR_BACKEND is not None:
+        return _OCR_BACKEND
+
+    # Paketlenmiş EXE'de TESSDATA_PREFIX burada ayarlanır (tesserocr de kullanır)
+    tesseract_available = setup_tesseract()
+
+    # tesserocr bir kez denenir; başarısızsa süreç boyunca tekrar denenmez
+    if _OCR_BACKEND_PREFERENCE in ('auto', 'tesserocr') and _TESSEROCR_ERROR is None:
+        try:
+            _OCR_BACKEND = TesserocrBackend()
+            return _OCR_BACKEND
+        except Exception as e:
+            _TESSEROCR_ERROR = str(e) or type(e).__name__
+            if _OCR_BACKEND_PREFERENCE == 'tesserocr':
+                console.print(f"[yellow]⚠ tesserocr kullanılamıyor ({_TESSEROCR_ERROR}); pytesseract'a geçiliyor[/yellow]")
+
+    if tesseract_available:
+        try:
+            _OCR_BACKEND = PytesseractBackend()
+        except ImportError:
+            pass
+
+    return _OCR_BACKEND
+
+
+def get_ocr_backend_preference() -> str:
+    return _OCR_BACKEND_PREFERENCE
+
+
+def close_ocr_backend() -> None:
+    """Kalıcı OCR motorunu kapat (model belleğini serbest bırak)."""
+    global _OCR_BACKEND
+    if _OCR_BACKEND is not None:
+        try:
+            _OCR_BACKEND.close()
+        except Exception:
+            pass
+        _OCR_BACKEND = None
+
+def render_page_for_ocr(page: Any, zoom: float, binarize: bool = True) -> Any:
+    """
+    PDF sayfasını OCR için gri tonlamalı (isteğe bağlı ikili) görsele render et.
+
+    RGB yerine tek kanal: render ve OCR girdisi üçte bir boyutta.
+    """
+    import fitz
+    from PIL import Image
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    img = Image.frombytes('L', (pix.width, pix.height), pix.samples)
+    if binarize:
+        img = img.point(_OCR_BINARIZE_LUT)
+    return img
+
+
+def ocr_page_quality_ok(result: OcrPage) -> bool:
+    """
+    Sayfanın OCR sonucu yeterince güvenilir mi?
+
+    Sayısal her kelime OCR_MIN_NUMERIC_CONF üstünde okunmalı ve sayı
+    biçimine uymalı (ör. '1.O00' veya '5OO' değil); 'Toplam'/'Nakdi'
+    etiketi geçen sayfada değer regex'i de eşleşmeli.
+    """
+    for word, conf in result.words:
+        word = word.strip(':;')
+        if not any(ch.isdigit() for ch in word) or not _OCR_DIGIT_LOOKALIKES.match(word):
+            continue  # Sayı değil (ör. '2.Sayfa')
+        if conf < OCR_MIN_NUMERIC_CONF or not _OCR_NUMBER_TOKEN.match(word):
+            return False
+
+    for label, pattern in _OCR_VALUE_LABELS:
+        if label in result.text and not pattern.search(result.text):
+            return False
+
+    return True
+
+
+def ocr_findeks_page(ocr: OcrBackend, page: Any) -> Tuple[str, float]:
+    """
+    Findeks sayfasını uyarlanabilir çözünürlükle OCR'la.
+
+    Önce OCR_ZOOM_LADDER'ın en düşük adımında ikili görselle okunur; sonuç
+    ocr_page_quality_ok()'tan geçmezse bir sonraki (daha yüksek) adımda
+    gri tonlamalı olarak yeniden render edilir. Temiz sayfalar pahalı
+    ayara hiç çıkmaz.
+
+    Returns:
+        (metin, kullanılan_zoom) tuple'ı
+    """
+    for attempt, zoom in enumerate(OCR_ZOOM_LADDER):
+        result = ocr.recognize(render_page_for_ocr(page, zoom, binarize=(attempt == 0)))
+        if ocr_page_quality_ok(result):
+            break
+    return result.text, zoom
+
+
 def extract_findeks_data(pdf_path: Path) -> List[Dict[str, Any]]:
     """
     Findeks raporundan kurum bilgilerini LOGO EŞLEŞTİRME + OCR ile çıkar.
@@ -976,45 +2549,23 @@ def extract_findeks_data(pdf_path: Path) -> List[Dict[str, Any]]:
         Her kurum için dict listesi (logo eşleştirmesiyle gerçek banka isimleri)
     """
     import re
-    import tempfile
 
     kurumlar = []
     logos_dir = Path("logos")
 
     try:
-        # PyMuPDF ve pytesseract kullan
+        # PyMuPDF ve OCR motoru (tesserocr veya pytesseract) kullan
         import fitz
-        import pytesseract
-        from PIL import Image
-        import shutil
-        import sys
-        import os
-
-        # PyInstaller ile paketlenmiş EXE ise Tesseract path'ini ayarla
-        if getattr(sys, 'frozen', False):
-            # EXE içindeyiz
-            base_path = sys._MEIPASS
-            tesseract_cmd = os.path.join(base_path, 'tesseract.exe')
-            if os.path.exists(tesseract_cmd):
-                pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
-                # Tessdata path'ini de ayarla
-                os.environ['TESSDATA_PREFIX'] = os.path.join(base_path, 'tessdata')
-
-        # Tesseract binary'sinin varlığını kontrol et
-        tesseract_available = False
-        try:
-            pytesseract.get_tesseract_version()
-            tesseract_available = True
-        except:
-            tesseract_available = shutil.which('tesseract') is not None
 
-        if not tesseract_available:
+        # OCR motoru süreç başına bir kez oluşturulur
+        ocr = get_ocr_backend()
+        if ocr is None:
             console.print(f"[yellow]⚠ Tesseract OCR bulunamadı. Findeks eşleştirmesi devre dışı.[/yellow]")
             console.print(f"[dim]Tesseract kurmak için: https://github.com/tesseract-ocr/tesseract[/dim]")
             return []
 
-        pdf = fitz.open(str(pdf_path))
-        temp_dir = Path(tempfile.mkdtemp())
+        pdf = open_fitz(pdf_path)
+        check_page_count(len(pdf))
 
         for page_num in range(2, len(pdf)):
             try:
@@ -1030,28 +2581,19 @@ def extract_findeks_data(pdf_path: Path) -> List[Dict[str, Any]]:
                         try:
                             xref = img[0]
                             base_image = pdf.extract_image(xref)
-                            image_bytes = base_image["image"]
-
-                            # Geçici dosyaya kaydet
-                            logo_temp_path = temp_dir / f"page{page_num}_img{img_index}.png"
-                            with open(logo_temp_path, "wb") as f:
-                                f.write(image_bytes)
 
-                            # Logo eşleştir
-                            bank_name_from_logo = compare_logos(logo_temp_path, logos_dir)
+                            # Logo eşleştir (görsel bellekten, geçici dosya yok)
+                            bank_name_from_logo = compare_logos(base_image["image"], logos_dir)
                             if bank_name_from_logo:
                                 console.print(f"[green]✓ Sayfa {page_num+1}: {bank_name_from_logo} (LOGO)[/green]")
                                 break  # Logo bulundu, OCR'a gerek yok
                         except Exception as e:
                             continue
 
-                # Yüksek çözünürlükte render (OCR için)
-                mat = fitz.Matrix(2.5, 2.5)
-                pix = page.get_pixmap(matrix=mat)
-                img = Image.frombytes('RGB', [pix.width, pix.height], pix.samples)
-
-                # OCR yap
-                text = pytesseract.image_to_string(img, lang='eng')
+                # OCR yap (düşük çözünürlükten başlar, gerekirse yükseltir)
+                text, zoom = ocr_findeks_page(ocr, page)
+                if zoom != OCR_ZOOM_LADDER[0]:
+                    console.print(f"[dim]  Sayfa {page_num+1}: düşük OCR güveni, {zoom}x ile yeniden okundu[/dim]")
 
                 # LOGO EŞLEŞTİRMESİ BAŞARILI MI?
                 if bank_name_from_logo:
@@ -1061,7 +2603,7 @@ def extract_findeks_data(pdf_path: Path) -> List[Dict[str, Any]]:
                     toplam_lines = [bank_name]  # Tek banka var
                 else:
                     # Logo bulunamadı, OCR'dan banka ismini al
-                    toplam_lines = re.findall(r'(.{5,40})\s+Toplam\s+[\d.,]+', text)
+                    toplam_lines = find_findeks_bank_lines(text)
 
                 for bank_candidate_raw in toplam_lines:
                     # Logo eşleştirmesinden geliyorsa direkt kullan
@@ -1070,7 +2612,7 @@ def extract_findeks_data(pdf_path: Path) -> List[Dict[str, Any]]:
                         bank_name = bank_name_from_logo
                     else:
                         # OCR'dan geliyorsa temizle
-                        bank_candidate = re.sub(r'^[^a-zA-Z]+', '', bank_candidate_raw).strip()
+                        bank_candidate = _LEADING_NON_ALPHA_RE.sub('', bank_candidate_raw).strip()
 
                         # Banka anahtar kelimeleri
                         if not any(keyword in bank_candidate.lower() for keyword in
@@ -1088,42 +2630,11 @@ def extract_findeks_data(pdf_path: Path) -> List[Dict[str, Any]]:
 
                     block = text[max(0, bank_pos-200):bank_pos+800]
 
-                    # Limit ve Risk değerlerini parse et
-                    grup_limit_match = re.search(r'Grup\s+([\d.,]+)', block)
-                    nakdi_limit_match = re.search(r'Nakdi\s+([\d.,]+)', block)
-                    gayri_limit_match = re.search(r'Gayri\s+Nakdi\s+([\d.,]+)', block)
-                    toplam_limit_match = re.search(r'Toplam\s+([\d.,]+)', block)
-
-                    # Risk değerleri
-                    risk_section = block[block.find('RISK (TL)'):] if 'RISK (TL)' in block else block
-                    nakdi_risk_matches = re.findall(r'Nakdi\s+([\d.,]+)', risk_section)
-                    gayri_risk_matches = re.findall(r'Gayri\s+Nakdi\s+([\d.,]+)', risk_section)
-                    toplam_risk_matches = re.findall(r'Toplam\s+([\d.,]+)', risk_section)
-
-                    # Vade tarihini bul (Genel Revize Vade / Son Revize Tarihi)
-                    revize_tarihi = None
-                    # Tarih formatları: DD.MM.YYYY, DD/MM/YYYY
-                    date_patterns = [
-                        r'(?:Genel\s+Revize|Son\s+Revize|Vade).*?(\d{2}[./]\d{2}[./]\d{4})',
-                        r'(\d{2}[./]\d{2}[./]\d{4})',
-                    ]
-                    for pattern in date_patterns:
-                        date_match = re.search(pattern, block)
-                        if date_match:
-                            revize_tarihi = parse_date(date_match.group(1))
-                            break
-
+                    # Limit, risk ve revize alanları önceden derlenmiş desenlerle
                     kurum_data = {
                         'sayfa': page_num + 1,
                         'kurum': bank_name,
-                        'grup_limit': parse_number_ocr(grup_limit_match.group(1)) if grup_limit_match else 0.0,
-                        'nakdi_limit': parse_number_ocr(nakdi_limit_match.group(1)) if nakdi_limit_match else 0.0,
-                        'gayrinakdi_limit': parse_number_ocr(gayri_limit_match.group(1)) if gayri_limit_match else 0.0,
-                        'toplam_limit': parse_number_ocr(toplam_limit_match.group(1)) if toplam_limit_match else 0.0,
-                        'nakdi_risk': parse_number_ocr(nakdi_risk_matches[-1]) if nakdi_risk_matches else 0.0,
-                        'gayrinakdi_risk': parse_number_ocr(gayri_risk_matches[-1]) if gayri_risk_matches else 0.0,
-                        'toplam_risk': parse_number_ocr(toplam_risk_matches[-1]) if toplam_risk_matches else 0.0,
-                        'revize_tarihi': revize_tarihi,
+                        **scan_findeks_block(block),
                     }
 
                     if any([kurum_data['nakdi_limit'], kurum_data['gayrinakdi_limit'],
@@ -1136,16 +2647,9 @@ def extract_findeks_data(pdf_path: Path) -> List[Dict[str, Any]]:
 
         pdf.close()
 
-        # Geçici dosyaları temizle
-        try:
-            import shutil
-            shutil.rmtree(temp_dir)
-        except:
-            pass
-
     except Exception as e:
         console.print(f"[yellow]⚠ Findeks OCR hatası: {e}[/yellow]")
-        console.print(f"[dim]PyMuPDF ve pytesseract gerekli. Kurulum: pip install PyMuPDF pytesseract imagehash[/dim]")
+        console.print(f"[dim]PyMuPDF ve pytesseract (veya tesserocr) gerekli. Kurulum: pip install PyMuPDF pytesseract imagehash[/dim]")
 
     return kurumlar
 
@@ -1177,6 +2681,12 @@ def calculate_name_similarity(name1: str, name2: str) -> float:
     if norm1 == norm2:
         return 1.0
 
+    # Kurum kaydında aynı kurumun takma adları
+    registry = get_institution_registry()
+    institution = registry.key_id(norm1)
+    if institution is not None and institution == registry.key_id(norm2):
+        return 1.0
+
     # Biri diğerini içeriyorsa
     if norm1 in norm2 or norm2 in norm1:
         return 0.9
@@ -1184,7 +2694,8 @@ def calculate_name_similarity(name1: str, name2: str) -> float:
     # SequenceMatcher ile benzerlik
     return SequenceMatcher(None, norm1, norm2).ratio()
 
-def calculate_match_score(krm_data: Dict[str, Any], findeks_data: Dict[str, Any], krm_kaynak: str = '') -> float:
+def calculate_match_score(krm_data: Dict[str, Any], findeks_data: Dict[str, Any], krm_kaynak: str = '',
+                          name_sim: Optional[float] = None) -> float:
     """
     İki kaynak arasındaki benzerlik skorunu hesapla (düşük = iyi).
 
@@ -1192,66 +2703,68 @@ def calculate_match_score(krm_data: Dict[str, Any], findeks_data: Dict[str, Any]
         krm_data: KRM kaynak bilgileri
         findeks_data: Findeks kurum bilgileri
         krm_kaynak: KRM kaynak ismi (isim benzerliği için)
+        name_sim: Önceden hesaplanmış isim benzerliği (FindeksIndex memo'su)
 
     Returns:
         Toplam fark skoru
     """
-    score = 0.0
-    match_count = 0
-
     # İsim benzerliği (EN ÖNEMLİ - önce isme bak!)
     if krm_kaynak and findeks_data.get('kurum'):
-        name_sim = calculate_name_similarity(krm_kaynak, findeks_data['kurum'])
+        if name_sim is None:
+            name_sim = calculate_name_similarity(krm_kaynak, findeks_data['kurum'])
         # İsim benzerliği yüksekse (>0.7), skorun çok düşük olması lazım
         # İsim benzerliği düşükse (<0.3), bu eşleşme muhtemelen yanlış
-        if name_sim < 0.3:
+        if name_sim < FINDEKS_MIN_NAME_SIMILARITY:
             # İsim çok farklıysa, bu eşleşmeyi penalize et
             return float('inf')
+    else:
+        name_sim = None
 
-        # İsim benzerliğini ters çevir (1.0 benzerlik = 0.0 skor, 0.3 benzerlik = 0.7 skor)
-        name_score = (1.0 - name_sim) * 5.0  # 5x ağırlık - isim ÇOK önemli!
-        score += name_score
-        match_count += 1
+    return combine_match_score(name_sim, match_value_terms(krm_data, findeks_data))
+
+def match_value_terms(krm_data: Dict[str, Any], findeks_data: Dict[str, Any]) -> List[float]:
+    """
+    Skorun tutar ve vade bileşenleri (isimden bağımsız).
+
+    Returns:
+        Karşılaştırılabilen her alan için ağırlıklı fark (skordaki sırayla)
+    """
+    terms = []
 
     # Nakdi Limit
     krm_nakdi_limit = krm_data.get('nakdi_limit', 0)
     findeks_nakdi_limit = findeks_data.get('nakdi_limit', 0)
     if krm_nakdi_limit > 0 and findeks_nakdi_limit > 0:
         diff = abs(krm_nakdi_limit - findeks_nakdi_limit) / max(krm_nakdi_limit, findeks_nakdi_limit)
-        score += diff * 2
-        match_count += 1
+        terms.append(diff * 2)
 
     # Gayrinakdi Limit
     krm_gayri_limit = krm_data.get('gayrinakdi_limit', 0)
     findeks_gayri_limit = findeks_data.get('gayrinakdi_limit', 0)
     if krm_gayri_limit > 0 and findeks_gayri_limit > 0:
         diff = abs(krm_gayri_limit - findeks_gayri_limit) / max(krm_gayri_limit, findeks_gayri_limit)
-        score += diff * 1.5
-        match_count += 1
+        terms.append(diff * 1.5)
 
     # Nakdi Risk
     krm_nakdi_risk = krm_data.get('nakdi_risk', 0)
     findeks_nakdi_risk = findeks_data.get('nakdi_risk', 0)
     if krm_nakdi_risk > 0 and findeks_nakdi_risk > 0:
         diff = abs(krm_nakdi_risk - findeks_nakdi_risk) / max(krm_nakdi_risk, findeks_nakdi_risk)
-        score += diff * 2
-        match_count += 1
+        terms.append(diff * 2)
 
     # Gayrinakdi Risk
     krm_gayri_risk = krm_data.get('gayrinakdi_risk', 0)
     findeks_gayri_risk = findeks_data.get('gayrinakdi_risk', 0)
     if krm_gayri_risk > 0 and findeks_gayri_risk > 0:
         diff = abs(krm_gayri_risk - findeks_gayri_risk) / max(krm_gayri_risk, findeks_gayri_risk)
-        score += diff * 1.5
-        match_count += 1
+        terms.append(diff * 1.5)
 
     # Toplam Limit
     krm_toplam_limit = krm_data.get('toplam_limit', 0)
     findeks_toplam_limit = findeks_data.get('toplam_limit', 0)
     if krm_toplam_limit > 0 and findeks_toplam_limit > 0:
         diff = abs(krm_toplam_limit - findeks_toplam_limit) / max(krm_toplam_limit, findeks_toplam_limit)
-        score += diff * 1
-        match_count += 1
+        terms.append(diff * 1)
 
     # Vade Tarihleri (ÇOK ÖNEMLİ - yüksek ağırlık)
     krm_vade = krm_data.get('revize_tarihi')
@@ -1261,8 +2774,26 @@ def calculate_match_score(krm_data: Dict[str, Any], findeks_data: Dict[str, Any]
         days_diff = abs((krm_vade - findeks_vade).days)
         # 0 gün = perfect match (0.0), 30 gün = 1.0, 60+ gün = çok kötü
         date_score = min(days_diff / 30.0, 3.0)  # Max 3.0 penalty
-        score += date_score * 3.0  # Yüksek ağırlık - vade çok önemli!
+        terms.append(date_score * 3.0)  # Yüksek ağırlık - vade çok önemli!
+
+    return terms
+
+def combine_match_score(name_sim: Optional[float], value_terms: List[float]) -> float:
+    """
+    İsim benzerliği ve tutar/vade bileşenlerinden toplam skoru hesapla.
+
+    name_sim'e göre monoton azalandır: benzerlik için bir üst sınırla
+    çağrılırsa skor için alt sınır verir (bkz. FindeksIndex).
+    """
+    score = 0.0
+    match_count = len(value_terms)
+
+    if name_sim is not None:
+        # İsim benzerliğini ters çevir (1.0 benzerlik = 0.0 skor, 0.3 benzerlik = 0.7 skor)
+        score += (1.0 - name_sim) * 5.0  # 5x ağırlık - isim ÇOK önemli!
         match_count += 1
+    for term in value_terms:
+        score += term
 
     if match_count == 0:
         return float('inf')
@@ -1273,10 +2804,204 @@ def calculate_match_score(krm_data: Dict[str, Any], findeks_data: Dict[str, Any]
 
     return avg_score
 
+
+class FindeksIndex:
+    """
+    Bir Findeks raporunun kurum listesi ve isim eşleştirme indeksi.
+
+    Klasör başına bir kez kurulur; aynı firmanın farklı tarihli KRM
+    raporları aynı kaynak isimlerini taşıdığından isim benzerlikleri ve
+    aday listeleri raporlar arasında yeniden kullanılır.
+
+    Adaylar karakter inverted index'inden üretilir: iki normalize ismin
+    ortak karakter sayısı SequenceMatcher.ratio() için kesin bir üst sınır
+    verir (quick_ratio ile aynı). Sınırı FINDEKS_MIN_NAME_SIMILARITY altında
+    kalan çiftler SequenceMatcher çalıştırılmadan elenir; find_best_matches
+    aynı sınırla skor alt sınırı hesaplayıp kazanamayacak adayları da
+    atlar. Sonuçlar kurum listesini baştan taramakla aynıdır.
+    """
+
+    def __init__(self, institutions: List[Dict[str, Any]]) -> None:
+        from collections import Counter
+
+        self.institutions = institutions
+        self.candidate_memo: Dict[str, List[Tuple[Dict[str, Any], Optional[float], Optional[str]]]] = {}
+        self.similarity_memo: Dict[Tuple[str, str], float] = {}
+
+        # Kurum adı olmayan kayıtlar isim kontrolünden muaf: her zaman aday
+        self.unnamed: List[int] = []
+        # Tekil normalize isimler → kurum sıraları
+        self.keys: List[str] = []
+        self.key_positions: List[List[int]] = []
+        key_ids: Dict[str, int] = {}
+        for pos, inst in enumerate(institutions):
+            if not inst.get('kurum'):
+                self.unnamed.append(pos)
+                continue
+            key = normalize_bank_name(inst['kurum'])
+            key_id = key_ids.get(key)
+            if key_id is None:
+                key_id = key_ids[key] = len(self.keys)
+                self.keys.append(key)
+                self.key_positions.append([])
+            self.key_positions[key_id].append(pos)
+
+        # Boş normalize isim (örn. yalnızca "BANK A.Ş.") her ismin içinde geçer
+        self.empty_key = key_ids.get('')
+
+        # Kurum kaydı: aynı kurumun takma adları tam eşleşme sayılır
+        self.registry = get_institution_registry()
+        self.institution_keys: Dict[str, List[int]] = {}
+        for key_id, key in enumerate(self.keys):
+            institution = self.registry.key_id(key)
+            if institution is not None:
+                self.institution_keys.setdefault(institution, []).append(key_id)
+
+        # Karakter → [(isim_id, adet)] inverted index
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for key_id, key in enumerate(self.keys):
+            for char, count in Counter(key).items():
+                self.postings.setdefault(char, []).append((key_id, count))
+
+    def __len__(self) -> int:
+        return len(self.institutions)
+
+    def name_bounds(self, norm: str) -> Dict[int, float]:
+        """
+        Normalize bir isme benzerliği eşiği geçebilecek isimler.
+
+        Returns:
+            {isim_id: benzerlik üst sınırı} - eşitlik/içerme durumlarında
+            sınır calculate_name_similarity ile aynı kesin değerdir
+        """
+        from collections import Counter
+
+        # Boş isim her ismin içinde geçer (0.9)
+        if not norm:
+            return {key_id: (1.0 if not key else 0.9) for key_id, key in enumerate(self.keys)}
+
+        shared: Dict[int, int] = {}
+        for char, count in Counter(norm).items():
+            for key_id, key_count in self.postings.get(char, ()):
+                shared[key_id] = shared.get(key_id, 0) + min(count, key_count)
+
+        found: Dict[int, float] = {}
+        for key_id, common in shared.items():
+            key = self.keys[key_id]
+            if norm == key:
+                found[key_id] = 1.0
+            elif common == min(len(norm), len(key)) and (norm in key or key in norm):
+                found[key_id] = 0.9
+            else:
+                # SequenceMatcher.ratio() ile aynı formül; eşleşen karakter <= ortak karakter
+                bound = 2.0 * common / (len(norm) + len(key))
+                if bound >= FINDEKS_MIN_NAME_SIMILARITY:
+                    found[key_id] = bound
+
+        if self.empty_key is not None:
+            found[self.empty_key] = 0.9
+        for key_id in self.institution_keys.get(self.registry.key_id(norm), ()):
+            found[key_id] = 1.0
+        return found
+
+    def name_similarity(self, norm: str, inst_norm: str) -> float:
+        """calculate_name_similarity ile aynı (normalize isimlerle, memo'lu)."""
+        sim = self.similarity_memo.get((norm, inst_norm))
+        if sim is None:
+            institution = self.registry.key_id(norm)
+            if norm == inst_norm or (institution is not None and institution == self.registry.key_id(inst_norm)):
+                sim = 1.0
+            elif norm in inst_norm or inst_norm in norm:
+                sim = 0.9
+            else:
+                sim = SequenceMatcher(None, norm, inst_norm).ratio()
+            self.similarity_memo[(norm, inst_norm)] = sim
+        return sim
+
+    def candidates(self, kaynak: str) -> List[Tuple[Dict[str, Any], Optional[float], Optional[str]]]:
+        """
+        Kaynak için aday kurumlar (Findeks sırasıyla).
+
+        Returns:
+            (kurum, isim benzerliği üst sınırı, kurumun normalize ismi)
+            listesi; isim kontrolü uygulanmayan adaylarda son ikisi None
+        """
+        if not kaynak:
+            return [(inst, None, None) for inst in self.institutions]
+
+        norm = normalize_bank_name(kaynak)
+        cached = self.candidate_memo.get(norm)
+        if cached is not None:
+            return cached
+
+        slots: Dict[int, Tuple[Optional[float], Optional[str]]] = {pos: (None, None) for pos in self.unnamed}
+        for key_id, bound in self.name_bounds(norm).items():
+            for pos in self.key_positions[key_id]:
+                slots[pos] = (bound, self.keys[key_id])
+
+        found = [(self.institutions[pos], *slots[pos]) for pos in sorted(slots)]
+        self.candidate_memo[norm] = found
+        return found
+
+    def best_match(self, kaynak: str, krm_data: Dict[str, Any],
+                   threshold: float = FINDEKS_MATCH_THRESHOLD) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Kaynağa en düşük calculate_match_score'u veren kurum.
+
+        Adaylar Findeks sırasıyla gezilir (eşitlikte ilk kurum kazanır).
+        İsim benzerliği üst sınırıyla hesaplanan skor alt sınırı eşiği
+        veya o ana kadarki en iyi skoru aşıyorsa aday SequenceMatcher
+        çalıştırılmadan atlanır; sonuç tam taramayla aynıdır.
+
+        Returns:
+            (kurum, skor) tuple'ı; skor eşiği aşıyorsa kurum yine de
+            döndürülebilir, eşik kontrolü çağırana aittir
+        """
+        best_match = None
+        best_score = float('inf')
+        norm = normalize_bank_name(kaynak) if kaynak else ''
+
+        for inst, name_bound, inst_norm in self.candidates(kaynak):
+            value_terms = match_value_terms(krm_data, inst)
+            name_sim = None
+            if name_bound is not None:
+                if combine_match_score(name_bound, value_terms) > min(best_score, threshold):
+                    continue
+                name_sim = self.name_similarity(norm, inst_norm)
+                if name_sim < FINDEKS_MIN_NAME_SIMILARITY:
+                    continue
+
+            score = combine_match_score(name_sim, value_terms)
+            if score < best_score:
+                best_score = score
+                best_match = inst
+
+        return best_match, best_score
+
+
+_FINDEKS_INDEX_CACHE: Dict[Tuple[str, str], FindeksIndex] = {}
+
+
+def get_findeks_index(findeks_pdf: Path) -> FindeksIndex:
+    """
+    Findeks raporunun indeksini döndür (OCR dosya içeriği başına bir kez).
+
+    Aynı klasördeki KRM raporları aynı Findeks'i kullanır; yalnızca son
+    Findeks tutulur, yeni klasöre geçildiğinde eskisi bırakılır.
+    """
+    key = (str(findeks_pdf), read_pdf(findeks_pdf).sha256)
+    index = _FINDEKS_INDEX_CACHE.get(key)
+    if index is None:
+        index = FindeksIndex(extract_findeks_data(findeks_pdf))
+        _FINDEKS_INDEX_CACHE.clear()
+        _FINDEKS_INDEX_CACHE[key] = index
+    return index
+
+
 def find_best_matches(
     krm_sources: Dict[str, Dict[str, Any]],
     krm_risks: Dict[str, Dict[str, Any]],
-    findeks_data: List[Dict[str, Any]],
+    findeks_data: Any,
     threshold: float = FINDEKS_MATCH_THRESHOLD
 ) -> List[Dict[str, Any]]:
     """
@@ -1285,12 +3010,13 @@ def find_best_matches(
     Args:
         krm_sources: KRM limit bilgileri
         krm_risks: KRM risk bilgileri
-        findeks_data: Findeks kurum listesi
+        findeks_data: FindeksIndex veya Findeks kurum listesi
         threshold: Maksimum fark yüzdesi
 
     Returns:
         Eşleştirme sonuçları listesi
     """
+    index = findeks_data if isinstance(findeks_data, FindeksIndex) else FindeksIndex(findeks_data)
     matches = []
 
     for kaynak, limit_data in krm_sources.items():
@@ -1306,14 +3032,7 @@ def find_best_matches(
             'revize_tarihi': limit_data.get('revize_tarihi'),
         }
 
-        best_match = None
-        best_score = float('inf')
-
-        for findeks_inst in findeks_data:
-            score = calculate_match_score(krm_combined, findeks_inst, kaynak)
-            if score < best_score:
-                best_score = score
-                best_match = findeks_inst
+        best_match, best_score = index.best_match(kaynak, krm_combined, threshold)
 
         if best_score <= threshold and best_match:
             # Yeni skorlama sistemine göre confidence seviyeleri
@@ -1374,118 +3093,682 @@ def identify_passive_sources(limits: Dict[str, Dict[str, Any]], risks: Dict[str,
 
     return passive
 
-def find_anomalies(limits: Dict[str, Dict[str, Any]], risks: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """
+# ========================================
+# ANOMALİ KURALLARI (DEKLARATİF)
+# ========================================
+
+ANOMALY_RULES_FILENAMES = ('anomaly_rules.json', 'anomaly_rules.yaml', 'anomaly_rules.yml')
+
+# Kural ifadelerinde kullanılabilen kaynak alanları
+ANOMALY_RULE_FIELDS = (
+    'grup_limit', 'nakdi_limit', 'gayrinakdi_limit', 'toplam_limit',
+    'nakdi_risk', 'gayrinakdi_risk', 'toplam_risk', 'gecikme',
+    'kullanim', 'revize_gecmis',
+)
+
+# Varsayılan kurallar: find_anomalies()'in önceki if bloklarının birebir karşılığı.
+# Kaynak başına bulgular bu listenin sırasıyla raporlanır.
+DEFAULT_ANOMALY_RULES: Dict[str, Any] = {
+    'version': 1,
+    'thresholds': {
+        'high_usage': HIGH_USAGE_THRESHOLD,
+        'critical_usage': CRITICAL_USAGE_THRESHOLD,
+        'critical_delay_days': CRITICAL_DELAY_DAYS,
+    },
+    'rules': [
+        {
+            'id': 'nakdi_yetersiz',
+            'type': 'NAKDİ LİMİT YETERSİZ',
+            'severity': 'WARNING',
+            'when': 'nakdi_risk > nakdi_limit and nakdi_limit > 0 and toplam_limit > 0 and nakdi_risk <= toplam_limit',
+            'value': 'nakdi_risk - nakdi_limit',
+            'detail': 'Nakdi risk ({nakdi_risk:,.0f}) nakdi limiti ({nakdi_limit:,.0f}) aşıyor, ancak toplam limit ({toplam_limit:,.0f}) yeterli. Nakdi aşım: {value:,.0f} TL',
+        },
+        {
+            'id': 'nakdi_asimi',
+            'type': 'NAKDİ LİMİT AŞIMI',
+            'severity': 'CRITICAL',
+            'when': 'nakdi_risk > nakdi_limit and nakdi_limit > 0 and not (toplam_limit > 0 and nakdi_risk <= toplam_limit)',
+            'value': 'nakdi_risk - nakdi_limit',
+            'detail': 'Nakdi risk ({nakdi_risk:,.0f}) nakdi limiti ({nakdi_limit:,.0f}) aşıyor. Aşım: {value:,.0f} TL',
+        },
+        {
+            'id': 'gayrinakdi_genel_asim',
+            'type': 'GAYRİNAKDİ LİMİT AŞIMI',
+            'severity': 'CRITICAL',
+            'when': 'gayrinakdi_risk > gayrinakdi_limit and gayrinakdi_limit > 0 and toplam_limit > 0 and gayrinakdi_risk > toplam_limit',
+            'value': 'gayrinakdi_risk - toplam_limit',
+            'detail': 'Gayrinakdi risk ({gayrinakdi_risk:,.0f}) hem gayrinakdi limiti ({gayrinakdi_limit:,.0f}) hem de genel limiti ({toplam_limit:,.0f}) aşıyor. Genel limit aşımı: {value:,.0f} TL',
+        },
+        {
+            'id': 'gayrinakdi_asimi',
+            'type': 'GAYRİNAKDİ LİMİT AŞIMI',
+            'severity': 'WARNING',
+            'when': 'gayrinakdi_risk > gayrinakdi_limit and gayrinakdi_limit > 0 and not (toplam_limit > 0 and gayrinakdi_risk > toplam_limit)',
+            'value': 'gayrinakdi_risk - gayrinakdi_limit',
+            'detail': 'Gayrinakdi risk ({gayrinakdi_risk:,.0f}) gayrinakdi limiti ({gayrinakdi_limit:,.0f}) aşıyor ama genel limit ({toplam_limit:,.0f}) içinde. Gayrinakdi aşım: {value:,.0f} TL',
+        },
+        {
+            'id': 'limitsiz_kullanim',
+            'type': 'LIMITSIZ KULLANIM',
+            'severity': 'CRITICAL',
+            'when': 'toplam_risk > 0 and toplam_limit == 0',
+            'value': 'toplam_risk',
+            'detail': 'Limit olmadan {toplam_risk:,.0f} TL risk taşınıyor',
+        },
+        {
+            'id': 'gecikme_kritik',
+            'type': 'GECIKME',
+            'severity': 'CRITICAL',
+            'when': 'gecikme > 0 and gecikme > critical_delay_days',
+            'value': 'gecikme',
+            'detail': '{gecikme} gun gecikme var',
+        },
+        {
+            'id': 'gecikme',
+            'type': 'GECIKME',
+            'severity': 'WARNING',
+            'when': 'gecikme > 0 and gecikme <= critical_delay_days',
+            'value': 'gecikme',
+            'detail': '{gecikme} gun gecikme var',
+        },
+        {
+            'id': 'toplam_limit_asimi',
+            'type': 'TOPLAM LIMIT ASIMI',
+            'severity': 'CRITICAL',
+            'when': 'toplam_limit > 0 and kullanim > critical_usage',
+            'value': 'toplam_risk - toplam_limit',
+            'detail': 'Toplam risk ({toplam_risk:,.0f}) toplam limiti ({toplam_limit:,.0f}) asiyor. Asim: {value:,.0f} TL (%{kullanim:.1f} kullanim)',
+        },
+        {
+            'id': 'yuksek_kullanim',
+            'type': 'YUKSEK KULLANIM',
+            'severity': 'WARNING',
+            'when': 'toplam_limit > 0 and kullanim <= critical_usage and kullanim > high_usage',
+            'value': 'kullanim',
+            'detail': '%{kullanim:.1f} kullanim (Risk: {toplam_risk:,.0f} / Limit: {toplam_limit:,.0f})',
+        },
+    ],
+}
+
+_RULE_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Compare, ast.Gt, ast.GtE, ast.Lt,
+    ast.LtE, ast.Eq, ast.NotEq, ast.Name, ast.Load, ast.Constant,
+)
+
+
+def _rule_divide(a: float, b: float) -> float:
+    """Kural ifadelerinde bölme: sıfıra bölmede numpy ile aynı sonuç (±inf, 0/0 → nan)."""
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a == 0:
+            return float('nan')
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+def _rule_divide_vector(a: Any, b: Any) -> Any:
+    import numpy as np
+    return np.true_divide(np.asarray(a, dtype=np.float64), b)
+
+
+_RULE_EVAL_GLOBALS: Dict[str, Any] = {'__builtins__': {}, '__div__': _rule_divide}
+
+
+class _GuardDivision(ast.NodeTransformer):
+    """a / b ifadelerini __div__(a, b) çağrısına çevirir (sıfıra bölme istisna atmaz)."""
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Div):
+            return ast.Call(func=ast.Name(id='__div__', ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+        return node
+
+
+class _VectorizeRule(ast.NodeTransformer):
+    """and/or/not ve zincirli karşılaştırmaları numpy maske operatörlerine çevirir."""
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        values = [self._mask(v) for v in node.values]
+        result = values[0]
+        for value in values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=self._mask(node.operand))
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        parts = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            parts.append(ast.Compare(left=left, ops=[op], comparators=[right]))
+            left = right
+        result = parts[0]
+        for part in parts[1:]:
+            result = ast.BinOp(left=result, op=ast.BitAnd(), right=part)
+        return result
+
+    @staticmethod
+    def _mask(node):
+        return ast.Call(func=ast.Name(id='__mask__', ctx=ast.Load()), args=[node], keywords=[])
+
+
+def _compile_rule_expression(expr: str, names: set, rule_id: str) -> Tuple[Any, Any, Any]:
+    """
+    Kural ifadesini doğrula; (AST, skaler code, vektörel code) döndür.
+
+    Yalnızca aritmetik, karşılaştırma, and/or/not, sayılar ve bilinen alan
+    isimlerine izin verilir; fonksiyon çağrısı veya attribute erişimi yoktur.
+
+    Raises:
+        ValueError: İfade geçersizse
+    """
+    try:
+        tree = ast.parse(str(expr), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Kural '{rule_id}': ifade çözümlenemedi: {expr!r} ({e.msg})")
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _RULE_ALLOWED_NODES):
+            raise ValueError(f"Kural '{rule_id}': izin verilmeyen ifade öğesi {type(node).__name__}: {expr!r}")
+        if isinstance(node, ast.Name) and node.id not in names:
+            raise ValueError(f"Kural '{rule_id}': bilinmeyen alan '{node.id}'")
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise ValueError(f"Kural '{rule_id}': yalnızca sayısal sabitler kullanılabilir: {expr!r}")
+
+    tree = ast.fix_missing_locations(_GuardDivision().visit(tree))
+    scalar_code = compile(tree, f'<kural:{rule_id}>', 'eval')
+    vector_tree = ast.parse(str(expr), mode='eval')
+    vector_tree = ast.fix_missing_locations(_VectorizeRule().visit(_GuardDivision().visit(vector_tree)))
+    vector_code = compile(vector_tree, f'<kural:{rule_id}:vektor>', 'eval')
+    return tree, scalar_code, vector_code
+
+
+class AnomalyRule:
+    """Derlenmiş tek bir anomali kuralı."""
+
+    __slots__ = ('id', 'type', 'severity', 'detail', 'when_tree', '_when', '_value', '_when_vec', '_value_vec')
+
+    def __init__(self, spec: Dict[str, Any], names: set):
+        rule_id = str(spec.get('id') or spec.get('type') or '?')
+        missing = [k for k in ('type', 'severity', 'when', 'value', 'detail') if k not in spec]
+        if missing:
+            raise ValueError(f"Kural '{rule_id}': eksik alan(lar): {', '.join(missing)}")
+        if spec['severity'] not in ('CRITICAL', 'WARNING'):
+            raise ValueError(f"Kural '{rule_id}': severity CRITICAL veya WARNING olmalı")
+
+        self.id = rule_id
+        self.type = str(spec['type'])
+        self.severity = spec['severity']
+        self.detail = str(spec['detail'])
+        self.when_tree, self._when, self._when_vec = _compile_rule_expression(spec['when'], names, rule_id)
+        _, self._value, self._value_vec = _compile_rule_expression(spec['value'], names, rule_id)
+
+        for _, field_name, _, _ in string.Formatter().parse(self.detail):
+            if field_name and field_name != 'value' and field_name not in names:
+                raise ValueError(f"Kural '{rule_id}': detay metninde bilinmeyen alan '{field_name}'")
+
+    def matches(self, env: Dict[str, Any]) -> bool:
+        return bool(eval(self._when, _RULE_EVAL_GLOBALS, env))
+
+    def value(self, env: Dict[str, Any]) -> Any:
+        return eval(self._value, _RULE_EVAL_GLOBALS, env)
+
+    def mask(self, env: Dict[str, Any]):
+        return eval(self._when_vec, _RULE_EVAL_GLOBALS, env)
+
+    def values(self, env: Dict[str, Any]):
+        return eval(self._value_vec, _RULE_EVAL_GLOBALS, env)
+
+    def build(self, kaynak: str, env: Dict[str, Any]) -> Dict[str, Any]:
+        """Eşleşen kaynak için anomali dict'i (detay metni burada üretilir)."""
+        value = env['value'] = self.value(env)
+        return {
+            'kaynak': kaynak,
+            'type': self.type,
+            'severity': self.severity,
+            'detail': self.detail.format_map(env),
+            'value': value
+        }
+
+
+class AnomalyRuleSet:
+    """
+    Derlenmiş anomali kural kümesi.
+
+    Attributes:
+        rules: Sıralı AnomalyRule listesi
+        thresholds: Eşik isimleri → değerleri (ifadelerde isimle kullanılır)
+        version: "<sürüm>+<içerik özeti>"; sonuçlara ve journal anahtarına girer
+        source: Kuralların yüklendiği dosya (varsayılanlar için None)
+    """
+
+    def __init__(self, definition: Dict[str, Any], source: Optional[Path] = None):
+        thresholds = dict(DEFAULT_ANOMALY_RULES['thresholds'])
+        thresholds.update(definition.get('thresholds') or {})
+        for name, value in thresholds.items():
+            if not str(name).isidentifier() or name in ANOMALY_RULE_FIELDS or name == 'value':
+                raise ValueError(f"Geçersiz eşik ismi: {name!r}")
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"Eşik '{name}' sayısal olmalı")
+
+        rule_specs = definition.get('rules')
+        if rule_specs is None:
+            rule_specs = DEFAULT_ANOMALY_RULES['rules']
+
+        names = set(ANOMALY_RULE_FIELDS) | set(thresholds)
+        self.rules = [AnomalyRule(spec, names) for spec in rule_specs if spec.get('enabled', True)]
+        self.thresholds = thresholds
+        self.source = source
+
+        self._scan = self._compile_scan()
+
+        effective = {'thresholds': thresholds, 'rules': rule_specs}
+        digest = hashlib.sha256(json.dumps(effective, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+        self.version = f"{definition.get('version', DEFAULT_ANOMALY_RULES['version'])}+{digest[:12]}"
+
+    def _compile_scan(self):
+        """
+        Tüm kuralların koşullarını tek bir Python fonksiyonunda birleştir.
+
+        Alanlar fonksiyon parametresi, eşikler varsayılan değer olur (hızlı
+        yerel değişken erişimi); dönen liste eşleşen kuralların sıra numaralarıdır.
+        """
+        params = ', '.join(ANOMALY_RULE_FIELDS + tuple(f'{k}={v!r}' for k, v in self.thresholds.items()))
+        module = ast.parse(f"def __scan__({params}):\n    hits = []\n    return hits\n")
+        func = module.body[0]
+        for i, rule in enumerate(self.rules):
+            branch = ast.parse(f"if _:\n    hits.append({i})\n").body[0]
+            branch.test = rule.when_tree.body
+            func.body.insert(len(func.body) - 1, branch)
+
+        namespace: Dict[str, Any] = dict(_RULE_EVAL_GLOBALS)
+        exec(compile(ast.fix_missing_locations(module), '<anomali-kurallari>', 'exec'), namespace)
+        return namespace['__scan__']
+
+    def evaluate(self, kaynak: str, env: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Tek kaynağın ortamına tüm kuralları uygula."""
+        hits = self._scan(**env)
+        if not hits:
+            return []
+        env.update(self.thresholds)
+        return [self.rules[i].build(kaynak, env) for i in hits]
+
+
+_ANOMALY_RULES: Optional[AnomalyRuleSet] = None
+
+
+def find_rules_file(base_dir: Optional[Path] = None) -> Optional[Path]:
+    """Ana dizindeki anomaly_rules.json/.yaml dosyasını bul (yoksa None)."""
+    base_dir = base_dir or get_base_dir()
+    for name in ANOMALY_RULES_FILENAMES:
+        path = base_dir / name
+        if path.exists():
+            return path
+    return None
+
+
+def read_rules_file(path: Path) -> Dict[str, Any]:
+    """
+    Kural dosyasını oku (JSON veya YAML).
+
+    Raises:
+        ValueError: Dosya okunamaz veya içerik dict değilse
+    """
+    text = path.read_text(encoding='utf-8')
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("YAML kural dosyası için PyYAML gerekli (pip install pyyaml) - ya da JSON kullanın")
+        data = yaml.safe_load(text)
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON hatası (satır {e.lineno}): {e.msg}")
+
+    if not isinstance(data, dict):
+        raise ValueError("Kural dosyası bir nesne (version/thresholds/rules) içermeli")
+    return data
+
+
+def load_anomaly_rules(path: Optional[Path] = None, quiet: bool = False) -> AnomalyRuleSet:
+    """
+    Anomali kurallarını yükle, derle ve süreç genelinde etkinleştir.
+
+    path verilmezse ana dizindeki anomaly_rules.json/.yaml aranır; yoksa
+    varsayılan kurallar kullanılır. Kendiliğinden bulunan dosya hatalıysa
+    uyarı verilir ve varsayılanlara dönülür; açıkça verilen dosya (--rules)
+    yüklenemezse hata fırlatılır.
+
+    Args:
+        path: Opsiyonel kural dosyası
+        quiet: True ise konsola bilgi yazma
+
+    Returns:
+        Etkin AnomalyRuleSet
+
+    Raises:
+        ValueError: Açıkça verilen kural dosyası okunamaz veya geçersizse
+    """
+    global _ANOMALY_RULES
+
+    explicit = path is not None
+    path = path or find_rules_file()
+    rule_set = None
+    if path is not None:
+        try:
+            rule_set = AnomalyRuleSet(read_rules_file(path), source=path)
+            if not quiet:
+                console.print(f"[dim]Anomali kuralları: {path.name} ({len(rule_set.rules)} kural, sürüm {rule_set.version})[/dim]")
+        except (OSError, ValueError) as e:
+            if explicit:
+                raise ValueError(f"Kural dosyası yüklenemedi ({path}): {e}") from e
+            console.print(f"[red]✗ Kural dosyası geçersiz ({path.name}): {e} - varsayılan kurallar kullanılıyor[/red]")
+            log_event('rules_invalid', logging.ERROR, path=str(path), error=str(e))
+
+    if rule_set is None:
+        rule_set = AnomalyRuleSet(DEFAULT_ANOMALY_RULES)
+
+    _ANOMALY_RULES = rule_set
+    return rule_set
+
+
+def get_anomaly_rules() -> AnomalyRuleSet:
+    """Etkin kural kümesini döndür (ilk çağrıda varsayılanlar derlenir)."""
+    global _ANOMALY_RULES
+    if _ANOMALY_RULES is None:
+        _ANOMALY_RULES = AnomalyRuleSet(DEFAULT_ANOMALY_RULES)
+    return _ANOMALY_RULES
+
+
+def journal_fingerprint(krm_pdf: Path, findeks_pdf: Optional[Path] = None, rules: Optional[AnomalyRuleSet] = None) -> str:
+    """
+    Journal anahtarı için ucuz kimlik: PDF'lerin (boyut, mtime) bilgisi ve kural sürümü.
+
+    Dosyalar okunmaz ve özetlenmez (yalnızca stat); PDF değişirse boyutu
+    veya mtime'ı da değişir ve rapor --resume'da yeniden işlenir.
+
+    Raises:
+        OSError: Dosyalardan biri stat edilemezse
+    """
+    rules = rules or get_anomaly_rules()
+    parts = []
+    for pdf in (krm_pdf, findeks_pdf):
+        if pdf is None:
+            parts.append('-')
+        else:
+            st = pdf.stat()
+            parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+    parts.append(rules.version)
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def find_anomalies(limits: Dict[str, Dict[str, Any]], risks: Dict[str, Dict[str, Any]], rules: Optional[AnomalyRuleSet] = None) -> List[Dict[str, Any]]:
+    """
     Tutarsızlıkları ve sorunları tespit et.
 
     Args:
         limits: Limit bilgileri dict'i
         risks: Risk bilgileri dict'i
+        rules: Kural kümesi (varsayılan: etkin kurallar, bkz. load_anomaly_rules)
 
     Returns:
         Anomali dict'lerinin listesi (severity'ye göre sıralı)
     """
+    rules = rules or get_anomaly_rules()
     anomalies: List[Dict[str, Any]] = []
-    all_sources = set(list(limits.keys()) + list(risks.keys()))
 
-    for kaynak in all_sources:
+    for kaynak in list(limits) + [k for k in risks if k not in limits]:
         limit_data = limits.get(kaynak, {})
         risk_data = risks.get(kaynak, {})
 
-        grup_limit = limit_data.get('grup', 0)
-        nakdi_limit = limit_data.get('nakdi', 0)
-        nakdi_risk = risk_data.get('nakdi', 0)
-        gayrinakdi_limit = limit_data.get('gayrinakdi', 0)
-        gayrinakdi_risk = risk_data.get('gayrinakdi', 0)
         toplam_limit = limit_data.get('toplam', 0)
         toplam_risk = risk_data.get('toplam', 0)
-        gecikme = risk_data.get('gecikme', 0)
 
-        # 1. Nakdi limit aşımı
-        if nakdi_risk > nakdi_limit and nakdi_limit > 0:
-            asim = nakdi_risk - nakdi_limit
+        env = {
+            'grup_limit': limit_data.get('grup', 0),
+            'nakdi_limit': limit_data.get('nakdi', 0),
+            'gayrinakdi_limit': limit_data.get('gayrinakdi', 0),
+            'toplam_limit': toplam_limit,
+            'nakdi_risk': risk_data.get('nakdi', 0),
+            'gayrinakdi_risk': risk_data.get('gayrinakdi', 0),
+            'toplam_risk': toplam_risk,
+            'gecikme': risk_data.get('gecikme', 0),
+            'kullanim': (toplam_risk / toplam_limit) * 100 if toplam_limit > 0 else 0,
+            'revize_gecmis': bool(limit_data.get('revize_gecmis', False)),
+        }
+        anomalies.extend(rules.evaluate(kaynak, env))
 
-            if toplam_limit > 0 and nakdi_risk <= toplam_limit:
-                anomalies.append({
-                    'kaynak': kaynak,
-                    'type': 'NAKDİ LİMİT YETERSİZ',
-                    'severity': 'WARNING',
-                    'detail': f'Nakdi risk ({nakdi_risk:,.0f}) nakdi limiti ({nakdi_limit:,.0f}) aşıyor, ancak toplam limit ({toplam_limit:,.0f}) yeterli. Nakdi aşım: {asim:,.0f} TL',
-                    'value': asim
-                })
-            else:
-                anomalies.append({
-                    'kaynak': kaynak,
-                    'type': 'NAKDİ LİMİT AŞIMI',
-                    'severity': 'CRITICAL',
-                    'detail': f'Nakdi risk ({nakdi_risk:,.0f}) nakdi limiti ({nakdi_limit:,.0f}) aşıyor. Aşım: {asim:,.0f} TL',
-                    'value': asim
-                })
+    return sorted(anomalies, key=lambda x: (0 if x['severity'] == 'CRITICAL' else 1, x['kaynak']))
 
-        # 2. Gayrinakdi limit aşımı
-        if gayrinakdi_risk > gayrinakdi_limit and gayrinakdi_limit > 0:
-            asim = gayrinakdi_risk - gayrinakdi_limit
+# ========================================
+# SÜTUNSAL (VEKTÖREL) ANOMALİ TARAMASI
+# ========================================
 
-            if toplam_limit > 0 and gayrinakdi_risk > toplam_limit:
-                asim_genel = gayrinakdi_risk - toplam_limit
-                anomalies.append({
-                    'kaynak': kaynak,
-                    'type': 'GAYRİNAKDİ LİMİT AŞIMI',
-                    'severity': 'CRITICAL',
-                    'detail': f'Gayrinakdi risk ({gayrinakdi_risk:,.0f}) hem gayrinakdi limiti ({gayrinakdi_limit:,.0f}) hem de genel limiti ({toplam_limit:,.0f}) aşıyor. Genel limit aşımı: {asim_genel:,.0f} TL',
-                    'value': asim_genel
-                })
-            else:
-                anomalies.append({
-                    'kaynak': kaynak,
-                    'type': 'GAYRİNAKDİ LİMİT AŞIMI',
-                    'severity': 'WARNING',
-                    'detail': f'Gayrinakdi risk ({gayrinakdi_risk:,.0f}) gayrinakdi limiti ({gayrinakdi_limit:,.0f}) aşıyor ama genel limit ({toplam_limit:,.0f}) içinde. Gayrinakdi aşım: {asim:,.0f} TL',
-                    'value': asim
-                })
+class SourceColumns:
+    """
+    Bir grup raporun tüm kaynaklarını sütunlar halinde tutar.
 
-        # 3. Limitsiz kullanım
-        if toplam_risk > 0 and toplam_limit == 0:
-            anomalies.append({
-                'kaynak': kaynak,
-                'type': 'LIMITSIZ KULLANIM',
-                'severity': 'CRITICAL',
-                'detail': f'Limit olmadan {toplam_risk:,.0f} TL risk taşınıyor',
-                'value': toplam_risk
-            })
+    Her satır bir (rapor, kaynak) çiftidir; sayısal alanlar numpy dizileri,
+    kaynak isimleri ve revize tarihleri düz listelerdir.
+    """
 
-        # 4. Gecikme
-        if gecikme > 0:
-            anomalies.append({
-                'kaynak': kaynak,
-                'type': 'GECIKME',
-                'severity': 'CRITICAL' if gecikme > CRITICAL_DELAY_DAYS else 'WARNING',
-                'detail': f'{gecikme} gun gecikme var',
-                'value': gecikme
-            })
+    __slots__ = (
+        'report_idx', 'kaynak', 'revize_tarihi', 'in_limits', 'grup_limit',
+        'nakdi_limit', 'gayrinakdi_limit', 'toplam_limit', 'revize_gecmis',
+        'nakdi_risk', 'gayrinakdi_risk', 'toplam_risk', 'gecikme', 'report_count',
+    )
 
-        # 5. Yüksek kullanım / Toplam limit aşımı
-        if toplam_limit > 0:
-            kullanim = (toplam_risk / toplam_limit) * 100
-            if kullanim > CRITICAL_USAGE_THRESHOLD:
-                asim = toplam_risk - toplam_limit
-                anomalies.append({
-                    'kaynak': kaynak,
-                    'type': 'TOPLAM LIMIT ASIMI',
-                    'severity': 'CRITICAL',
-                    'detail': f'Toplam risk ({toplam_risk:,.0f}) toplam limiti ({toplam_limit:,.0f}) asiyor. Asim: {asim:,.0f} TL (%{kullanim:.1f} kullanim)',
-                    'value': asim
-                })
-            elif kullanim > HIGH_USAGE_THRESHOLD:
-                anomalies.append({
-                    'kaynak': kaynak,
-                    'type': 'YUKSEK KULLANIM',
-                    'severity': 'WARNING',
-                    'detail': f'%{kullanim:.1f} kullanim (Risk: {toplam_risk:,.0f} / Limit: {toplam_limit:,.0f})',
-                    'value': kullanim
-                })
+    def __init__(self, reports: List[Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]]):
+        import numpy as np
+
+        report_idx: List[int] = []
+        kaynak: List[str] = []
+        revize_tarihi: List[Optional[datetime]] = []
+        numeric: List[Tuple[float, ...]] = []
+
+        for i, (limits, risks) in enumerate(reports):
+            for name in list(limits) + [k for k in risks if k not in limits]:
+                limit_data = limits.get(name, {})
+                risk_data = risks.get(name, {})
+                report_idx.append(i)
+                kaynak.append(name)
+                revize_tarihi.append(limit_data.get('revize_tarihi'))
+                numeric.append((
+                    name in limits,
+                    limit_data.get('grup', 0),
+                    limit_data.get('nakdi', 0),
+                    limit_data.get('gayrinakdi', 0),
+                    limit_data.get('toplam', 0),
+                    bool(limit_data.get('revize_gecmis', False)),
+                    risk_data.get('nakdi', 0),
+                    risk_data.get('gayrinakdi', 0),
+                    risk_data.get('toplam', 0),
+                    risk_data.get('gecikme', 0),
+                ))
+
+        table = np.array(numeric, dtype=np.float64).reshape(-1, 10)
+        self.report_count = len(reports)
+        self.report_idx = np.array(report_idx, dtype=np.int64)
+        self.kaynak = kaynak
+        self.revize_tarihi = revize_tarihi
+        self.in_limits = table[:, 0] > 0
+        self.grup_limit = table[:, 1]
+        self.nakdi_limit = table[:, 2]
+        self.gayrinakdi_limit = table[:, 3]
+        self.toplam_limit = table[:, 4]
+        self.revize_gecmis = table[:, 5] > 0
+        self.nakdi_risk = table[:, 6]
+        self.gayrinakdi_risk = table[:, 7]
+        self.toplam_risk = table[:, 8]
+        self.gecikme = table[:, 9]
+
+    def __len__(self) -> int:
+        return len(self.kaynak)
+
+    def env(self) -> Dict[str, Any]:
+        """Kural ifadeleri için sütun ortamı (kullanim dahil)."""
+        import numpy as np
+
+        has_limit = self.toplam_limit > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kullanim = np.where(has_limit, (self.toplam_risk / np.where(has_limit, self.toplam_limit, 1)) * 100, 0.0)
+        env = {name: getattr(self, name) for name in ANOMALY_RULE_FIELDS if name != 'kullanim'}
+        env['kullanim'] = kullanim
+        return env
+
+    def row_env(self, row: int) -> Dict[str, Any]:
+        """Tek satırın skaler ortamı (find_anomalies() ile aynı tipler)."""
+        toplam_limit = float(self.toplam_limit[row])
+        toplam_risk = float(self.toplam_risk[row])
+        return {
+            'grup_limit': float(self.grup_limit[row]),
+            'nakdi_limit': float(self.nakdi_limit[row]),
+            'gayrinakdi_limit': float(self.gayrinakdi_limit[row]),
+            'toplam_limit': toplam_limit,
+            'nakdi_risk': float(self.nakdi_risk[row]),
+            'gayrinakdi_risk': float(self.gayrinakdi_risk[row]),
+            'toplam_risk': toplam_risk,
+            'gecikme': int(self.gecikme[row]),
+            'kullanim': (toplam_risk / toplam_limit) * 100 if toplam_limit > 0 else 0,
+            'revize_gecmis': bool(self.revize_gecmis[row]),
+        }
 
-    return sorted(anomalies, key=lambda x: (0 if x['severity'] == 'CRITICAL' else 1, x['kaynak']))
+
+class AnomalyHits:
+    """
+    screen_anomalies() sonucu: yalnızca bulgu satırlarının indeksleri ve kural sıraları.
+
+    Detay metinleri to_lists() çağrılana kadar üretilmez; sayımlar için
+    string formatlamaya gerek yoktur.
+    """
+
+    __slots__ = ('columns', 'rules', 'row', 'rule', 'critical', 'value')
+
+    def __init__(self, columns: SourceColumns, rules: AnomalyRuleSet, row, rule, critical, value):
+        self.columns = columns
+        self.rules = rules
+        self.row = row
+        self.rule = rule
+        self.critical = critical
+        self.value = value
+
+    def __len__(self) -> int:
+        return len(self.row)
+
+    def counts(self) -> Tuple[int, int]:
+        """(kritik, uyarı) bulgu sayıları."""
+        critical = int(self.critical.sum())
+        return critical, len(self.row) - critical
+
+    def counts_by_report(self):
+        """Rapor başına (kritik, uyarı) sayıları: iki numpy dizisi."""
+        import numpy as np
+
+        report = self.columns.report_idx[self.row]
+        n = self.columns.report_count
+        critical = np.bincount(report[self.critical], minlength=n)
+        warning = np.bincount(report[~self.critical], minlength=n)
+        return critical, warning
+
+    def render(self, i: int) -> Dict[str, Any]:
+        """i. bulgunun find_anomalies() ile aynı yapıdaki dict'i."""
+        row = int(self.row[i])
+        env = self.columns.row_env(row)
+        env.update(self.rules.thresholds)
+        return self.rules.rules[int(self.rule[i])].build(self.columns.kaynak[row], env)
+
+    def to_lists(self) -> List[List[Dict[str, Any]]]:
+        """Rapor başına anomali listeleri (find_anomalies() ile aynı sıralama)."""
+        c = self.columns
+        per_report: List[List[Tuple[int, str, int, int]]] = [[] for _ in range(c.report_count)]
+        for i in range(len(self.row)):
+            row = int(self.row[i])
+            per_report[int(c.report_idx[row])].append(
+                (0 if self.critical[i] else 1, c.kaynak[row], int(self.rule[i]), i)
+            )
+
+        lists: List[List[Dict[str, Any]]] = []
+        for hits in per_report:
+            hits.sort()
+            lists.append([self.render(i) for _, _, _, i in hits])
+        return lists
+
+
+def screen_anomalies(columns: SourceColumns, rules: Optional[AnomalyRuleSet] = None) -> AnomalyHits:
+    """
+    Anomali kurallarını tüm sütunlara tek seferde maske olarak uygula.
+
+    Args:
+        columns: SourceColumns (bir veya çok raporun kaynakları)
+        rules: Kural kümesi (varsayılan: etkin kurallar)
+
+    Returns:
+        AnomalyHits (yalnızca bulgu satırları; detay metinleri tembel)
+    """
+    import numpy as np
+
+    rules = rules or get_anomaly_rules()
+    env = columns.env()
+    env.update(rules.thresholds)
+    env['__mask__'] = lambda x: np.asarray(x) != 0
+    env['__div__'] = _rule_divide_vector
+    n = len(columns)
+
+    rows, codes, critical, values = [], [], [], []
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for code, rule in enumerate(rules.rules):
+            idx = np.flatnonzero(np.broadcast_to(rule.mask(env), (n,)))
+            rows.append(idx)
+            codes.append(np.full(len(idx), code, dtype=np.int16))
+            critical.append(np.full(len(idx), rule.severity == 'CRITICAL'))
+            values.append(np.broadcast_to(np.asarray(rule.values(env), dtype=np.float64), (n,))[idx])
+
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return AnomalyHits(columns, rules, empty, empty, empty.astype(bool), empty.astype(np.float64))
+
+    return AnomalyHits(
+        columns,
+        rules,
+        np.concatenate(rows),
+        np.concatenate(codes),
+        np.concatenate(critical).astype(bool),
+        np.concatenate(values),
+    )
+
+
+def find_anomalies_batch(reports: List[Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]], rules: Optional[AnomalyRuleSet] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Birden çok raporun anomalilerini tek vektörel geçişte bul.
+
+    numpy yoksa her rapor için find_anomalies() çağrılır; sonuç aynıdır.
+
+    Args:
+        reports: (limits, risks) çiftlerinin listesi
+        rules: Kural kümesi (varsayılan: etkin kurallar)
+
+    Returns:
+        Rapor başına anomali listeleri (girdi sırasıyla)
+    """
+    try:
+        columns = SourceColumns(reports)
+    except ImportError:
+        return [find_anomalies(limits, risks, rules) for limits, risks in reports]
+
+    return screen_anomalies(columns, rules).to_lists()
 
 def create_status_table(steps: List[Tuple[str, bool]], current_step: str) -> Table:
     """Live status için tablo oluştur."""
@@ -1535,9 +3818,11 @@ def analyze_report(pdf_path: Path, findeks_pdf: Optional[Path] = None) -> Dict[s
     # Live display olmadan hızlı analiz yap
     # (Progress bar içinde zaten gösterge var, burada ek overhead istemiyoruz)
     try:
-        with pdfplumber.open(pdf_path) as pdf:
+        with open_pdfplumber(pdf_path) as pdf:
+            check_page_count(len(pdf.pages))
             company_name, report_date = parse_header(pdf)
-            limits, risks = parse_tables(pdf)
+            issues = ParseIssues()
+            limits, risks = parse_tables(pdf, issues=issues)
 
             passive_sources = identify_passive_sources(limits, risks)
 
@@ -1553,9 +3838,9 @@ def analyze_report(pdf_path: Path, findeks_pdf: Optional[Path] = None) -> Dict[s
             findeks_matches = []
             if findeks_pdf and findeks_pdf.exists():
                 try:
-                    findeks_data = extract_findeks_data(findeks_pdf)
-                    if findeks_data:
-                        findeks_matches = find_best_matches(active_limits, active_risks, findeks_data)
+                    findeks_index = get_findeks_index(findeks_pdf)
+                    if findeks_index:
+                        findeks_matches = find_best_matches(active_limits, active_risks, findeks_index)
                 except Exception as e:
                     pass  # Sessizce devam et
 
@@ -1569,6 +3854,8 @@ def analyze_report(pdf_path: Path, findeks_pdf: Optional[Path] = None) -> Dict[s
                 'passive_sources': passive_sources,
                 'anomalies': anomalies,
                 'findeks_matches': findeks_matches,
+                'rules_version': get_anomaly_rules().version,
+                'parse_issues': issues.to_dict(),
                 'analysis_date': datetime.now().strftime('%d.%m.%Y %H:%M'),
                 'success': True
             }
@@ -1576,7 +3863,7 @@ def analyze_report(pdf_path: Path, findeks_pdf: Optional[Path] = None) -> Dict[s
         return {
             'pdf_name': pdf_path.name,
             'success': False,
-            'error': str(e)
+            'error': str(e) or type(e).__name__
         }
 
 def analyze_report_with_live_status(pdf_path: Path, findeks_pdf: Optional[Path] = None, show_live: bool = False) -> Dict[str, Any]:
@@ -1636,7 +3923,8 @@ def analyze_report_with_live_status(pdf_path: Path, findeks_pdf: Optional[Path]
             # Adım 0: PDF Açma
             update_layout(0)
             time.sleep(0.3)
-            with pdfplumber.open(pdf_path) as pdf:
+            with open_pdfplumber(pdf_path) as pdf:
+                check_page_count(len(pdf.pages))
 
                 # Adım 1: Header
                 update_layout(1)
@@ -1646,7 +3934,8 @@ def analyze_report_with_live_status(pdf_path: Path, findeks_pdf: Optional[Path]
                 # Adım 2-3: Tablolar
                 update_layout(2)
                 time.sleep(0.3)
-                limits, risks = parse_tables(pdf)
+                issues = ParseIssues()
+                limits, risks = parse_tables(pdf, issues=issues)
                 update_layout(3)
                 time.sleep(0.2)
 
@@ -1672,9 +3961,9 @@ def analyze_report_with_live_status(pdf_path: Path, findeks_pdf: Optional[Path]
                     update_layout(6)
                     time.sleep(0.3)
                     try:
-                        findeks_data = extract_findeks_data(findeks_pdf)
-                        if findeks_data:
-                            findeks_matches = find_best_matches(active_limits, active_risks, findeks_data)
+                        findeks_index = get_findeks_index(findeks_pdf)
+                        if findeks_index:
+                            findeks_matches = find_best_matches(active_limits, active_risks, findeks_index)
                     except:
                         pass
 
@@ -1692,6 +3981,8 @@ def analyze_report_with_live_status(pdf_path: Path, findeks_pdf: Optional[Path]
             'passive_sources': passive_sources,
             'anomalies': anomalies,
             'findeks_matches': findeks_matches,
+            'rules_version': get_anomaly_rules().version,
+            'parse_issues': issues.to_dict(),
             'analysis_date': datetime.now().strftime('%d.%m.%Y %H:%M'),
             'success': True
         }
@@ -1699,215 +3990,295 @@ def analyze_report_with_live_status(pdf_path: Path, findeks_pdf: Optional[Path]
         return {
             'pdf_name': pdf_path.name,
             'success': False,
-            'error': str(e)
+            'error': str(e) or type(e).__name__
         }
 
-def format_number(num: float) -> str:
-    """
-    Sayıyı Türkçe formatta formatla.
+# ========================================
+# PYTHON API (TİPLİ SONUÇ NESNELERİ)
+# ========================================
 
-    Args:
-        num: Formatlanacak sayı
+# Satır kayıtları NamedTuple'dır: değiştirilemez, örnek başına __dict__ yok,
+# worker süreçlerine ucuz pickle'lanır ve PdfBuffer/OcrPage gibi diğer
+# kayıtlarla aynı tuple açma alışkanlığını korur. Doldurulup taşınan
+# KrmReport ise değiştirilebilir bir dataclass'tır.
+
+class LimitRecord(NamedTuple):
+    """Bir kaynağın KRM limit satırı (analyze_report()['limits'][kaynak] karşılığı)."""
+    grup: float = 0.0
+    nakdi: float = 0.0
+    gayrinakdi: float = 0.0
+    toplam: float = 0.0
+    revize_tarihi: Optional[datetime] = None
+    revize_gecmis: Optional[bool] = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LimitRecord':
+        return cls(
+            data.get('grup', 0),
+            data.get('nakdi', 0),
+            data.get('gayrinakdi', 0),
+            data.get('toplam', 0),
+            data.get('revize_tarihi'),
+            data.get('revize_gecmis', False),
+        )
 
-    Returns:
-        Türkçe format string (nokta ayırıcılı)
+
+class RiskRecord(NamedTuple):
+    """Bir kaynağın KRM risk satırı (analyze_report()['risks'][kaynak] karşılığı)."""
+    nakdi: float = 0.0
+    gayrinakdi: float = 0.0
+    toplam: float = 0.0
+    gecikme: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RiskRecord':
+        return cls(
+            data.get('nakdi', 0),
+            data.get('gayrinakdi', 0),
+            data.get('toplam', 0),
+            data.get('gecikme', 0),
+        )
+
+
+_EMPTY_LIMIT = LimitRecord()
+_EMPTY_RISK = RiskRecord()
+
+
+class SourceRecord(NamedTuple):
     """
-    return f"{num:,.0f}".replace(',', '.')
+    KRM'deki bir kaynak (banka/faktoring/leasing): limit + risk + durum.
 
-def generate_pdf(result: Dict[str, Any], output_dir: Path) -> Path:
+    limit/risk, kaynak ilgili tabloda yoksa None'dır; `limits`/`risks`
+    özellikleri bu durumda sıfır değerli kayıt döndürür.
     """
-    PDF rapor oluştur.
+    kaynak: str
+    limit: Optional[LimitRecord] = None
+    risk: Optional[RiskRecord] = None
+    passive: bool = False
+
+    @property
+    def limits(self) -> LimitRecord:
+        return self.limit if self.limit is not None else _EMPTY_LIMIT
+
+    @property
+    def risks(self) -> RiskRecord:
+        return self.risk if self.risk is not None else _EMPTY_RISK
+
+    @property
+    def usage(self) -> float:
+        """Toplam risk / toplam limit (%); limit yoksa 0."""
+        toplam_limit = self.limits.toplam
+        return (self.risks.toplam / toplam_limit * 100) if toplam_limit > 0 else 0.0
+
+
+class AnomalyRecord(NamedTuple):
+    """find_anomalies() çıktısındaki tek bir bulgu."""
+    kaynak: str
+    type: str
+    severity: str
+    detail: str
+    value: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AnomalyRecord':
+        return cls(data['kaynak'], data['type'], data['severity'], data['detail'], data['value'])
+
+
+class MatchRecord(NamedTuple):
+    """find_best_matches() çıktısındaki KRM kaynağı ↔ Findeks kurumu eşleşmesi."""
+    krm_kaynak: str
+    findeks_kurum: str
+    findeks_sayfa: int
+    score: float
+    confidence: str
+    krm_data: Dict[str, Any]
+    findeks_data: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MatchRecord':
+        return cls(
+            data['krm_kaynak'],
+            data['findeks_kurum'],
+            data['findeks_sayfa'],
+            data['score'],
+            data['confidence'],
+            data.get('krm_data', {}),
+            data.get('findeks_data', {}),
+        )
 
-    Args:
-        result: analyze_report() fonksiyonundan dönen sonuç dict'i
-        output_dir: PDF'in kaydedileceği dizin
 
-    Returns:
-        Oluşturulan PDF dosyasının Path'i
+@dataclass
+class KrmReport:
     """
-    def create_heading(text: str, font_bold: str) -> RLTable:
-        """Türkçe karakterli başlık oluştur (Paragraph yerine Table kullan)"""
-        heading = RLTable([[text]], colWidths=[17*cm])
-        heading.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, 0), font_bold),
-            ('FONTSIZE', (0, 0), (0, 0), 14),
-            ('TEXTCOLOR', (0, 0), (0, 0), colors.HexColor('#1a1a1a')),
-            ('BOTTOMPADDING', (0, 0), (0, 0), 10),
-        ]))
-        return heading
+    Tek bir KRM raporunun tipli analiz sonucu.
 
-    pdf_filename = Path(result['pdf_name']).stem + '.pdf'
-    pdf_path = output_dir / pdf_filename
-
-    doc = SimpleDocTemplate(
-        str(pdf_path),
-        pagesize=A4,
-        rightMargin=2*cm,
-        leftMargin=2*cm,
-        topMargin=2*cm,
-        bottomMargin=2*cm
-    )
+    analyze_report()'un döndürdüğü dict ile birebir çevrilebilir:
+        KrmReport.from_dict(result).to_dict() == result (kaynak sıraları hariç)
+    """
+    pdf_name: str
+    success: bool = True
+    error: Optional[str] = None
+    company_name: str = ''
+    report_date: str = ''
+    analysis_date: str = ''
+    sources: Dict[str, SourceRecord] = field(default_factory=dict)
+    anomalies: List[AnomalyRecord] = field(default_factory=list)
+    matches: List[MatchRecord] = field(default_factory=list)
+    rules_version: Optional[str] = None
+    parse_issues: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def active_sources(self) -> List[SourceRecord]:
+        return [s for s in self.sources.values() if not s.passive]
+
+    @property
+    def passive_sources(self) -> List[SourceRecord]:
+        return [s for s in self.sources.values() if s.passive]
+
+    @property
+    def critical(self) -> List[AnomalyRecord]:
+        return [a for a in self.anomalies if a.severity == 'CRITICAL']
+
+    @property
+    def warnings(self) -> List[AnomalyRecord]:
+        return [a for a in self.anomalies if a.severity == 'WARNING']
+
+    @classmethod
+    def from_dict(cls, result: Dict[str, Any]) -> 'KrmReport':
+        """analyze_report() sonucundan KrmReport oluştur."""
+        if not result.get('success'):
+            return cls(pdf_name=result['pdf_name'], success=False, error=result.get('error'))
+
+        limits = result['limits']
+        risks = result['risks']
+        passive = set(result['passive_sources'])
+
+        sources: Dict[str, SourceRecord] = {}
+        for kaynak in list(limits) + [k for k in risks if k not in limits]:
+            sources[kaynak] = SourceRecord(
+                kaynak,
+                LimitRecord.from_dict(limits[kaynak]) if kaynak in limits else None,
+                RiskRecord.from_dict(risks[kaynak]) if kaynak in risks else None,
+                kaynak in passive,
+            )
 
-    story = []
-    styles = getSampleStyleSheet()
+        return cls(
+            pdf_name=result['pdf_name'],
+            success=True,
+            company_name=result['company_name'],
+            report_date=result['report_date'],
+            analysis_date=result['analysis_date'],
+            sources=sources,
+            anomalies=[AnomalyRecord.from_dict(a) for a in result['anomalies']],
+            matches=[MatchRecord.from_dict(m) for m in result.get('findeks_matches', [])],
+            rules_version=result.get('rules_version'),
+            parse_issues=result.get('parse_issues', {}),
+        )
 
-    # Türkçe font desteği için font adını belirle
-    try:
-        registered_fonts = pdfmetrics.getRegisteredFontNames()
-        if 'DejaVuSans' in registered_fonts:
-            font_name = 'DejaVuSans'
-            font_name_bold = 'DejaVuSans-Bold'
-        else:
-            # Fallback to Helvetica (Türkçe karakterler düzgün görüntülenmeyebilir)
-            font_name = 'Helvetica'
-            font_name_bold = 'Helvetica-Bold'
-            console.print("[yellow]⚠ DejaVu Sans yüklenmedi, Helvetica kullanılıyor[/yellow]")
-    except:
-        font_name = 'Helvetica'
-        font_name_bold = 'Helvetica-Bold'
-
-    # Başlık
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontName=font_name_bold,
-        fontSize=18,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
+    def to_dict(self) -> Dict[str, Any]:
+        """analyze_report() ile aynı yapıda dict'e çevir (PDF/Excel üreticileri için)."""
+        if not self.success:
+            return {'pdf_name': self.pdf_name, 'success': False, 'error': self.error}
 
-    # Başlık - Table kullan (Paragraph İ harfini yutuyor)
-    baslik_table = RLTable([["KRM Analiz Raporu"]], colWidths=[17*cm])
-    baslik_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, 0), font_name_bold),
-        ('FONTSIZE', (0, 0), (0, 0), 18),
-        ('TEXTCOLOR', (0, 0), (0, 0), colors.HexColor('#1a1a1a')),
-        ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-        ('BOTTOMPADDING', (0, 0), (0, 0), 20),
-    ]))
-    story.append(baslik_table)
-    story.append(Spacer(1, 0.5*cm))
+        return {
+            'pdf_name': self.pdf_name,
+            'company_name': self.company_name,
+            'report_date': self.report_date,
+            'limits': {k: s.limit.to_dict() for k, s in self.sources.items() if s.limit is not None},
+            'risks': {k: s.risk.to_dict() for k, s in self.sources.items() if s.risk is not None},
+            'active_sources': [k for k, s in self.sources.items() if not s.passive],
+            'passive_sources': [k for k, s in self.sources.items() if s.passive],
+            'anomalies': [a.to_dict() for a in self.anomalies],
+            'findeks_matches': [m.to_dict() for m in self.matches],
+            'rules_version': self.rules_version,
+            'parse_issues': self.parse_issues,
+            'analysis_date': self.analysis_date,
+            'success': True
+        }
 
-    # Genel Bilgiler
-    info_data = [
-        ['Firma:', result['company_name']],
-        ['Rapor Tarihi:', result['report_date']],
-        ['Analiz Tarihi:', result['analysis_date']],
-        ['Kaynak Dosya:', result['pdf_name']]
-    ]
 
-    info_table = RLTable(info_data, colWidths=[4*cm, 13*cm])
-    info_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), font_name_bold),
-        ('FONTNAME', (1, 0), (1, -1), font_name),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
+def analyze(pdf_path: Any, findeks_pdf: Any = None) -> KrmReport:
+    """
+    KRM raporunu analiz et ve tipli sonuç döndür (CLI'sız kullanım için).
 
-    story.append(info_table)
-    story.append(Spacer(1, 0.8*cm))
+    Örnek:
+        >>> from krm import analyze
+        >>> report = analyze("Firma_A/KRM_2024.pdf")
+        >>> for a in report.critical:
+        ...     print(a.kaynak, a.type, a.value)
 
-    # Özet İstatistikler
-    story.append(create_heading("Özet İstatistikler", font_name_bold))
-    story.append(Spacer(1, 0.3*cm))
+    Args:
+        pdf_path: KRM PDF yolu (str veya Path)
+        findeks_pdf: Opsiyonel Findeks PDF yolu
 
-    total_sources = len(result['active_sources']) + len(result['passive_sources'])
-    active_count = len(result['active_sources'])
-    passive_count = len(result['passive_sources'])
-    total_anomalies = len(result['anomalies'])
-    critical_count = len([a for a in result['anomalies'] if a['severity'] == 'CRITICAL'])
-    warning_count = len([a for a in result['anomalies'] if a['severity'] == 'WARNING'])
+    Returns:
+        KrmReport (hata durumunda success=False ve error dolu)
+    """
+    findeks_path = Path(findeks_pdf) if findeks_pdf is not None else None
+    return KrmReport.from_dict(analyze_report(Path(pdf_path), findeks_path))
 
-    stats_data = [
-        ['Toplam Kaynak:', str(total_sources)],
-        ['Aktif Kaynak:', str(active_count)],
-        ['Pasif Kaynak:', str(passive_count)],
-        ['Tespit Edilen Sorun:', str(total_anomalies)],
-        ['Kritik Sorunlar:', str(critical_count)],
-        ['Uyarılar:', str(warning_count)]
-    ]
 
-    stats_table = RLTable(stats_data, colWidths=[6*cm, 6*cm])
-    stats_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f4f8')),
-        ('BACKGROUND', (1, 4), (1, 4), colors.HexColor('#ffe6e6') if critical_count > 0 else colors.white),
-        ('BACKGROUND', (1, 5), (1, 5), colors.HexColor('#fff9e6') if warning_count > 0 else colors.white),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('FONTNAME', (0, 0), (0, -1), font_name_bold),
-        ('FONTNAME', (1, 0), (1, -1), font_name),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
+def format_number(num: float) -> str:
+    """
+    Sayıyı Türkçe formatta formatla.
 
-    story.append(stats_table)
-    story.append(Spacer(1, 0.8*cm))
+    Args:
+        num: Formatlanacak sayı
 
-    # Pasif Kaynaklar
-    if result['passive_sources']:
-        story.append(create_heading(f"Pasif Kaynaklar ({passive_count})", font_name_bold))
-        story.append(Spacer(1, 0.3*cm))
+    Returns:
+        Türkçe format string (nokta ayırıcılı)
+    """
+    return f"{num:,.0f}".replace(',', '.')
 
-        passive_data = [['Kaynak', 'Son Revize', 'Grup Limit', 'Toplam Limit', 'Durum']]
 
-        for kaynak in sorted(result['passive_sources']):
-            limit_data = result['limits'].get(kaynak, {})
-            revize_tarihi = limit_data.get('revize_tarihi')
-            revize_str = revize_tarihi.strftime('%d/%m/%Y') if revize_tarihi else 'Bilinmiyor'
+# ========================================
+# PDF ŞABLON VE LAYOUT FONKSİYONLARI
+# ========================================
 
-            grup_limit = limit_data.get('grup', 0)
-            toplam_limit = limit_data.get('toplam', 0)
+class ReportTemplate:
+    """
+    PDF rapor şablonu: font, paragraf stilleri ve statik tablo stilleri.
 
-            passive_data.append([
-                kaynak,
-                revize_str,
-                format_number(grup_limit),
-                format_number(toplam_limit),
-                'Pasif'
-            ])
+    Süreç başına bir kez kurulur ve tüm raporlarda tekrar kullanılır
+    (getSampleStyleSheet, ParagraphStyle ve TableStyle nesneleri her rapor
+    için yeniden oluşturulmaz).
+    """
 
-        passive_table = RLTable(passive_data, colWidths=[2.5*cm, 2.5*cm, 3*cm, 3*cm, 2*cm])
-        passive_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#d9d9d9')),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f5f5f5')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('FONTNAME', (0, 0), (-1, 0), font_name_bold),
-            ('FONTNAME', (0, 1), (-1, -1), font_name),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ALIGN', (2, 1), (3, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 5),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-            ('TOPPADDING', (0, 0), (-1, -1), 5),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-            ('WORDWRAP', (0, 0), (-1, -1), True),
-        ]))
+    def __init__(self) -> None:
+        # Türkçe font desteği için font adını belirle
+        try:
+            registered_fonts = pdfmetrics.getRegisteredFontNames()
+            if 'DejaVuSans' in registered_fonts:
+                self.font_name = 'DejaVuSans'
+                self.font_name_bold = 'DejaVuSans-Bold'
+            else:
+                # Fallback to Helvetica (Türkçe karakterler düzgün görüntülenmeyebilir)
+                self.font_name = 'Helvetica'
+                self.font_name_bold = 'Helvetica-Bold'
+                console.print("[yellow]⚠ DejaVu Sans yüklenmedi, Helvetica kullanılıyor[/yellow]")
+        except:
+            self.font_name = 'Helvetica'
+            self.font_name_bold = 'Helvetica-Bold'
 
-        story.append(passive_table)
-        story.append(Spacer(1, 0.8*cm))
+        font_name = self.font_name
+        font_name_bold = self.font_name_bold
 
-    # Kritik Sorunlar - Paragraph ile wordwrap
-    critical = [a for a in result['anomalies'] if a['severity'] == 'CRITICAL']
-    if critical:
-        story.append(create_heading("Kritik Sorunlar", font_name_bold))
-        story.append(Spacer(1, 0.3*cm))
+        self.styles = getSampleStyleSheet()
 
-        # Paragraph için stil tanımla
-        critical_style = ParagraphStyle(
+        # Paragraph stilleri (kritik sorunlar / uyarılar)
+        self.critical_style = ParagraphStyle(
             'CriticalStyle',
             fontName=font_name,
             fontSize=10,
@@ -1917,28 +4288,7 @@ def generate_pdf(result: Dict[str, Any], output_dir: Path) -> Path:
             spaceBefore=0,
             spaceAfter=8,
         )
-
-        # Her sorun için Paragraph kullan (otomatik wordwrap)
-        for idx, a in enumerate(critical, 1):
-            # HTML karakterlerini escape et (& < > " ')
-            kaynak = a['kaynak'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-            atype = a['type'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-            detail = a['detail'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-
-            text = f"• {kaynak} - {atype}<br/>&nbsp;&nbsp;{detail}"
-            para = Paragraph(text, critical_style)
-            story.append(para)
-
-        story.append(Spacer(1, 0.5*cm))
-
-    # Uyarılar - Paragraph ile wordwrap
-    warnings = [a for a in result['anomalies'] if a['severity'] == 'WARNING']
-    if warnings:
-        story.append(create_heading("Uyarılar", font_name_bold))
-        story.append(Spacer(1, 0.3*cm))
-
-        # Paragraph için stil tanımla
-        warning_style = ParagraphStyle(
+        self.warning_style = ParagraphStyle(
             'WarningStyle',
             fontName=font_name,
             fontSize=10,
@@ -1949,39 +4299,258 @@ def generate_pdf(result: Dict[str, Any], output_dir: Path) -> Path:
             spaceAfter=8,
         )
 
-        # Her uyarı için Paragraph kullan (otomatik wordwrap)
-        for idx, a in enumerate(warnings, 1):
-            # HTML karakterlerini escape et (& < > " ')
-            kaynak = a['kaynak'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-            atype = a['type'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-            detail = a['detail'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        # Başlık - Table kullan (Paragraph İ harfini yutuyor)
+        self.title_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (0, 0), font_name_bold),
+            ('FONTSIZE', (0, 0), (0, 0), 18),
+            ('TEXTCOLOR', (0, 0), (0, 0), colors.HexColor('#1a1a1a')),
+            ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+            ('BOTTOMPADDING', (0, 0), (0, 0), 20),
+        ])
 
-            text = f"• {kaynak} - {atype}<br/>&nbsp;&nbsp;{detail}"
-            para = Paragraph(text, warning_style)
-            story.append(para)
+        self.heading_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (0, 0), font_name_bold),
+            ('FONTSIZE', (0, 0), (0, 0), 14),
+            ('TEXTCOLOR', (0, 0), (0, 0), colors.HexColor('#1a1a1a')),
+            ('BOTTOMPADDING', (0, 0), (0, 0), 10),
+        ])
 
-        story.append(Spacer(1, 0.5*cm))
+        self.info_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), font_name_bold),
+            ('FONTNAME', (1, 0), (1, -1), font_name),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ])
 
-    # Yeni sayfa - Detaylı Kaynak Bilgileri
-    story.append(PageBreak())
-    story.append(create_heading("Detaylı Aktif Kaynak Bilgileri", font_name_bold))
-    story.append(Spacer(1, 0.3*cm))
+        # Özet tablosu: kritik/uyarı hücre renkleri rapora göre ayrıca eklenir
+        self.stats_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f4f8')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('FONTNAME', (0, 0), (0, -1), font_name_bold),
+            ('FONTNAME', (1, 0), (1, -1), font_name),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ])
+
+        self.passive_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#d9d9d9')),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f5f5f5')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('FONTNAME', (0, 0), (-1, 0), font_name_bold),
+            ('FONTNAME', (0, 1), (-1, -1), font_name),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ALIGN', (2, 1), (3, -1), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 5),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+            ('TOPPADDING', (0, 0), (-1, -1), 5),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+            ('WORDWRAP', (0, 0), (-1, -1), True),
+        ])
+
+        # Detay tablosu: zebra şeritleri satır sayısına göre ayrıca eklenir
+        self.detail_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), font_name_bold),
+            ('FONTNAME', (0, 1), (-1, -1), font_name),
+            ('FONTSIZE', (0, 0), (-1, -1), 7),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 3),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+        ])
+        self.zebra_color = colors.HexColor('#f0f0f0')
+
+        # Footer - basit Table (Türkçe ı ve ş var ama footer önemli değil)
+        self.footer_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (0, 0), font_name),
+            ('FONTSIZE', (0, 0), (0, 0), 8),
+            ('TEXTCOLOR', (0, 0), (0, 0), colors.grey),
+            ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+        ])
+
+        self.critical_cell_color = colors.HexColor('#ffe6e6')
+        self.warning_cell_color = colors.HexColor('#fff9e6')
+
+        # Portföy raporu: içindekiler bağlantıları ve özet tabloları
+        self.toc_style = ParagraphStyle(
+            'TocStyle',
+            fontName=font_name,
+            fontSize=8,
+            leading=10,
+            textColor=colors.HexColor('#1f4e9c'),
+        )
+        self.anchor_style = ParagraphStyle(
+            'AnchorStyle',
+            fontName=font_name,
+            fontSize=1,
+            leading=1,
+        )
+        self.summary_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), font_name_bold),
+            ('FONTNAME', (0, 1), (-1, -1), font_name),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 4),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+        ])
+
+    def title(self, text: str) -> RLTable:
+        """Rapor ana başlığı (18pt, ortalı)."""
+        table = RLTable([[text]], colWidths=[17*cm])
+        table.setStyle(self.title_table_style)
+        return table
+
+    def heading(self, text: str) -> RLTable:
+        """Türkçe karakterli bölüm başlığı oluştur (Paragraph yerine Table kullan)"""
+        heading = RLTable([[text]], colWidths=[17*cm])
+        heading.setStyle(self.heading_table_style)
+        return heading
+
+    def footer(self, text: str) -> RLTable:
+        """Sayfa sonu bilgi satırı."""
+        table = RLTable([[text]], colWidths=[17*cm])
+        table.setStyle(self.footer_table_style)
+        return table
+
+    def new_document(self, pdf_path: Path) -> SimpleDocTemplate:
+        """Standart A4 / 2 cm kenar boşluklu doküman oluştur."""
+        return SimpleDocTemplate(
+            str(pdf_path),
+            pagesize=A4,
+            rightMargin=2*cm,
+            leftMargin=2*cm,
+            topMargin=2*cm,
+            bottomMargin=2*cm
+        )
+
+
+_REPORT_TEMPLATE: Optional[ReportTemplate] = None
+
+
+def get_report_template() -> ReportTemplate:
+    """
+    Süreç genelinde paylaşılan ReportTemplate'i döndür (ilk çağrıda oluşturulur).
+
+    Returns:
+        ReportTemplate objesi
+    """
+    global _REPORT_TEMPLATE
+    if _REPORT_TEMPLATE is None:
+        _REPORT_TEMPLATE = ReportTemplate()
+    return _REPORT_TEMPLATE
+
+
+def reset_report_template() -> None:
+    """Şablon önbelleğini temizle (font kaydı değiştiğinde çağrılır)."""
+    global _REPORT_TEMPLATE
+    _REPORT_TEMPLATE = None
+
+
+def escape_rl_text(text: str) -> str:
+    """ReportLab Paragraph için HTML karakterlerini escape et (& < >)."""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def format_delta(num: float) -> str:
+    """Değişimi işaretli Türkçe formatta göster (+1.000 / -500 / 0)."""
+    return ('+' if num > 0 else '') + format_number(num)
+
+
+def build_trend_rows(trend: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    HistoryStore.trend() satırlarını PDF tablosu satırlarına çevir.
+
+    Returns:
+        Başlık dahil satırlar (trend yoksa boş liste)
+    """
+    if not trend:
+        return []
+
+    rows = [['Kaynak', 'Önceki\nTarih', 'Tarih', 'Önceki\nLimit', 'Limit', 'Δ Limit', 'Önceki\nRisk', 'Risk', 'Δ Risk', 'Kul.\n%']]
+    for t in trend:
+        kaynak = f"{t['kaynak']} ({t['status']})" if t['status'] else t['kaynak']
+        rows.append([
+            kaynak,
+            format_history_date(t['from_date']),
+            format_history_date(t['to_date']),
+            format_number(t['limit_from']),
+            format_number(t['limit_to']),
+            format_delta(t['limit_delta']),
+            format_number(t['risk_from']),
+            format_number(t['risk_to']),
+            format_delta(t['risk_delta']),
+            f"{t['usage_to']:.1f}",
+        ])
+    return rows
+
+
+def build_report_layout(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    analyze_report() sonucundan PDF layout modelini çıkar (saf veri, ReportLab yok).
+
+    Tüm sayı formatlama, sıralama ve satır hazırlama burada yapılır; çizim
+    adımı (render_report_story) sadece bu modeli flowable'lara dönüştürür.
+
+    Args:
+        result: analyze_report() fonksiyonundan dönen sonuç dict'i
+
+    Returns:
+        Layout modeli dict'i
+    """
+    total_sources = len(result['active_sources']) + len(result['passive_sources'])
+    active_count = len(result['active_sources'])
+    passive_count = len(result['passive_sources'])
+    total_anomalies = len(result['anomalies'])
+
+    critical = [a for a in result['anomalies'] if a['severity'] == 'CRITICAL']
+    warnings = [a for a in result['anomalies'] if a['severity'] == 'WARNING']
+
+    # Pasif kaynak satırları
+    passive_rows = [['Kaynak', 'Son Revize', 'Grup Limit', 'Toplam Limit', 'Durum']]
+    for kaynak in sorted(result['passive_sources']):
+        limit_data = result['limits'].get(kaynak, {})
+        revize_tarihi = limit_data.get('revize_tarihi')
+        revize_str = revize_tarihi.strftime('%d/%m/%Y') if revize_tarihi else 'Bilinmiyor'
+
+        passive_rows.append([
+            kaynak,
+            revize_str,
+            format_number(limit_data.get('grup', 0)),
+            format_number(limit_data.get('toplam', 0)),
+            'Pasif'
+        ])
 
     # Findeks eşleştirmelerini dict'e çevir (hızlı erişim için)
     findeks_matches = result.get('findeks_matches', [])
     findeks_map = {match['krm_kaynak']: match['findeks_kurum'] for match in findeks_matches}
 
-    detail_data = [['Kaynak', 'Findeks\nKurum', 'Grup Limit', 'Nakdi\nLimit', 'Nakdi\nRisk', 'Gayri.\nLimit', 'Gayri.\nRisk', 'Top.\nLimit', 'Top.\nRisk', 'Kul.\n%', 'Vade']]
+    detail_rows = [['Kaynak', 'Findeks\nKurum', 'Grup Limit', 'Nakdi\nLimit', 'Nakdi\nRisk', 'Gayri.\nLimit', 'Gayri.\nRisk', 'Top.\nLimit', 'Top.\nRisk', 'Kul.\n%', 'Vade']]
 
     for kaynak in sorted(result['active_sources']):
         limit_data = result['limits'].get(kaynak, {})
         risk_data = result['risks'].get(kaynak, {})
 
-        grup_limit = limit_data.get('grup', 0)
-        nakdi_limit = limit_data.get('nakdi', 0)
-        nakdi_risk = risk_data.get('nakdi', 0)
-        gayrinakdi_limit = limit_data.get('gayrinakdi', 0)
-        gayrinakdi_risk = risk_data.get('gayrinakdi', 0)
         toplam_limit = limit_data.get('toplam', 0)
         toplam_risk = risk_data.get('toplam', 0)
 
@@ -1991,76 +4560,361 @@ def generate_pdf(result: Dict[str, Any], output_dir: Path) -> Path:
 
         kullanim = (toplam_risk / toplam_limit * 100) if toplam_limit > 0 else 0
 
-        # Findeks eşleştirmesini bul
-        findeks_kurum = findeks_map.get(kaynak, '-')
-
-        detail_data.append([
+        detail_rows.append([
             kaynak,
-            findeks_kurum,
-            format_number(grup_limit),
-            format_number(nakdi_limit),
-            format_number(nakdi_risk),
-            format_number(gayrinakdi_limit),
-            format_number(gayrinakdi_risk),
+            findeks_map.get(kaynak, '-'),
+            format_number(limit_data.get('grup', 0)),
+            format_number(limit_data.get('nakdi', 0)),
+            format_number(risk_data.get('nakdi', 0)),
+            format_number(limit_data.get('gayrinakdi', 0)),
+            format_number(risk_data.get('gayrinakdi', 0)),
             format_number(toplam_limit),
             format_number(toplam_risk),
             f"{kullanim:.1f}",
             vade_str
         ])
 
-    detail_table = RLTable(detail_data, colWidths=[2.5*cm, 2.5*cm, 1.5*cm, 1.5*cm, 1.5*cm, 1.5*cm, 1.5*cm, 1.5*cm, 1.5*cm, 1*cm, 1.5*cm])
+    def anomaly_lines(items: List[Dict[str, Any]]) -> List[str]:
+        return [
+            f"• {escape_rl_text(a['kaynak'])} - {escape_rl_text(a['type'])}<br/>&nbsp;&nbsp;{escape_rl_text(a['detail'])}"
+            for a in items
+        ]
+
+    return {
+        'pdf_filename': Path(result['pdf_name']).stem + '.pdf',
+        'title': "KRM Analiz Raporu",
+        'info_rows': [
+            ['Firma:', result['company_name']],
+            ['Rapor Tarihi:', result['report_date']],
+            ['Analiz Tarihi:', result['analysis_date']],
+            ['Kaynak Dosya:', result['pdf_name']]
+        ],
+        'stats_rows': [
+            ['Toplam Kaynak:', str(total_sources)],
+            ['Aktif Kaynak:', str(active_count)],
+            ['Pasif Kaynak:', str(passive_count)],
+            ['Tespit Edilen Sorun:', str(total_anomalies)],
+            ['Kritik Sorunlar:', str(len(critical))],
+            ['Uyarılar:', str(len(warnings))]
+        ],
+        'critical_count': len(critical),
+        'warning_count': len(warnings),
+        'passive_count': passive_count,
+        'passive_rows': passive_rows,
+        'critical_lines': anomaly_lines(critical),
+        'warning_lines': anomaly_lines(warnings),
+        'detail_rows': detail_rows,
+        'trend_rows': build_trend_rows(result.get('trend', [])),
+        'footer': "Rapor otomatik olarak KRM Analiz Aracı v2 tarafından oluşturulmuştur.",
+    }
+
+
+def render_report_story(layout: Dict[str, Any], template: Optional[ReportTemplate] = None) -> List[Any]:
+    """
+    Layout modelini ReportLab flowable listesine dönüştür.
+
+    Args:
+        layout: build_report_layout() sonucu
+        template: Kullanılacak şablon (None ise süreç şablonu)
+
+    Returns:
+        doc.build()'e verilecek flowable listesi
+    """
+    if template is None:
+        template = get_report_template()
+
+    story: List[Any] = []
+
+    story.append(template.title(layout['title']))
+    story.append(Spacer(1, 0.5*cm))
+
+    # Genel Bilgiler
+    info_table = RLTable(layout['info_rows'], colWidths=[4*cm, 13*cm])
+    info_table.setStyle(template.info_table_style)
+    story.append(info_table)
+    story.append(Spacer(1, 0.8*cm))
+
+    # Özet İstatistikler
+    story.append(template.heading("Özet İstatistikler"))
+    story.append(Spacer(1, 0.3*cm))
+
+    stats_table = RLTable(layout['stats_rows'], colWidths=[6*cm, 6*cm])
+    stats_table.setStyle(template.stats_table_style)
+    stats_table.setStyle(TableStyle([
+        ('BACKGROUND', (1, 4), (1, 4), template.critical_cell_color if layout['critical_count'] > 0 else colors.white),
+        ('BACKGROUND', (1, 5), (1, 5), template.warning_cell_color if layout['warning_count'] > 0 else colors.white),
+    ]))
+    story.append(stats_table)
+    story.append(Spacer(1, 0.8*cm))
+
+    # Pasif Kaynaklar
+    if layout['passive_count']:
+        story.append(template.heading(f"Pasif Kaynaklar ({layout['passive_count']})"))
+        story.append(Spacer(1, 0.3*cm))
+
+        passive_table = RLTable(layout['passive_rows'], colWidths=[2.5*cm, 2.5*cm, 3*cm, 3*cm, 2*cm])
+        passive_table.setStyle(template.passive_table_style)
+        story.append(passive_table)
+        story.append(Spacer(1, 0.8*cm))
+
+    # Kritik Sorunlar - Paragraph ile wordwrap
+    if layout['critical_lines']:
+        story.append(template.heading("Kritik Sorunlar"))
+        story.append(Spacer(1, 0.3*cm))
+        for text in layout['critical_lines']:
+            story.append(Paragraph(text, template.critical_style))
+        story.append(Spacer(1, 0.5*cm))
+
+    # Uyarılar - Paragraph ile wordwrap
+    if layout['warning_lines']:
+        story.append(template.heading("Uyarılar"))
+        story.append(Spacer(1, 0.3*cm))
+        for text in layout['warning_lines']:
+            story.append(Paragraph(text, template.warning_style))
+        story.append(Spacer(1, 0.5*cm))
+
+    # Yeni sayfa - Detaylı Kaynak Bilgileri
+    story.append(PageBreak())
+    story.append(template.heading("Detaylı Aktif Kaynak Bilgileri"))
+    story.append(Spacer(1, 0.3*cm))
+
+    detail_rows = layout['detail_rows']
+    detail_table = RLTable(detail_rows, colWidths=[2.5*cm, 2.5*cm, 1.5*cm, 1.5*cm, 1.5*cm, 1.5*cm, 1.5*cm, 1.5*cm, 1.5*cm, 1*cm, 1.5*cm])
+    detail_table.setStyle(template.detail_table_style)
 
     # Zebra stripes
-    table_style_commands = [
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('FONTNAME', (0, 0), (-1, 0), font_name_bold),
-        ('FONTNAME', (0, 1), (-1, -1), font_name),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 3),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+    zebra_commands = [
+        ('BACKGROUND', (0, i), (-1, i), template.zebra_color)
+        for i in range(2, len(detail_rows), 2)
     ]
+    if zebra_commands:
+        detail_table.setStyle(TableStyle(zebra_commands))
 
-    # Add zebra stripes
-    for i in range(1, len(detail_data)):
-        if i % 2 == 0:
-            table_style_commands.append(('BACKGROUND', (0, i), (-1, i), colors.HexColor('#f0f0f0')))
+    story.append(detail_table)
 
-    detail_table.setStyle(TableStyle(table_style_commands))
+    # Trend (geçmiş deposundan, önceki rapor tarihlerine göre değişimler)
+    trend_rows = layout.get('trend_rows')
+    if trend_rows:
+        story.append(Spacer(1, 0.8*cm))
+        story.append(template.heading("Trend (Önceki Raporlara Göre Değişim)"))
+        story.append(Spacer(1, 0.3*cm))
 
-    story.append(detail_table)
+        trend_table = RLTable(trend_rows, colWidths=[2.5*cm, 1.7*cm, 1.7*cm, 1.6*cm, 1.6*cm, 1.6*cm, 1.6*cm, 1.6*cm, 1.6*cm, 1.2*cm], repeatRows=1)
+        trend_table.setStyle(template.detail_table_style)
+        story.append(trend_table)
 
     # Footer
     story.append(Spacer(1, 1*cm))
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontName=font_name,
-        fontSize=8,
-        textColor=colors.grey,
-        alignment=TA_CENTER
-    )
-    # Footer - basit Table (Türkçe ı ve ş var ama footer önemli değil)
-    footer_table = RLTable([["Rapor otomatik olarak KRM Analiz Aracı v2 tarafından oluşturulmuştur."]], colWidths=[17*cm])
-    footer_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, 0), font_name),
-        ('FONTSIZE', (0, 0), (0, 0), 8),
-        ('TEXTCOLOR', (0, 0), (0, 0), colors.grey),
-        ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-    ]))
-    story.append(footer_table)
+    story.append(template.footer(layout['footer']))
+
+    return story
+
+
+def generate_pdf(result: Dict[str, Any], output_dir: Path) -> Path:
+    """
+    PDF rapor oluştur.
+
+    Üç adımdan oluşur: layout modeli (build_report_layout), flowable
+    üretimi (render_report_story) ve çizim (doc.build).
+
+    Args:
+        result: analyze_report() fonksiyonundan dönen sonuç dict'i
+        output_dir: PDF'in kaydedileceği dizin
+
+    Returns:
+        Oluşturulan PDF dosyasının Path'i
+    """
+    template = get_report_template()
+    layout = build_report_layout(result)
+
+    pdf_path = output_dir / layout['pdf_filename']
+    doc = template.new_document(pdf_path)
 
     # Build PDF
-    doc.build(story)
+    doc.build(render_report_story(layout, template))
 
     return pdf_path
 
+def summarize_portfolio_anomalies(results: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[str, str, str, float, int]]]:
+    """
+    Firmalar arası anomali özeti: tip bazında sayımlar ve kritik bulgular.
+
+    Portföyün aktif kaynakları tek vektörel geçişte taranır (screen_anomalies);
+    özet için detay metni üretilmez. numpy yoksa raporların kendi anomali
+    listeleri kullanılır (sonuç aynıdır).
+
+    Returns:
+        (tip → {'critical', 'warning', 'companies'},
+         [(firma, kaynak, tip, değer, rapor_sırası), ...] kritik bulgular)
+    """
+    companies = [r['company_name'] or r['pdf_name'] for r in results]
+    type_summary: Dict[str, Dict[str, Any]] = {}
+    top_critical: List[Tuple[str, str, str, float, int]] = []
+
+    def add(report: int, kaynak: str, atype: str, critical: bool, value: float) -> None:
+        summary = type_summary.setdefault(atype, {'critical': 0, 'warning': 0, 'companies': set()})
+        if critical:
+            summary['critical'] += 1
+            top_critical.append((companies[report], kaynak, atype, value, report))
+        else:
+            summary['warning'] += 1
+        summary['companies'].add(companies[report])
+
+    try:
+        # Raporlardaki gibi yalnızca aktif kaynaklar taranır
+        columns = SourceColumns([
+            ({k: v for k, v in r['limits'].items() if k in active},
+             {k: v for k, v in r['risks'].items() if k in active})
+            for r in results for active in [set(r['active_sources'])]
+        ])
+    except ImportError:
+        for report, result in enumerate(results):
+            for a in result['anomalies']:
+                add(report, a['kaynak'], a['type'], a['severity'] == 'CRITICAL', a['value'])
+        return type_summary, top_critical
+
+    hits = screen_anomalies(columns)
+    for i in range(len(hits)):
+        row = int(hits.row[i])
+        add(int(columns.report_idx[row]), columns.kaynak[row], hits.rules.rules[int(hits.rule[i])].type,
+            bool(hits.critical[i]), float(hits.value[i]))
+    return type_summary, top_critical
+
+
+def build_portfolio_layout(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Portföy PDF'i için layout modelini çıkar (saf veri).
+
+    Args:
+        entries: [{'folder': klasör_adı, 'result': analyze_report() sonucu}, ...]
+                 (yalnızca başarılı sonuçlar)
+
+    Returns:
+        İçindekiler, firmalar arası anomali özeti ve firma bölümlerini
+        içeren layout dict'i
+    """
+    sections = []
+    toc_rows = []
+
+    for idx, entry in enumerate(entries, 1):
+        result = entry['result']
+        anchor = f"firma_{idx}"
+        layout = build_report_layout(result)
+        sections.append({'anchor': anchor, 'layout': layout})
+
+        toc_rows.append({
+            'anchor': anchor,
+            'no': str(idx),
+            'company': result['company_name'] or result['pdf_name'],
+            'folder': entry['folder'],
+            'report_date': result['report_date'],
+            'critical': layout['critical_count'],
+            'warning': layout['warning_count'],
+        })
+
+    type_summary, top_critical = summarize_portfolio_anomalies([entry['result'] for entry in entries])
+
+    type_rows = [['Anomali Tipi', 'Firma', 'Kritik', 'Uyarı']]
+    for atype, summary in sorted(type_summary.items(), key=lambda x: (-x[1]['critical'], -x[1]['warning'], x[0])):
+        type_rows.append([atype, str(len(summary['companies'])), str(summary['critical']), str(summary['warning'])])
+
+    # Limit/risk aşımlarında value TL, gecikmede gün; sadece aynı tip içinde karşılaştırılabilir
+    top_critical.sort(key=lambda x: (x[2], -x[3], x[4], x[1]))
+    critical_rows = [['Firma', 'Kaynak', 'Tip', 'Değer']]
+    for company, kaynak, atype, value, _ in top_critical:
+        critical_rows.append([company, kaynak, atype, format_number(value)])
+
+    return {
+        'title': "KRM Portföy Raporu",
+        'info_rows': [
+            ['Oluşturma Tarihi:', datetime.now().strftime('%d.%m.%Y %H:%M')],
+            ['Firma / Rapor:', str(len(entries))],
+            ['Kritik Sorunlar:', str(sum(r['critical'] for r in toc_rows))],
+            ['Uyarılar:', str(sum(r['warning'] for r in toc_rows))],
+        ],
+        'toc_rows': toc_rows,
+        'type_rows': type_rows,
+        'critical_rows': critical_rows,
+        'sections': sections,
+    }
+
+
+def generate_portfolio_pdf(entries: List[Dict[str, Any]], output_path: Path) -> Path:
+    """
+    Bir çalıştırmadaki tüm raporları tek PDF'de birleştir (tek doc.build).
+
+    İçindekiler (bağlantılı), firmalar arası anomali özeti ve her firma için
+    generate_pdf ile aynı bölüm. Font ve stiller tüm firmalar için bir kez
+    kurulur/gömülür.
+
+    Args:
+        entries: [{'folder': klasör_adı, 'result': analyze_report() sonucu}, ...]
+        output_path: Oluşturulacak PDF dosyasının yolu
+
+    Returns:
+        Oluşturulan PDF dosyasının Path'i
+    """
+    template = get_report_template()
+    layout = build_portfolio_layout(entries)
+
+    story: List[Any] = []
+    story.append(template.title(layout['title']))
+    story.append(Spacer(1, 0.5*cm))
+
+    info_table = RLTable(layout['info_rows'], colWidths=[4*cm, 13*cm])
+    info_table.setStyle(template.info_table_style)
+    story.append(info_table)
+    story.append(Spacer(1, 0.8*cm))
+
+    # İçindekiler - firma adları bölüm başlarına bağlantı
+    story.append(template.heading("İçindekiler"))
+    story.append(Spacer(1, 0.3*cm))
+
+    toc_data = [['No', 'Firma', 'Klasör', 'Rapor Tarihi', 'Kritik', 'Uyarı']]
+    for row in layout['toc_rows']:
+        link = Paragraph(f'<a href="#{row["anchor"]}">{escape_rl_text(row["company"])}</a>', template.toc_style)
+        toc_data.append([row['no'], link, row['folder'], row['report_date'], str(row['critical']), str(row['warning'])])
+
+    toc_table = RLTable(toc_data, colWidths=[1*cm, 6.5*cm, 4*cm, 2.5*cm, 1.5*cm, 1.5*cm], repeatRows=1)
+    toc_table.setStyle(template.summary_table_style)
+    story.append(toc_table)
+
+    # Firmalar arası anomali özeti
+    story.append(PageBreak())
+    story.append(template.heading("Firmalar Arası Anomali Özeti"))
+    story.append(Spacer(1, 0.3*cm))
+
+    if len(layout['type_rows']) > 1:
+        type_table = RLTable(layout['type_rows'], colWidths=[7*cm, 3*cm, 3*cm, 3*cm], repeatRows=1)
+        type_table.setStyle(template.summary_table_style)
+        story.append(type_table)
+    else:
+        story.append(Paragraph("Tutarsızlık tespit edilmedi.", template.toc_style))
+
+    if len(layout['critical_rows']) > 1:
+        story.append(Spacer(1, 0.8*cm))
+        story.append(template.heading("Kritik Sorunlar (Tüm Firmalar)"))
+        story.append(Spacer(1, 0.3*cm))
+        critical_table = RLTable(layout['critical_rows'], colWidths=[5.5*cm, 3.5*cm, 5*cm, 3*cm], repeatRows=1)
+        critical_table.setStyle(template.summary_table_style)
+        story.append(critical_table)
+
+    # Firma bölümleri
+    for section in layout['sections']:
+        story.append(PageBreak())
+        story.append(Paragraph(f'<a name="{section["anchor"]}"/>', template.anchor_style))
+        story.extend(render_report_story(section['layout'], template))
+
+    doc = template.new_document(output_path)
+    doc.build(story)
+
+    return output_path
+
+
 def generate_excel(result: Dict[str, Any], output_dir: Path) -> Path:
     """
-    Excel rapor oluştur (4 sheet: Özet, Aktif Kaynaklar, Pasif Kaynaklar, Anomaliler).
+    Excel rapor oluştur (4 sheet: Özet, Aktif Kaynaklar, Pasif Kaynaklar, Anomaliler;
+    geçmiş deposunda önceki rapor varsa 5. sheet: Trend).
 
     Args:
         result: analyze_report() fonksiyonundan dönen sonuç dict'i
@@ -2285,6 +5139,52 @@ def generate_excel(result: Dict[str, Any], output_dir: Path) -> Path:
     for col_idx, width in enumerate(anomali_widths, 1):
         ws_anomali.column_dimensions[get_column_letter(col_idx)].width = width
 
+    # ========================================
+    # SHEET 5: TREND (geçmiş deposu varsa)
+    # ========================================
+    trend = result.get('trend', [])
+    if trend:
+        ws_trend = wb.create_sheet("Trend")
+
+        trend_headers = ['Kaynak', 'Durum', 'Önceki Tarih', 'Tarih', 'Önceki Limit', 'Limit', 'Limit Değişimi',
+                         'Önceki Risk', 'Risk', 'Risk Değişimi', 'Kullanım %']
+
+        # Başlık satırı
+        for col_idx, header in enumerate(trend_headers, 1):
+            cell = ws_trend.cell(row=1, column=col_idx, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            cell.border = thin_border
+
+        # Veri satırları
+        for row_idx, t in enumerate(trend, 2):
+            row_data = [
+                t['kaynak'], t['status'],
+                format_history_date(t['from_date']), format_history_date(t['to_date']),
+                t['limit_from'], t['limit_to'], t['limit_delta'],
+                t['risk_from'], t['risk_to'], t['risk_delta'],
+                round(t['usage_to'], 1),
+            ]
+
+            for col_idx, value in enumerate(row_data, 1):
+                cell = ws_trend.cell(row=row_idx, column=col_idx, value=value)
+                cell.border = thin_border
+
+                if row_idx % 2 == 0:
+                    cell.fill = zebra_fill
+
+                if col_idx >= 5:
+                    cell.number_format = '0.0' if col_idx == 11 else '#,##0;[Red]-#,##0'
+                    cell.alignment = number_alignment
+                else:
+                    cell.alignment = text_alignment
+
+        # Kolon genişlikleri
+        trend_widths = [20, 10, 12, 12, 15, 15, 15, 15, 15, 15, 11]
+        for col_idx, width in enumerate(trend_widths, 1):
+            ws_trend.column_dimensions[get_column_letter(col_idx)].width = width
+
     # Excel dosyasını kaydet
     wb.save(excel_path)
 
@@ -2328,6 +5228,13 @@ def print_single_report(result: Dict[str, Any]) -> None:
     if warnings:
         console.print(f"  [yellow]Uyarı: {len(warnings)}[/yellow]")
 
+    issues = result.get('parse_issues') or {}
+    if issues.get('numbers') or issues.get('dates'):
+        console.print(f"  [yellow]⚠ Okunamayan hücre: {issues['numbers']} sayı, {issues['dates']} tarih "
+                      f"(0 / boş kabul edildi)[/yellow]")
+        for sample in issues.get('samples', []):
+            console.print(f"    [dim]{sample}[/dim]")
+
     if passive_count > 0:
         console.print(f"\n[bold dim]💤 Pasif Kaynaklar ({passive_count}):[/bold dim]")
 
@@ -2384,15 +5291,2413 @@ def print_single_report(result: Dict[str, Any]) -> None:
     else:
         console.print(f"\n[bold green]✅ Aktif kaynaklarda tutarsizlik tespit edilmedi[/bold green]")
 
-def main() -> None:
+def write_report_outputs(result: Dict[str, Any], output_dir: Path) -> Tuple[List[Path], List[str]]:
     """
-    Ana program fonksiyonu.
+    Başarılı analiz sonucu için PDF ve Excel çıktılarını oluştur.
 
-    Alt klasörleri tarar, her klasördeki KRM ve Findeks raporlarını analiz eder.
+    Args:
+        result: analyze_report() fonksiyonundan dönen sonuç dict'i
+        output_dir: Çıktıların kaydedileceği dizin
+
+    Returns:
+        (oluşturulan_dosyalar, hata_mesajları) tuple'ı
     """
-    console.print(Panel.fit(
-        "[bold cyan]KRM Rapor Analiz Aracı v3[/bold cyan]\n"
-        f"Tarih: {datetime.now().strftime('%d.%m.%Y %H:%M')}\n"
+    import traceback
+
+    outputs: List[Path] = []
+    errors: List[str] = []
+
+    # PDF oluştur
+    try:
+        outputs.append(generate_pdf(result, output_dir))
+    except Exception as e:
+        errors.append(f"PDF oluşturma hatası: {e}")
+        console.print(f"    [dim]{traceback.format_exc()}[/dim]")
+
+    # Excel oluştur (Findeks bağımsız - sadece KRM verisi yeterli)
+    try:
+        outputs.append(generate_excel(result, output_dir))
+    except Exception as e:
+        errors.append(f"Excel oluşturma hatası: {e}")
+        console.print(f"    [dim]{traceback.format_exc()}[/dim]")
+
+    return outputs, errors
+
+# ========================================
+# BATCH (HEADLESS) MOD FONKSİYONLARI
+# ========================================
+
+# 2 argparse'ın kullanım hatasına ayrılmıştır; zamanlayıcılar ikisini ayırt edebilsin
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_NO_REPORTS = 3
+EXIT_INVALID_RULES = 4
+
+logger = logging.getLogger('krm')
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps için datetime/Path/set dönüştürücü."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"{type(value).__name__} JSON'a çevrilemiyor")
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Her log kaydını tek satır JSON olarak yaz (cron / log toplayıcılar için)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='seconds'),
+            'level': record.levelname,
+            'event': record.getMessage(),
+        }
+        payload.update(getattr(record, 'krm', {}))
+        return json.dumps(payload, ensure_ascii=False, default=json_default)
+
+
+def setup_batch_logging() -> None:
+    """
+    Batch modu için konsolu sustur ve JSON satır logları stderr'e yönlendir.
+
+    Rich çıktıları (panel, tablo, progress) tamamen devre dışı kalır;
+    stdout yalnızca sondaki JSON özet için kullanılır.
+    """
+    console.quiet = True
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonLogFormatter())
+    logger.handlers[:] = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def log_event(event: str, level: int = logging.INFO, **fields: Any) -> None:
+    """Yapılandırılmış log kaydı yaz (batch modu dışında handler yoksa sessiz)."""
+    if logger.handlers:
+        logger.log(level, event, extra={'krm': fields})
+
+
+# ========================================
+# GEÇMİŞ (ZAMAN SERİSİ) DEPOSU
+# ========================================
+
+HISTORY_DB_FILENAME = 'krm_history.sqlite'
+HISTORY_TREND_PERIODS = 6  # Trend bölümünde gösterilecek en fazla rapor tarihi
+
+_HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    company       TEXT NOT NULL,
+    report_date   TEXT NOT NULL,  -- ISO (YYYY-MM-DD), sıralanabilir
+    pdf_name      TEXT,
+    rules_version TEXT,
+    analyzed_at   TEXT,
+    critical      INTEGER,
+    warnings      INTEGER,
+    PRIMARY KEY (company, report_date)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    company          TEXT NOT NULL,
+    report_date      TEXT NOT NULL,
+    kaynak           TEXT NOT NULL,
+    grup_limit       REAL,
+    nakdi_limit      REAL,
+    gayrinakdi_limit REAL,
+    toplam_limit     REAL,
+    nakdi_risk       REAL,
+    gayrinakdi_risk  REAL,
+    toplam_risk      REAL,
+    gecikme          INTEGER,
+    revize_tarihi    TEXT,
+    passive          INTEGER,
+    PRIMARY KEY (company, report_date, kaynak)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_kaynak ON snapshots (kaynak, report_date);
+CREATE INDEX IF NOT EXISTS idx_snapshots_date ON snapshots (report_date);
+CREATE INDEX IF NOT EXISTS idx_reports_date ON reports (report_date);
+"""
+
+
+def history_date_key(report_date: str) -> Optional[str]:
+    """
+    KRM rapor tarihini (dd.mm.yy / dd.mm.yyyy) ISO formatına çevir.
+
+    Returns:
+        'YYYY-MM-DD' veya tarih bilinmiyorsa None
+    """
+    for fmt in ('%d.%m.%y', '%d.%m.%Y'):
+        try:
+            return datetime.strptime(str(report_date).strip(), fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def format_history_date(date_key: str) -> str:
+    """ISO tarihi rapor formatında (dd.mm.yyyy) göster."""
+    return datetime.strptime(date_key, '%Y-%m-%d').strftime('%d.%m.%Y')
+
+
+class HistoryStore:
+    """
+    KRM anlık görüntülerinin yerel SQLite deposu.
+
+    Her başarılı analiz (firma, rapor tarihi) anahtarıyla upsert edilir;
+    firma/kaynak/tarih indeksleri sayesinde trend soruları PDF'ler yeniden
+    okunmadan yanıtlanır. Watch modundaki thread'ler için kilitle korunur.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        import sqlite3
+        import threading
+
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(_HISTORY_SCHEMA)
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+    def upsert_result(self, result: Dict[str, Any]) -> bool:
+        """
+        analyze_report() sonucunu depoya yaz (aynı firma+tarih varsa değiştir).
+
+        Firma adı okunamayan raporlar yazılmaz: (firma, tarih) anahtarı
+        boş/"Bilinmeyen Firma" ile ilgisiz firmaların satırlarını ezerdi.
+
+        Returns:
+            Yazıldıysa True (başarısız analiz, bilinmeyen firma veya tarih: False)
+        """
+        if not result.get('success') or not is_known_company(result['company_name']):
+            return False
+        date_key = history_date_key(result['report_date'])
+        if date_key is None:
+            return False
+
+        company = result['company_name']
+        passive = set(result['passive_sources'])
+        limits = result['limits']
+        risks = result['risks']
+
+        rows = []
+        for kaynak in list(limits) + [k for k in risks if k not in limits]:
+            limit_data = limits.get(kaynak, {})
+            risk_data = risks.get(kaynak, {})
+            revize_tarihi = limit_data.get('revize_tarihi')
+            rows.append((
+                company, date_key, kaynak,
+                limit_data.get('grup', 0),
+                limit_data.get('nakdi', 0),
+                limit_data.get('gayrinakdi', 0),
+                limit_data.get('toplam', 0),
+                risk_data.get('nakdi', 0),
+                risk_data.get('gayrinakdi', 0),
+                risk_data.get('toplam', 0),
+                risk_data.get('gecikme', 0),
+                revize_tarihi.strftime('%Y-%m-%d') if revize_tarihi else None,
+                1 if kaynak in passive else 0,
+            ))
+
+        critical = sum(1 for a in result['anomalies'] if a['severity'] == 'CRITICAL')
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (company, date_key, result['pdf_name'], result.get('rules_version'),
+                 datetime.now().isoformat(timespec='seconds'), critical, len(result['anomalies']) - critical)
+            )
+            self.conn.execute('DELETE FROM snapshots WHERE company = ? AND report_date = ?', (company, date_key))
+            self.conn.executemany('INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return True
+
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def companies(self) -> List[str]:
+        """Depodaki firmalar."""
+        return [r['company'] for r in self._query('SELECT DISTINCT company FROM reports ORDER BY company')]
+
+    def report_dates(self, company: str) -> List[str]:
+        """Firmanın rapor tarihleri (ISO, eskiden yeniye)."""
+        rows = self._query('SELECT report_date FROM reports WHERE company = ? ORDER BY report_date', (company,))
+        return [r['report_date'] for r in rows]
+
+    def source_series(self, company: str, kaynak: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Firmanın kaynak bazlı zaman serisi.
+
+        Örnek: "X firmasının Akbank kullanımı son 6 ayda nasıl değişti?"
+            store.source_series('X A.Ş.', 'Akbank', since='2025-05-01')
+
+        Args:
+            company: Firma adı (rapordaki haliyle)
+            kaynak: Opsiyonel kaynak filtresi
+            since: Opsiyonel başlangıç tarihi (ISO, dahil)
+
+        Returns:
+            report_date'e göre sıralı snapshot satırları (+ 'kullanim' yüzdesi)
+        """
+        sql = 'SELECT * FROM snapshots WHERE company = ?'
+        params: List[Any] = [company]
+        if kaynak is not None:
+            sql += ' AND kaynak = ?'
+            params.append(kaynak)
+        if since is not None:
+            sql += ' AND report_date >= ?'
+            params.append(since)
+        rows = self._query(sql + ' ORDER BY kaynak, report_date', tuple(params))
+        for row in rows:
+            row['kullanim'] = (row['toplam_risk'] / row['toplam_limit'] * 100) if row['toplam_limit'] > 0 else 0
+        return rows
+
+    def kaynak_exposure(self, kaynak: str, report_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Bir kaynağın (banka) tüm firmalardaki limit/risk satırları (tarih verilmezse tümü)."""
+        if report_date is None:
+            return self._query('SELECT * FROM snapshots WHERE kaynak = ? ORDER BY report_date, company', (kaynak,))
+        return self._query('SELECT * FROM snapshots WHERE kaynak = ? AND report_date = ? ORDER BY company', (kaynak, report_date))
+
+    def trend(self, company: str, until: Optional[str] = None, periods: int = HISTORY_TREND_PERIODS) -> List[Dict[str, Any]]:
+        """
+        Ardışık rapor tarihleri arasındaki limit/risk değişimleri.
+
+        Args:
+            company: Firma adı
+            until: Son tarih (ISO, dahil; None ise en yeni rapor)
+            periods: Dikkate alınacak en fazla rapor tarihi
+
+        Returns:
+            Değişen her (kaynak, önceki tarih → tarih) için bir satır; yeni
+            açılan kaynaklarda status 'YENİ', kapananlarda 'KAPANDI'
+        """
+        dates = self.report_dates(company)
+        if until is not None:
+            dates = [d for d in dates if d <= until]
+        dates = dates[-periods:]
+        if len(dates) < 2:
+            return []
+
+        placeholders = ', '.join('?' * len(dates))
+        rows = self._query(
+            f'SELECT report_date, kaynak, toplam_limit, toplam_risk FROM snapshots '
+            f'WHERE company = ? AND report_date IN ({placeholders})',
+            (company, *dates)
+        )
+        by_date: Dict[str, Dict[str, Tuple[float, float]]] = {d: {} for d in dates}
+        for row in rows:
+            by_date[row['report_date']][row['kaynak']] = (row['toplam_limit'], row['toplam_risk'])
+
+        trend: List[Dict[str, Any]] = []
+        for prev_date, date in zip(dates, dates[1:]):
+            prev, cur = by_date[prev_date], by_date[date]
+            for kaynak in sorted(set(prev) | set(cur)):
+                limit_from, risk_from = prev.get(kaynak, (0, 0))
+                limit_to, risk_to = cur.get(kaynak, (0, 0))
+                if kaynak in prev and kaynak in cur and limit_from == limit_to and risk_from == risk_to:
+                    continue
+                trend.append({
+                    'kaynak': kaynak,
+                    'from_date': prev_date,
+                    'to_date': date,
+                    'limit_from': limit_from,
+                    'limit_to': limit_to,
+                    'limit_delta': limit_to - limit_from,
+                    'risk_from': risk_from,
+                    'risk_to': risk_to,
+                    'risk_delta': risk_to - risk_from,
+                    'usage_to': (risk_to / limit_to * 100) if limit_to > 0 else 0,
+                    'status': 'YENİ' if kaynak not in prev else ('KAPANDI' if kaynak not in cur else ''),
+                })
+        return trend
+
+
+_HISTORY_STORE: Optional[HistoryStore] = None
+
+
+def open_history_store(db_path: Optional[Path] = None) -> Optional[HistoryStore]:
+    """
+    Süreç geneli geçmiş deposunu aç (varsayılan: ana dizinde krm_history.sqlite).
+
+    Açılamazsa uyarı verilir ve analiz depo olmadan devam eder.
+    """
+    global _HISTORY_STORE
+
+    db_path = db_path or (get_base_dir() / HISTORY_DB_FILENAME)
+    try:
+        _HISTORY_STORE = HistoryStore(db_path)
+    except Exception as e:
+        console.print(f"[yellow]⚠ Geçmiş deposu açılamadı ({db_path.name}): {e}[/yellow]")
+        log_event('history_unavailable', logging.WARNING, path=db_path, error=str(e))
+        _HISTORY_STORE = None
+    return _HISTORY_STORE
+
+
+def close_history_store() -> None:
+    """Süreç geneli geçmiş deposunu kapat."""
+    global _HISTORY_STORE
+    if _HISTORY_STORE is not None:
+        _HISTORY_STORE.close()
+        _HISTORY_STORE = None
+
+
+def record_history(result: Dict[str, Any]) -> None:
+    """
+    Sonucu geçmiş deposuna yaz ve result['trend']'i doldur (depo kapalıysa no-op).
+
+    Trend, PDF'in "Trend" bölümünde ve Excel'in "Trend" sayfasında gösterilir.
+    """
+    store = _HISTORY_STORE
+    if store is None or not result.get('success'):
+        return
+    if not is_known_company(result['company_name']):
+        log_event('history_skipped', pdf=result.get('pdf_name'), reason='unknown_company')
+        return
+    try:
+        if store.upsert_result(result):
+            result['trend'] = store.trend(result['company_name'], until=history_date_key(result['report_date']))
+    except Exception as e:
+        console.print(f"    [yellow]⚠ Geçmiş deposuna yazılamadı: {e}[/yellow]")
+        log_event('history_failed', logging.WARNING, pdf=result.get('pdf_name'), error=str(e))
+
+
+# ========================================
+# RAPOR FARKI (DELTA) ANALİZİ
+# ========================================
+
+DIFF_RISK_JUMP_PCT = 20.0  # Toplam riskte bu orandan büyük değişim "risk sıçraması" sayılır
+
+
+def _align_sources(old_names: List[str], new_names: List[str]) -> Dict[str, str]:
+    """
+    İki raporun kaynaklarını hizala: yeni kaynak → eski kaynak.
+
+    Önce birebir aynı isimler eşlenir; kalanlar normalize isimle, ancak
+    normalize isim iki tarafta da tek kaynağa karşılık geliyorsa eşlenir.
+    Aynı normalize isme düşen farklı kaynaklar böylece birbirini ezmez
+    (eşlenemeyenler yeni/kapanan olarak kalır).
+    """
+    old_set = set(old_names)
+    aligned = {name: name for name in new_names if name in old_set}
+
+    old_rest: Dict[str, List[str]] = {}
+    for name in old_names:
+        if name not in aligned:
+            old_rest.setdefault(normalize_bank_name(name), []).append(name)
+    new_rest: Dict[str, List[str]] = {}
+    for name in new_names:
+        if name not in aligned:
+            new_rest.setdefault(normalize_bank_name(name), []).append(name)
+
+    for key, names in new_rest.items():
+        candidates = old_rest.get(key, [])
+        if len(names) == 1 and len(candidates) == 1:
+            aligned[names[0]] = candidates[0]
+    return aligned
+
+
+def _source_order(kaynak: str) -> Tuple[str, str]:
+    return normalize_bank_name(kaynak), kaynak
+
+
+def diff_reports(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aynı firmanın iki KRM sonucu arasındaki değişimleri çıkar.
+
+    Kaynaklar önce birebir, sonra normalize isimle hizalanır (yazım
+    farkları eşleşmeyi bozmaz, bkz. _align_sources). Yalnızca aktif kaynaklar karşılaştırılır; pasife düşen kaynak
+    "kapanan", pasiften dönen kaynak "yeni" sayılır.
+
+    Args:
+        old: Eski tarihli analyze_report() sonucu
+        new: Yeni tarihli analyze_report() sonucu
+
+    Returns:
+        new_sources, closed_sources, limit_changes, risk_jumps, new_anomalies
+        listelerini içeren dict
+    """
+    old_active = list(dict.fromkeys(old['active_sources']))
+    new_active = list(dict.fromkeys(new['active_sources']))
+    aligned = _align_sources(old_active, new_active)
+    aligned_old = set(aligned.values())
+
+    def totals(result: Dict[str, Any], kaynak: str) -> Tuple[float, float]:
+        return (result['limits'].get(kaynak, {}).get('toplam', 0),
+                result['risks'].get(kaynak, {}).get('toplam', 0))
+
+    new_sources = []
+    for kaynak in sorted((k for k in new_active if k not in aligned), key=_source_order):
+        limit, risk = totals(new, kaynak)
+        new_sources.append({'kaynak': kaynak, 'limit': limit, 'risk': risk})
+
+    closed_sources = []
+    for kaynak in sorted((k for k in old_active if k not in aligned_old), key=_source_order):
+        limit, risk = totals(old, kaynak)
+        closed_sources.append({'kaynak': kaynak, 'limit': limit, 'risk': risk})
+
+    limit_changes = []
+    risk_jumps = []
+    for kaynak in sorted(aligned, key=_source_order):
+        old_limit, old_risk = totals(old, aligned[kaynak])
+        new_limit, new_risk = totals(new, kaynak)
+
+        if new_limit != old_limit:
+            limit_changes.append({'kaynak': kaynak, 'old': old_limit, 'new': new_limit, 'delta': new_limit - old_limit})
+
+        if new_risk != old_risk:
+            change_pct = (new_risk - old_risk) / old_risk * 100 if old_risk > 0 else None
+            if change_pct is None or abs(change_pct) >= DIFF_RISK_JUMP_PCT:
+                risk_jumps.append({
+                    'kaynak': kaynak, 'old': old_risk, 'new': new_risk,
+                    'delta': new_risk - old_risk, 'change_pct': change_pct
+                })
+
+    anomaly_sources = _align_sources(list(dict.fromkeys(a['kaynak'] for a in old['anomalies'])),
+                                     list(dict.fromkeys(a['kaynak'] for a in new['anomalies'])))
+    old_anomalies = {(a['kaynak'], a['type']) for a in old['anomalies']}
+    new_anomalies = [a for a in new['anomalies'] if (anomaly_sources.get(a['kaynak']), a['type']) not in old_anomalies]
+
+    return {
+        'company_name': new['company_name'],
+        'old_pdf': old['pdf_name'],
+        'new_pdf': new['pdf_name'],
+        'old_date': old['report_date'],
+        'new_date': new['report_date'],
+        'new_sources': new_sources,
+        'closed_sources': closed_sources,
+        'limit_changes': limit_changes,
+        'risk_jumps': risk_jumps,
+        'new_anomalies': new_anomalies,
+    }
+
+
+def diff_change_count(diff: Dict[str, Any]) -> int:
+    """Farktaki toplam değişiklik sayısı (0 ise raporlar eşdeğer)."""
+    return sum(len(diff[k]) for k in ('new_sources', 'closed_sources', 'limit_changes', 'risk_jumps', 'new_anomalies'))
+
+
+def pair_successive_reports(results: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Sonuçları firma adına göre grupla, rapor tarihine göre sırala ve ardışık çiftleri döndür.
+
+    Firma adı veya tarihi okunamayan raporlar eşleştirilmez (ilgisiz
+    firmalar aynı boş isim altında birleşmesin); aynı firma+tarih tekrarında
+    yalnızca ilki kullanılır.
+    """
+    by_company: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for result in results:
+        if not result.get('success') or not is_known_company(result['company_name']):
+            continue
+        date_key = history_date_key(result['report_date'])
+        if date_key is None:
+            continue
+        by_company.setdefault(result['company_name'], {}).setdefault(date_key, result)
+
+    pairs = []
+    for company in sorted(by_company):
+        dated = [by_company[company][d] for d in sorted(by_company[company])]
+        pairs.extend(zip(dated, dated[1:]))
+    return pairs
+
+
+def build_diff_layout(diff: Dict[str, Any]) -> Dict[str, Any]:
+    """diff_reports() sonucundan PDF layout modelini çıkar (saf veri)."""
+    def source_rows(items: List[Dict[str, Any]]) -> List[List[str]]:
+        return [['Kaynak', 'Toplam Limit', 'Toplam Risk']] + [
+            [i['kaynak'], format_number(i['limit']), format_number(i['risk'])] for i in items
+        ]
+
+    def change_rows(items: List[Dict[str, Any]], with_pct: bool = False) -> List[List[str]]:
+        rows = [['Kaynak', 'Önceki', 'Yeni', 'Değişim'] + (['%'] if with_pct else [])]
+        for i in items:
+            row = [i['kaynak'], format_number(i['old']), format_number(i['new']), format_delta(i['delta'])]
+            if with_pct:
+                row.append('yeni' if i['change_pct'] is None else f"{i['change_pct']:+.1f}")
+            rows.append(row)
+        return rows
+
+    sections = []
+    if diff['new_sources']:
+        sections.append((f"Yeni Kaynaklar ({len(diff['new_sources'])})", source_rows(diff['new_sources'])))
+    if diff['closed_sources']:
+        sections.append((f"Kapanan / Pasife Düşen Kaynaklar ({len(diff['closed_sources'])})", source_rows(diff['closed_sources'])))
+    if diff['limit_changes']:
+        sections.append((f"Limit Değişimleri ({len(diff['limit_changes'])})", change_rows(diff['limit_changes'])))
+    if diff['risk_jumps']:
+        sections.append((f"Risk Sıçramaları (≥ %{DIFF_RISK_JUMP_PCT:.0f}) ({len(diff['risk_jumps'])})", change_rows(diff['risk_jumps'], with_pct=True)))
+
+    return {
+        'pdf_filename': Path(diff['new_pdf']).stem + '_fark.pdf',
+        'title': "KRM Değişim Raporu",
+        'info_rows': [
+            ['Firma:', diff['company_name']],
+            ['Önceki Rapor:', f"{diff['old_pdf']} ({diff['old_date']})"],
+            ['Yeni Rapor:', f"{diff['new_pdf']} ({diff['new_date']})"],
+            ['Değişiklik:', str(diff_change_count(diff))],
+        ],
+        'sections': sections,
+        'anomaly_lines': [
+            f"• {escape_rl_text(a['kaynak'])} - {escape_rl_text(a['type'])}<br/>&nbsp;&nbsp;{escape_rl_text(a['detail'])}"
+            for a in diff['new_anomalies']
+        ],
+        'anomaly_critical': [a['severity'] == 'CRITICAL' for a in diff['new_anomalies']],
+        'footer': "Rapor otomatik olarak KRM Analiz Aracı v2 tarafından oluşturulmuştur.",
+    }
+
+
+def generate_diff_pdf(diff: Dict[str, Any], output_dir: Path) -> Path:
+    """
+    İki rapor arasındaki değişimleri PDF olarak yaz (<yeni_rapor>_fark.pdf).
+
+    Args:
+        diff: diff_reports() sonucu
+        output_dir: PDF'in kaydedileceği dizin
+
+    Returns:
+        Oluşturulan PDF dosyasının Path'i
+    """
+    template = get_report_template()
+    layout = build_diff_layout(diff)
+    pdf_path = output_dir / layout['pdf_filename']
+
+    story: List[Any] = [template.title(layout['title']), Spacer(1, 0.5*cm)]
+
+    info_table = RLTable(layout['info_rows'], colWidths=[4*cm, 13*cm])
+    info_table.setStyle(template.info_table_style)
+    story.append(info_table)
+    story.append(Spacer(1, 0.8*cm))
+
+    if layout['anomaly_lines']:
+        story.append(template.heading(f"Yeni Ortaya Çıkan Sorunlar ({len(layout['anomaly_lines'])})"))
+        story.append(Spacer(1, 0.3*cm))
+        for text, is_critical in zip(layout['anomaly_lines'], layout['anomaly_critical']):
+            story.append(Paragraph(text, template.critical_style if is_critical else template.warning_style))
+        story.append(Spacer(1, 0.5*cm))
+
+    for heading, rows in layout['sections']:
+        story.append(template.heading(heading))
+        story.append(Spacer(1, 0.3*cm))
+        table = RLTable(rows, colWidths=[5*cm] + [(17 - 5) / (len(rows[0]) - 1) * cm] * (len(rows[0]) - 1), repeatRows=1)
+        table.setStyle(template.detail_table_style)
+        story.append(table)
+        story.append(Spacer(1, 0.8*cm))
+
+    if not layout['sections'] and not layout['anomaly_lines']:
+        story.append(template.heading("İki rapor arasında değişiklik yok."))
+
+    story.append(Spacer(1, 1*cm))
+    story.append(template.footer(layout['footer']))
+
+    template.new_document(pdf_path).build(story)
+    return pdf_path
+
+
+def print_diff_summary(diff: Dict[str, Any]) -> None:
+    """Farkın kısa terminal özeti."""
+    console.print(
+        f"  [bold]Δ {diff['company_name']}[/bold] [dim]{diff['old_date']} → {diff['new_date']}[/dim]: "
+        f"[green]+{len(diff['new_sources'])} yeni[/green], "
+        f"[dim]-{len(diff['closed_sources'])} kapanan[/dim], "
+        f"{len(diff['limit_changes'])} limit değişimi, "
+        f"[yellow]{len(diff['risk_jumps'])} risk sıçraması[/yellow], "
+        f"[red]{len(diff['new_anomalies'])} yeni sorun[/red]"
+    )
+
+
+# ========================================
+# AKIŞ (STREAMING) VE BELLEK SINIRI
+# ========================================
+
+class RunTotals:
+    """
+    Çalıştırma genelindeki sayaçlar.
+
+    main() artık tüm sonuçları biriktirmez; her rapor bittiğinde add() ile
+    yalnızca bu toplamlar güncellenir.
+    """
+
+    __slots__ = ('reports', 'successful', 'active', 'passive', 'critical', 'warnings', 'malformed')
+
+    def __init__(self) -> None:
+        self.reports = 0
+        self.successful = 0
+        self.active = 0
+        self.passive = 0
+        self.critical = 0
+        self.warnings = 0
+        self.malformed = 0
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.reports += 1
+        if not result.get('success'):
+            return
+        critical = sum(1 for a in result['anomalies'] if a['severity'] == 'CRITICAL')
+        self.successful += 1
+        self.active += len(result['active_sources'])
+        self.passive += len(result['passive_sources'])
+        self.critical += critical
+        self.warnings += len(result['anomalies']) - critical
+        issues = result.get('parse_issues') or {}
+        self.malformed += issues.get('numbers', 0) + issues.get('dates', 0)
+
+
+def compact_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sonucun portföy için saklanacak hafif kopyası.
+
+    Findeks eşleşmelerindeki krm_data/findeks_data kopyaları (rapor
+    çıktıları bunları kullanmaz) atılır; diğer alanlar paylaşılır.
+    """
+    compact = dict(result)
+    compact['findeks_matches'] = [
+        {k: m[k] for k in ('krm_kaynak', 'findeks_kurum', 'findeks_sayfa', 'score', 'confidence')}
+        for m in result.get('findeks_matches', [])
+    ]
+    return compact
+
+
+class ResultStreamWriter:
+    """
+    Her raporun sonucunu bittiği anda JSON satırı olarak diske yaz.
+
+    Dosya her satırdan sonra flush edilir; çalıştırma yarıda kesilse de
+    tamamlanan raporların sonuçları kalır.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.count = 0
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, folder: str, result: Dict[str, Any], outputs: List[Path]) -> None:
+        record = {'folder': folder, 'outputs': [o.name for o in outputs]}
+        record.update(compact_result(result))
+        self.file.write(json.dumps(record, ensure_ascii=False, default=json_default) + '\n')
+        self.file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class MemoryCeilingExceeded(RuntimeError):
+    """RSS, temizlikten sonra da --max-memory-mb sınırının üzerinde."""
+
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Sürecin güncel RSS'i (MB); ölçülemezse None.
+
+    Linux'ta /proc, Windows'ta GetProcessMemoryInfo kullanılır; diğer
+    sistemlerde tepe değer (ru_maxrss) döner (bkz. rss_is_peak()).
+    """
+    import os
+
+    try:
+        if sys.platform.startswith('linux'):
+            with open('/proc/self/statm') as f:
+                pages = int(f.read().split()[1])
+            return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize / (1024 * 1024)
+            return None
+
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except Exception:
+        return None
+
+
+def rss_is_peak() -> bool:
+    """current_rss_mb() güncel değil tepe değer (ru_maxrss) mi döndürüyor?"""
+    return not (sys.platform.startswith('linux') or sys.platform == 'win32')
+
+
+def release_caches() -> None:
+    """Yeniden kurulabilen süreç içi cache'leri bırak ve çöp toplamayı çalıştır."""
+    import gc
+
+    _LOGO_INDEX_CACHE.clear()
+    _FINDEKS_INDEX_CACHE.clear()
+    drop_pdf_buffers()
+    gc.collect()
+
+
+class MemoryGuard:
+    """
+    Rapor aralarında RSS'i kontrol eden bellek sınırı.
+
+    Sınır aşılırsa önce cache'ler bırakılır; RSS hâlâ sınırın üzerindeyse
+    MemoryCeilingExceeded fırlatılır (çalıştırma kontrollü biçimde durur).
+    Yalnızca tepe değerin ölçülebildiği sistemlerde (ru_maxrss, bkz.
+    rss_is_peak) değer hiç düşmeyeceği için temizleyip yeniden ölçmeden
+    doğrudan durulur.
+    """
+
+    def __init__(self, limit_mb: Optional[float]) -> None:
+        self.limit_mb = limit_mb
+        self.peak_mb = 0.0
+
+    def check(self) -> None:
+        rss = current_rss_mb()
+        if rss is None:
+            return
+        self.peak_mb = max(self.peak_mb, rss)
+        if not self.limit_mb or rss <= self.limit_mb:
+            return
+        if rss_is_peak():
+            raise MemoryCeilingExceeded(f"Bellek sınırı aşıldı: tepe RSS {rss:.0f} MB > {self.limit_mb:.0f} MB")
+
+        release_caches()
+        rss = current_rss_mb() or rss
+        log_event('memory_released', logging.WARNING, rss_mb=round(rss, 1), limit_mb=self.limit_mb)
+        if rss > self.limit_mb:
+            raise MemoryCeilingExceeded(f"Bellek sınırı aşıldı: {rss:.0f} MB > {self.limit_mb:.0f} MB")
+
+
+# ========================================
+# KALDIĞI YERDEN DEVAM (JOURNAL)
+# ========================================
+
+JOURNAL_FILENAME = '.krm_journal.jsonl'
+JOURNAL_MAX_ATTEMPTS = 3  # --resume ile bir rapor en fazla bu kadar kez denenir
+
+
+class RunJournal:
+    """
+    Ana dizinde yalnızca eklenerek büyüyen iş günlüğü (.krm_journal.jsonl).
+
+    Her rapor (klasör, pdf, journal anahtarı) için işe başlarken 'started',
+    bitince 'done' veya 'failed' satırı yazılır ve hemen diske alınır.
+    Süreç çökerse yarım kalan iş 'started' olarak kalır ve bir deneme
+    sayılır; böylece sürekli çöken bir PDF --resume'u sonsuza kadar
+    tıkamaz ('done' sayacı sıfırlar). Anahtar PDF'lerin boyut/mtime
+    bilgisini ve kural sürümünü içerdiğinden (bkz. journal_fingerprint),
+    değişen raporlar otomatik olarak yeniden işlenir.
+    """
+
+    def __init__(self, path: Path, max_attempts: int = JOURNAL_MAX_ATTEMPTS) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        self.units: Dict[str, Dict[str, Any]] = {}
+        self.load()
+        self.file = open(path, 'a', encoding='utf-8')
+        # Çökme sonrası yarım kalan son satırı sonraki kayıtlardan ayır
+        if self.file.tell() > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, 2)
+                if f.read(1) != b'\n':
+                    self.file.write('\n')
+
+    @staticmethod
+    def unit_key(folder: str, pdf_name: str, cache_key: str) -> str:
+        return f"{folder}/{pdf_name}#{cache_key}"
+
+    def load(self) -> None:
+        """Mevcut günlüğü oku (yarım yazılmış son satır yok sayılır)."""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._apply(entry)
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        unit = self.units.setdefault(entry['key'], {'attempts': 0, 'status': None, 'outputs': []})
+        if entry['status'] == 'started':
+            unit['attempts'] += 1
+        unit['status'] = entry['status']
+        if entry['status'] == 'done':
+            # Deneme sınırı yalnızca son başarıdan sonraki ardışık denemeleri sayar
+            unit['attempts'] = 0
+            unit['outputs'] = entry.get('outputs', [])
+
+    def record(self, key: str, status: str, **fields: Any) -> None:
+        entry = {'ts': datetime.now().isoformat(timespec='seconds'), 'key': key, 'status': status}
+        entry.update(fields)
+        self.file.write(json.dumps(entry, ensure_ascii=False, default=json_default) + '\n')
+        self.file.flush()
+        self._apply(entry)
+
+    def skip_reason(self, key: str, output_dir: Path) -> Optional[str]:
+        """
+        --resume için: 'done' (çıktıları yerinde, atla), 'exhausted' (deneme
+        sınırı doldu) veya işlenmesi gerekiyorsa None.
+        """
+        unit = self.units.get(key)
+        if unit is None:
+            return None
+        if unit['status'] == 'done' and all((output_dir / name).exists() for name in unit['outputs']):
+            return 'done'
+        if unit['attempts'] >= self.max_attempts:
+            return 'exhausted'
+        return None
+
+    def close(self) -> None:
+        self.file.close()
+
+
+# ========================================
+# İZOLE ANALİZ SÜRECİ (ZAMAN AŞIMI / BELLEK SINIRI)
+# ========================================
+
+ISOLATED_TIMEOUT_SEC = 600   # Rapor başına duvar saati sınırı
+ISOLATED_MEMORY_MB = 2048    # Analiz sürecinin bellek sınırı (0 = sınırsız)
+
+
+def limit_process_memory(limit_mb: float) -> bool:
+    """
+    Çağıran sürecin bellek kullanımını sınırla.
+
+    POSIX'te RLIMIT_AS, Windows'ta Job Object (ProcessMemoryLimit) kullanılır.
+    Windows'ta job kapanınca (süreç öldürülünce) içindeki Tesseract alt
+    süreçleri de sonlanır.
+
+    Returns:
+        Sınır uygulandıysa True
+    """
+    if not limit_mb:
+        return False
+    limit_bytes = int(limit_mb * 1024 * 1024)
+
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            class IO_COUNTERS(ctypes.Structure):
+                _fields_ = [(name, ctypes.c_ulonglong) for name in (
+                    'ReadOperationCount', 'WriteOperationCount', 'OtherOperationCount',
+                    'ReadTransferCount', 'WriteTransferCount', 'OtherTransferCount')]
+
+            class JOBOBJECT_BASIC_LIMIT_INFORMATION(ctypes.Structure):
+                _fields_ = [
+                    ('PerProcessUserTimeLimit', ctypes.c_int64), ('PerJobUserTimeLimit', ctypes.c_int64),
+                    ('LimitFlags', wintypes.DWORD), ('MinimumWorkingSetSize', ctypes.c_size_t),
+                    ('MaximumWorkingSetSize', ctypes.c_size_t), ('ActiveProcessLimit', wintypes.DWORD),
+                    ('Affinity', ctypes.c_size_t), ('PriorityClass', wintypes.DWORD),
+                    ('SchedulingClass', wintypes.DWORD),
+                ]
+
+            class JOBOBJECT_EXTENDED_LIMIT_INFORMATION(ctypes.Structure):
+                _fields_ = [
+                    ('BasicLimitInformation', JOBOBJECT_BASIC_LIMIT_INFORMATION), ('IoInfo', IO_COUNTERS),
+                    ('ProcessMemoryLimit', ctypes.c_size_t), ('JobMemoryLimit', ctypes.c_size_t),
+                    ('PeakProcessMemoryUsed', ctypes.c_size_t), ('PeakJobMemoryUsed', ctypes.c_size_t),
+                ]
+
+            JOB_OBJECT_LIMIT_PROCESS_MEMORY = 0x00000100
+            JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE = 0x00002000
+            JobObjectExtendedLimitInformation = 9
+
+            kernel32 = ctypes.windll.kernel32
+            kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+            kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+
+            job = kernel32.CreateJobObjectW(None, None)
+            if not job:
+                return False
+            info = JOBOBJECT_EXTENDED_LIMIT_INFORMATION()
+            info.BasicLimitInformation.LimitFlags = JOB_OBJECT_LIMIT_PROCESS_MEMORY | JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+            info.ProcessMemoryLimit = limit_bytes
+            if not kernel32.SetInformationJobObject(wintypes.HANDLE(job), JobObjectExtendedLimitInformation,
+                                                    ctypes.byref(info), ctypes.sizeof(info)):
+                return False
+            return bool(kernel32.AssignProcessToJobObject(wintypes.HANDLE(job), wintypes.HANDLE(kernel32.GetCurrentProcess())))
+
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+        return True
+    except Exception:
+        return False
+
+
+def isolated_worker_main(conn: Any, rules_path: Optional[Path], memory_mb: float, ocr_backend: str = 'auto',
+                         logo_handle: Optional[Tuple[str, str, int, int]] = None, low_priority: bool = False,
+                         font_bytes: Optional[Dict[str, bytes]] = None) -> None:
+    """
+    İzole analiz sürecinin ana döngüsü.
+
+    Pipe'tan iş alır ve sonucunu geri gönderir; None gelince çıkar:
+        ('analyze', krm_buffer, findeks_buffer) → analyze_report sonucu
+        ('findeks', findeks_buffer)             → extract_findeks_data sonucu
+        ('service', *service_analyze argümanları) → service_analyze sonucu
+        ('ping',)                               → süreç kimliği (ısınma)
+    PDF'ler ana süreçte bir kez okunmuştur, worker dosyaları tekrar okumaz.
+    Klasör modunda PDF/Excel üretimi ana süreçte kalır, burada yalnızca
+    takılma riski olan parse ve OCR adımları çalışır; servis modunda
+    (font_bytes verilir) çıktılar da burada üretilir.
+    """
+    import os
+
+    # Kendi süreç grubu: zaman aşımında Tesseract alt süreçleriyle birlikte öldürülebilsin
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    limit_process_memory(memory_mb)
+    if low_priority:
+        lower_process_priority()
+
+    console.quiet = True
+    load_anomaly_rules(rules_path, quiet=True)
+    configure_ocr_backend(ocr_backend)
+    attach_logo_table(logo_handle)
+    if font_bytes is not None:
+        # Servis: font/şablon ve OCR motoru istekten önce hazır olsun
+        init_render_worker(font_bytes)
+        get_ocr_backend()
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+
+        kind, *args = task
+        try:
+            if kind == 'ping':
+                result = os.getpid()
+            elif kind == 'service':
+                result = service_analyze(*args)
+                if result['result'].get('error') == 'MemoryError':
+                    raise MemoryError
+            elif kind == 'findeks':
+                adopt_pdf_buffers(*args)
+                result = extract_findeks_data(Path(args[0].path))
+            else:
+                adopt_pdf_buffers(*args)
+                krm_buffer, findeks_buffer = args
+                result = analyze_report_with_live_status(Path(krm_buffer.path), Path(findeks_buffer.path) if findeks_buffer else None, show_live=False)
+                if result.get('error') == 'MemoryError':
+                    raise MemoryError
+            conn.send(('ok', result))
+        except MemoryError:
+            conn.send(('fatal', f"Bellek sınırı ({memory_mb:.0f} MB) aşıldı"))
+            break
+        finally:
+            drop_pdf_buffers()
+
+
+class IsolatedAnalyzer:
+    """
+    Raporları ayrı ve kalıcı bir süreçte, zaman aşımı ve bellek sınırıyla analiz eder.
+
+    Süreç raporlar arasında yeniden kullanılır (logo indeksi, Tesseract
+    ayarı sıcak kalır). Zaman aşımında veya süreç çöktüğünde süreç
+    öldürülür, rapor gerekçesiyle başarısız sayılır ve bir sonraki rapor
+    için yeni süreç başlatılır. Aşamalı moddaki Findeks OCR işleri de
+    (low_priority=True) ve HTTP servis istekleri (service=True) aynı
+    korumayla bu süreçlerde çalışır.
+    """
+
+    def __init__(self, timeout: float = ISOLATED_TIMEOUT_SEC, memory_mb: float = ISOLATED_MEMORY_MB,
+                 low_priority: bool = False, service: bool = False) -> None:
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.low_priority = low_priority
+        self.service = service
+        self.process: Any = None
+        self.conn: Any = None
+        self.recycled = 0
+
+    def _start(self) -> None:
+        import multiprocessing
+
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=isolated_worker_main,
+            args=(child_conn, get_anomaly_rules().source, self.memory_mb, get_ocr_backend_preference(),
+                  get_logo_table_handle(), self.low_priority, load_font_bytes() if self.service else None),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def _kill(self) -> None:
+        """Süreci (ve süreç grubunu) öldür; sonraki analizde yenisi başlar."""
+        import os
+        import signal
+
+        if self.process is not None:
+            try:
+                if hasattr(os, 'killpg'):
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                else:
+                    self.process.kill()
+            except OSError:
+                pass
+            self.process.join(5)
+        if self.conn is not None:
+            self.conn.close()
+        self.process = None
+        self.conn = None
+        self.recycled += 1
+
+    def _call(self, task: Tuple[Any, ...], what: str) -> Tuple[str, Any]:
+        """
+        İşi süreçte çalıştır.
+
+        Returns:
+            ('ok', sonuç), ('timeout', gerekçe) veya çökme/bellek
+            sınırında ('failed', gerekçe)
+        """
+        if self.process is None or not self.process.is_alive():
+            if self.process is not None:
+                self._kill()
+            self._start()
+
+        try:
+            self.conn.send(task)
+            if not self.conn.poll(self.timeout):
+                self._kill()
+                return 'timeout', f"Zaman aşımı: {what} {self.timeout:.0f} sn içinde tamamlanmadı"
+            status, payload = self.conn.recv()
+        except (EOFError, OSError):
+            exitcode = self.process.exitcode if self.process is not None else None
+            self._kill()
+            reason = f"{what[:1].upper()}{what[1:]} süreci beklenmedik şekilde sonlandı (çıkış kodu: {exitcode})"
+            if self.memory_mb:
+                reason += f" - bellek sınırı ({self.memory_mb:.0f} MB) aşılmış olabilir"
+            return 'failed', reason
+
+        if status != 'ok':
+            self._kill()
+            return 'failed', payload
+        return 'ok', payload
+
+    def start(self) -> None:
+        """Süreci şimdi başlat ve hazır olmasını bekle (ilk iş başlangıç maliyetini ödemesin)."""
+        status, payload = self._call(('ping',), 'başlatma')
+        if status != 'ok':
+            raise RuntimeError(payload)
+
+    def analyze(self, krm_pdf: Path, findeks_pdf: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Raporu izole süreçte analiz et.
+
+        Returns:
+            analyze_report() sonucu; zaman aşımı/çökme durumunda
+            success=False ve gerekçe içeren error
+        """
+        try:
+            task = ('analyze', read_pdf(krm_pdf), read_pdf(findeks_pdf) if findeks_pdf else None)
+        except (OSError, ValueError) as e:
+            return {'pdf_name': krm_pdf.name, 'success': False, 'error': f"PDF okunamadı: {e}"}
+
+        status, payload = self._call(task, 'analiz')
+        if status != 'ok':
+            return {'pdf_name': krm_pdf.name, 'success': False, 'error': payload}
+        return payload
+
+    def extract_findeks(self, buffer: PdfBuffer) -> List[Dict[str, Any]]:
+        """
+        Ana süreçte okunmuş Findeks PDF'ini izole süreçte OCR'la.
+
+        Raises:
+            RuntimeError: Zaman aşımı, bellek sınırı veya süreç çökmesi
+        """
+        status, payload = self._call(('findeks', buffer), 'Findeks OCR')
+        if status != 'ok':
+            raise RuntimeError(payload)
+        return payload
+
+    def analyze_upload(self, *task_args: Any) -> Dict[str, Any]:
+        """
+        Servis isteğini (service_analyze) izole süreçte çalıştır.
+
+        Raises:
+            TimeoutError: Zaman aşımı (süreç öldürülür)
+            RuntimeError: Bellek sınırı veya süreç çökmesi
+        """
+        status, payload = self._call(('service', *task_args), 'analiz')
+        if status == 'timeout':
+            raise TimeoutError(payload)
+        if status != 'ok':
+            raise RuntimeError(payload)
+        return payload
+
+    def close(self) -> None:
+        """Süreci nazikçe kapat (gerekirse öldür)."""
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+            self.process.join(5)
+        except (OSError, ValueError):
+            pass
+        if self.process.is_alive():
+            self._kill()
+        else:
+            self.conn.close()
+            self.process = None
+            self.conn = None
+
+
+# ========================================
+# AŞAMALI ÇALIŞTIRMA (ÖNCE KRM, SONRA FİNDEKS OCR)
+# ========================================
+
+def lower_process_priority() -> None:
+    """Çağıran sürecin CPU önceliğini düşür (POSIX: nice, Windows: BELOW_NORMAL)."""
+    import os
+
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            BELOW_NORMAL_PRIORITY_CLASS = 0x00004000
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+            kernel32.SetPriorityClass(ctypes.c_void_p(kernel32.GetCurrentProcess()), BELOW_NORMAL_PRIORITY_CLASS)
+        elif hasattr(os, 'nice'):
+            os.nice(10)
+    except Exception:
+        pass
+
+
+def attach_findeks_matches(result: Dict[str, Any], findeks_index: FindeksIndex) -> Dict[str, Any]:
+    """
+    Önceden OCR'lanmış Findeks indeksiyle sonucun eşleşmelerini doldur.
+
+    analyze_report()'un Findeks adımıyla aynıdır, ancak OCR ve indeks
+    klasör başına bir kez kurulur ve aynı klasördeki tüm KRM raporlarında
+    kullanılır.
+    """
+    active = set(result['active_sources'])
+    active_limits = {k: v for k, v in result['limits'].items() if k in active}
+    active_risks = {k: v for k, v in result['risks'].items() if k in active}
+    result['findeks_matches'] = find_best_matches(active_limits, active_risks, findeks_index) if findeks_index else []
+    return result
+
+
+class FindeksScheduler:
+    """
+    Findeks OCR işlerini düşük öncelikli izole süreçlerde yürütür.
+
+    Klasörün ilk KRM sonucu beklemeye alınınca (defer) OCR işi kuyruğa
+    alınır; KRM analizleri ve çıktıları bu sırada ana süreçte devam eder.
+    Hiç sonucu beklemeyen klasörün (örn. --resume ile tüm raporları
+    atlanan) Findeks'i OCR'lanmaz. Her worker thread'i işi
+    kendi IsolatedAnalyzer sürecine verir: --timeout ve --worker-memory-mb
+    OCR için de geçerlidir, takılan iş öldürülüp hata olarak döner.
+
+    KRM sonuçları defer() ile geçici bir dosyaya (klasör başına) yazılır,
+    bellekte tutulmaz; completed() OCR'ı biten klasörleri bekleyen
+    sonuçlarıyla birlikte bitiş sırasına göre döndürür.
+    """
+
+    def __init__(self, workers: int = 1, timeout: float = ISOLATED_TIMEOUT_SEC,
+                 memory_mb: float = ISOLATED_MEMORY_MB) -> None:
+        import queue
+        import threading
+
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.queue: "queue.Queue[Optional[Tuple[Any, PdfBuffer]]]" = queue.Queue()
+        self.jobs: Dict[Any, Dict[str, Any]] = {}
+        self.by_folder: Dict[str, Dict[str, Any]] = {}
+        self.threads = [
+            threading.Thread(target=self.worker, name=f"krm-ocr-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def worker(self) -> None:
+        """Kuyruktaki OCR işlerini sırayla kendi izole sürecinde çalıştır."""
+        analyzer = IsolatedAnalyzer(self.timeout, self.memory_mb, low_priority=True)
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                future, buffer = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(analyzer.extract_findeks(buffer))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            analyzer.close()
+
+    def register(self, folder: str, findeks_pdf: Path, output_dir: Path) -> None:
+        """Klasörün Findeks'ini kaydet; OCR işi ilk defer() çağrısında başlar."""
+        self.by_folder[folder] = {'folder': folder, 'findeks_pdf': findeks_pdf, 'output_dir': output_dir,
+                                  'spool': None, 'pending': 0}
+
+    def defer(self, folder: str, entry: Dict[str, Any]) -> None:
+        """KRM sonucunu klasörün OCR'ı bitene kadar diskte beklet (gerekirse OCR'ı başlat)."""
+        import pickle
+        import tempfile
+        from concurrent.futures import Future
+
+        job = self.by_folder[folder]
+        if job['spool'] is None:
+            future: Any = Future()
+            self.queue.put((future, read_pdf(job['findeks_pdf'])))
+            job['spool'] = tempfile.TemporaryFile()
+            self.jobs[future] = job
+        pickle.dump(entry, job['spool'], protocol=pickle.HIGHEST_PROTOCOL)
+        job['pending'] += 1
+
+    @staticmethod
+    def pending_entries(job: Dict[str, Any]):
+        """Klasörün bekletilen KRM sonuçlarını sırayla oku ve geçici dosyayı kapat."""
+        import pickle
+
+        spool = job['spool']
+        try:
+            spool.seek(0)
+            for _ in range(job['pending']):
+                yield pickle.load(spool)
+        finally:
+            spool.close()
+
+    def pending_count(self) -> int:
+        return sum(job['pending'] for job in self.jobs.values())
+
+    def completed(self, wait: bool = True):
+        """
+        (job, findeks_data, hata) üçlülerini OCR bitiş sırasıyla üret.
+
+        wait=False ise yalnızca şu an bitmiş işler döndürülür (klasörler
+        arasında bekleyen sonuçları erkenden boşaltmak için).
+        """
+        from concurrent.futures import CancelledError, as_completed
+
+        futures = list(self.jobs) if wait else [f for f in self.jobs if f.done()]
+        for future in as_completed(futures):
+            job = self.jobs.pop(future)
+            try:
+                yield job, future.result(), None
+            except CancelledError:
+                yield job, [], "OCR iptal edildi (çalıştırma erken durdu)"
+            except Exception as e:
+                yield job, [], str(e) or type(e).__name__
+
+    def cancel(self) -> None:
+        """Henüz başlamamış OCR işlerini iptal et (çalışanlar zaman aşımıyla sınırlı)."""
+        for future in self.jobs:
+            future.cancel()
+
+    def shutdown(self) -> None:
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        for job in self.jobs.values():
+            job['spool'].close()
+
+
+# ========================================
+# PROFİL (cProfile / ÖRNEKLEME / tracemalloc)
+# ========================================
+
+PROFILE_DIRNAME = 'profiles'
+PROFILE_TOP_N = 25
+PROFILE_SAMPLE_INTERVAL = 0.005  # Yığın örnekleme aralığı (sn)
+PROFILE_MEMORY_FRAMES = 5        # tracemalloc'un sakladığı çağrı derinliği
+
+
+def profile_package(filename: str) -> str:
+    """
+    pstats dosya adından darboğazın ait olduğu paket (pdfplumber, reportlab, ...).
+
+    Returns:
+        'krm', site-packages altındaki paket adı, 'builtins' veya 'stdlib'
+    """
+    if filename == '~' or filename.startswith('<'):
+        return 'builtins'
+    path = Path(filename)
+    if path.name == Path(__file__).name:
+        return 'krm'
+    parts = path.parts
+    for marker in ('site-packages', 'dist-packages'):
+        if marker in parts:
+            index = parts.index(marker)
+            if index + 1 < len(parts):
+                return Path(parts[index + 1]).stem.split('-')[0]
+    return 'stdlib'
+
+
+class StackSampler:
+    """
+    Ana thread'in çağrı yığınını düzenli aralıklarla örnekler.
+
+    Çıktı flamegraph.pl / speedscope'un okuduğu collapsed formattadır:
+    her satır "kök;...;yaprak örnek_sayısı".
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL) -> None:
+        import threading
+
+        self.interval = interval
+        self.target = threading.main_thread().ident
+        self.stacks: Dict[str, int] = {}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="krm-profile-sampler", daemon=True)
+
+    def run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                stack = ';'.join(reversed(names))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.thread.join()
+
+    def write(self, path: Path) -> None:
+        lines = [f"{stack} {count}" for stack, count in sorted(self.stacks.items())]
+        path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+class RunProfiler:
+    """
+    Çalıştırmanın tamamını cProfile (+ yığın örnekleme, opsiyonel tracemalloc) ile profiller.
+
+    finish() ana dizindeki profiles/ klasörüne çalıştırma başına şu
+    dosyaları yazar ve en sıcak fonksiyonları tablo olarak gösterir:
+        - krm_<zaman>.pstats        (python -m pstats, snakeviz vb.)
+        - krm_<zaman>.collapsed     (flamegraph.pl / speedscope)
+        - krm_<zaman>_memory.txt    (--profile-memory: satır bazında ayırmalar)
+
+    Yalnızca bu süreç görülür; worker süreçlerindeki iş (izole analiz,
+    --staged OCR havuzu) profile girmez.
+    """
+
+    def __init__(self, out_dir: Path, memory: bool = False, top_n: int = PROFILE_TOP_N) -> None:
+        import cProfile
+
+        self.out_dir = out_dir
+        self.memory = memory
+        self.top_n = top_n
+        self.stem = f"krm_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler()
+        self.started = 0.0
+
+    def start(self) -> None:
+        if self.memory:
+            import tracemalloc
+            tracemalloc.start(PROFILE_MEMORY_FRAMES)
+        self.sampler.start()
+        self.started = time.perf_counter()
+        self.profile.enable()
+
+    def finish(self) -> List[Path]:
+        """Profili durdur, dosyaları yaz ve özet tabloyu yazdır."""
+        import pstats
+
+        self.profile.disable()
+        elapsed = time.perf_counter() - self.started
+        self.sampler.stop()
+
+        self.out_dir.mkdir(exist_ok=True)
+        pstats_path = self.out_dir / f"{self.stem}.pstats"
+        collapsed_path = self.out_dir / f"{self.stem}.collapsed"
+        self.profile.dump_stats(str(pstats_path))
+        self.sampler.write(collapsed_path)
+        written = [pstats_path, collapsed_path]
+
+        memory_rows: List[Tuple[str, float, int]] = []
+        if self.memory:
+            memory_path = self.out_dir / f"{self.stem}_memory.txt"
+            memory_rows = self.write_memory_snapshot(memory_path)
+            written.append(memory_path)
+
+        stats = pstats.Stats(str(pstats_path))
+        self.print_summary(stats, elapsed, memory_rows)
+        log_event('profile_written', files=[p.name for p in written], duration_sec=round(elapsed, 2))
+        for path in written:
+            console.print(f"[green]✓ Profil:[/green] {path}")
+        return written
+
+    def write_memory_snapshot(self, path: Path) -> List[Tuple[str, float, int]]:
+        """tracemalloc anlık görüntüsünü satır bazında yaz; en büyük ayırmaları döndür."""
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        top = snapshot.statistics('lineno')
+        lines = [f"# Şu an: {current / 1024 / 1024:.1f} MB, tepe: {peak / 1024 / 1024:.1f} MB", '']
+        lines += [str(stat) for stat in top[:200]]
+        lines += ['', '# En büyük ayırmaların çağrı yığınları', '']
+        for stat in snapshot.statistics('traceback')[:10]:
+            lines.append(f"{stat.size / 1024:.1f} KiB, {stat.count} blok")
+            lines += [f"    {line}" for line in stat.traceback.format()]
+        path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+        return [(f"{Path(stat.traceback[0].filename).name}:{stat.traceback[0].lineno}", stat.size / 1024 / 1024, stat.count)
+                for stat in top[:10]]
+
+    def print_summary(self, stats: Any, elapsed: float, memory_rows: List[Tuple[str, float, int]]) -> None:
+        """Paket bazında öz süre ve en sıcak N fonksiyon tablosu (batch modunda stderr'e)."""
+        out = report_console()
+        by_package: Dict[str, float] = {}
+        for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items():
+            package = profile_package(filename)
+            by_package[package] = by_package.get(package, 0.0) + tottime
+
+        table = Table(title=f"Paket Bazında Süre ({elapsed:.1f} sn)", border_style="cyan", show_header=True)
+        table.add_column("Paket", style="cyan")
+        table.add_column("Öz süre (sn)", justify="right")
+        table.add_column("Pay", justify="right", style="green")
+        total = sum(by_package.values()) or 1.0
+        for package, tottime in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:10]:
+            table.add_row(package, f"{tottime:.2f}", f"%{tottime / total * 100:.1f}")
+        out.print(table)
+
+        table = Table(title=f"En Sıcak {self.top_n} Fonksiyon (öz süre)", border_style="cyan", show_header=True)
+        table.add_column("Fonksiyon", style="cyan")
+        table.add_column("Paket")
+        table.add_column("Çağrı", justify="right")
+        table.add_column("Öz (sn)", justify="right")
+        table.add_column("Toplam (sn)", justify="right")
+        hot = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top_n]
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in hot:
+            location = f"{Path(filename).name}:{line}" if filename != '~' else ''
+            table.add_row(f"{func} [dim]{location}[/dim]", profile_package(filename), str(calls),
+                          f"{tottime:.3f}", f"{cumtime:.3f}")
+        out.print(table)
+
+        if memory_rows:
+            table = Table(title="En Büyük Bellek Ayırmaları (tracemalloc)", border_style="cyan", show_header=True)
+            table.add_column("Satır", style="cyan")
+            table.add_column("MB", justify="right")
+            table.add_column("Blok", justify="right")
+            for location, size_mb, count in memory_rows:
+                table.add_row(location, f"{size_mb:.2f}", str(count))
+            out.print(table)
+
+
+# ========================================
+# WATCH (KLASÖR İZLEME) MODU
+# ========================================
+
+WATCH_POLL_INTERVAL_SEC = 2.0
+WATCH_DEBOUNCE_SEC = 3.0
+
+
+def process_krm_report(krm_pdf: Path, findeks_pdf: Optional[Path], output_dir: Path,
+                       analyzer: Optional['IsolatedAnalyzer'] = None) -> Dict[str, Any]:
+    """
+    Tek bir KRM raporunu analiz et ve PDF/Excel çıktılarını oluştur.
+
+    Args:
+        krm_pdf: KRM PDF dosyası
+        findeks_pdf: Aynı klasördeki Findeks PDF'i (opsiyonel)
+        output_dir: Çıktı dizini
+        analyzer: Verilirse analiz bu izole süreçte yapılır
+
+    Returns:
+        {'result': analiz sonucu, 'outputs': [Path], 'errors': [str]}
+    """
+    if analyzer is not None:
+        result = analyzer.analyze(krm_pdf, findeks_pdf)
+    else:
+        result = analyze_report(krm_pdf, findeks_pdf)
+    if result['success']:
+        record_history(result)
+        outputs, errors = write_report_outputs(result, output_dir)
+    else:
+        outputs, errors = [], [result.get('error', 'Hata')]
+    return {'result': result, 'outputs': outputs, 'errors': errors}
+
+
+def run_single_report(args: argparse.Namespace) -> int:
+    """
+    Tek bir KRM PDF'ini analiz et (python krm.py rapor.pdf).
+
+    Aynı klasördeki Findeks raporu (varsa) eşleştirmede kullanılır;
+    çıktılar PDF'in klasöründeki output/ dizinine yazılır.
+
+    Args:
+        args: parse_args() sonucu (args.pdf dolu)
+
+    Returns:
+        EXIT_OK veya (PDF geçersizse / analiz hatalıysa) EXIT_FAILURES
+    """
+    krm_pdf = args.pdf.resolve()
+    folder = krm_pdf.parent
+    unit: Dict[str, Any] = {'result': {'pdf_name': krm_pdf.name, 'success': False}, 'outputs': [], 'errors': []}
+
+    is_valid, error_msg = validate_pdf_file(krm_pdf)
+    if not is_valid:
+        unit['errors'] = [error_msg]
+    elif is_findeks_pdf(krm_pdf):
+        unit['errors'] = ["Findeks raporu tek başına analiz edilemez; KRM PDF'ini verin"]
+    else:
+        findeks_pdf = select_findeks_pdf(folder, folder)
+        if findeks_pdf:
+            console.print(f"[cyan]🔗 Findeks:[/cyan] {findeks_pdf.name}")
+        analyzer = IsolatedAnalyzer(args.timeout, args.worker_memory_mb) if args.isolate else None
+        try:
+            unit = process_krm_report(krm_pdf, findeks_pdf, ensure_output_dir(folder), analyzer)
+        finally:
+            if analyzer is not None:
+                analyzer.close()
+
+    if unit['errors']:
+        console.print(f"[red]✗ {krm_pdf.name}: {'; '.join(unit['errors'])}[/red]")
+    else:
+        console.print(f"[green]✓ {krm_pdf.name}[/green] [dim]→ {', '.join(o.name for o in unit['outputs'])}[/dim]")
+        print_single_report(unit['result'])
+
+    log_event(
+        'report_done' if not unit['errors'] else 'report_failed',
+        logging.INFO if not unit['errors'] else logging.ERROR,
+        folder=folder.name,
+        pdf=krm_pdf.name,
+        outputs=[o.name for o in unit['outputs']],
+        errors=unit['errors'],
+    )
+    if args.batch:
+        print(json.dumps({
+            'status': 'failed' if unit['errors'] else 'ok',
+            'pdf': krm_pdf.name,
+            'outputs': [o.name for o in unit['outputs']],
+            'errors': unit['errors'],
+        }, ensure_ascii=False))
+    return EXIT_FAILURES if unit['errors'] else EXIT_OK
+
+
+def select_findeks_pdf(folder: Path, base_dir: Path) -> Optional[Path]:
+    """Klasördeki ilk geçerli Findeks PDF'ini seç (main() ile aynı kural: sıralı ilk)."""
+    for pdf in sorted(p for p in folder.iterdir() if p.suffix.lower() == '.pdf'):
+        if is_findeks_pdf(pdf) and is_safe_path(base_dir, pdf) and validate_pdf_file(pdf)[0]:
+            return pdf
+    return None
+
+
+def is_output_stale(krm_pdf: Path) -> bool:
+    """KRM için output/ altındaki PDF raporu yoksa veya kaynaktan eskiyse True."""
+    output_pdf = krm_pdf.parent / "output" / (krm_pdf.stem + '.pdf')
+    try:
+        return output_pdf.stat().st_mtime < krm_pdf.stat().st_mtime
+    except OSError:
+        return True
+
+
+class FolderWatcher:
+    """
+    Ana dizinin alt klasörlerini izleyip yeni/değişen KRM ve Findeks PDF'lerini işler.
+
+    Stdlib dışı bağımlılık olmaması için inotify yerine os.scandir ile hafif
+    polling yapılır (dosya başına yalnızca mtime+boyut). Bir dosya, imzası
+    debounce süresi boyunca değişmeden kalınca (kopyalama bitti) kuyruğa
+    alınır. Font, rapor şablonu ve logo hash indeksi dosyalar arasında
+    sıcak kalır.
+
+    pdfplumber ve PyMuPDF thread-safe değildir: isolate=True ise her worker
+    thread'i analizi kendi kalıcı IsolatedAnalyzer sürecine yaptırır, aksi
+    halde tek worker thread'i ile çalışılır.
+    """
+
+    def __init__(self, base_dir: Path, interval: float = WATCH_POLL_INTERVAL_SEC,
+                 debounce: float = WATCH_DEBOUNCE_SEC, workers: int = 1, isolate: bool = True,
+                 timeout: float = ISOLATED_TIMEOUT_SEC, memory_mb: float = ISOLATED_MEMORY_MB) -> None:
+        import queue
+        import threading
+
+        self.base_dir = base_dir
+        self.interval = interval
+        self.debounce = debounce
+        self.isolate = isolate
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.worker_count = max(1, workers) if isolate else 1
+
+        self.known: Dict[Path, Tuple[int, int]] = {}
+        self.pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+
+        self.queue: "queue.Queue[Optional[Path]]" = queue.Queue()
+        self.queued: set = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.threads: List[Any] = []
+
+        self.processed = 0
+        self.failed = 0
+
+    def snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        """Alt klasörlerdeki PDF'lerin (mtime_ns, boyut) imzaları."""
+        import os
+
+        current: Dict[Path, Tuple[int, int]] = {}
+        try:
+            folders = [Path(e.path) for e in os.scandir(self.base_dir) if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return current
+
+        for folder in folders:
+            if is_skipped_folder(folder):
+                continue
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.name.lower().endswith('.pdf') and entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            current[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return current
+
+    def prime(self) -> None:
+        """
+        Başlangıç durumunu kaydet.
+
+        Çıktısı olmayan veya çıktısı kaynaktan eski olan KRM'ler hemen işlenir;
+        diğer dosyalar sadece değişirlerse işlenir.
+        """
+        self.known = self.snapshot()
+        for path, signature in self.known.items():
+            if is_krm_pdf(path) and is_output_stale(path):
+                self.pending[path] = (signature, float('-inf'))
+
+    def poll(self) -> List[Path]:
+        """
+        Bir tarama turu yap.
+
+        Returns:
+            Debounce süresi dolmuş (kopyalanması bitmiş) yeni/değişmiş PDF'ler
+        """
+        now = time.monotonic()
+        current = self.snapshot()
+
+        for path, signature in current.items():
+            if self.known.get(path) != signature:
+                # Yeni veya değişmiş: debounce sayacını (yeniden) başlat
+                self.pending[path] = (signature, now)
+        self.known = current
+
+        ready = []
+        for path, (signature, changed_at) in list(self.pending.items()):
+            if path not in current:
+                del self.pending[path]  # Silinmiş
+            elif current[path] != signature:
+                continue
+            elif now - changed_at >= self.debounce:
+                del self.pending[path]
+                ready.append(path)
+        return ready
+
+    def enqueue(self, krm_pdf: Path) -> None:
+        """KRM'yi kuyruğa al (zaten kuyruktaysa tekrar ekleme)."""
+        with self.lock:
+            if krm_pdf in self.queued:
+                return
+            self.queued.add(krm_pdf)
+        self.queue.put(krm_pdf)
+
+    def dispatch(self, pdf: Path) -> None:
+        """Hazır PDF'i iş birimlerine dönüştür (Findeks değişirse klasördeki tüm KRM'ler)."""
+        if not is_safe_path(self.base_dir, pdf):
+            log_event('watch_skipped', logging.WARNING, pdf=str(pdf), reason='unsafe_path')
+            return
+
+        if is_krm_pdf(pdf):
+            self.enqueue(pdf)
+        elif is_findeks_pdf(pdf):
+            for krm_pdf in sorted(p for p in self.known if p.parent == pdf.parent and is_krm_pdf(p)):
+                self.enqueue(krm_pdf)
+
+    def worker(self) -> None:
+        """Kuyruktaki KRM'leri sırayla işle."""
+        analyzer = IsolatedAnalyzer(self.timeout, self.memory_mb) if self.isolate else None
+        try:
+            self.work(analyzer)
+        finally:
+            if analyzer is not None:
+                analyzer.close()
+
+    def work(self, analyzer: Optional['IsolatedAnalyzer']) -> None:
+        while True:
+            krm_pdf = self.queue.get()
+            if krm_pdf is None:
+                break
+
+            with self.lock:
+                self.queued.discard(krm_pdf)
+
+            started = time.perf_counter()
+            try:
+                is_valid, error_msg = validate_pdf_file(krm_pdf)
+                if not is_valid:
+                    raise ValueError(error_msg)
+
+                folder = krm_pdf.parent
+                findeks_pdf = select_findeks_pdf(folder, self.base_dir)
+                unit = process_krm_report(krm_pdf, findeks_pdf, ensure_output_dir(folder), analyzer)
+            except Exception as e:
+                unit = {'result': {'pdf_name': krm_pdf.name, 'success': False, 'error': str(e)},
+                        'outputs': [], 'errors': [str(e)]}
+            # Findeks kopyası klasördeki sonraki KRM'ler için cache'te kalır
+            drop_pdf_buffers(krm_pdf)
+
+            duration = round(time.perf_counter() - started, 2)
+            with self.lock:
+                self.processed += 1
+                if unit['errors']:
+                    self.failed += 1
+
+            if unit['errors']:
+                console.print(f"[red]✗ {krm_pdf.parent.name}/{krm_pdf.name}: {'; '.join(unit['errors'])}[/red]")
+            else:
+                console.print(f"[green]✓ {krm_pdf.parent.name}/{krm_pdf.name}[/green] "
+                              f"[dim]→ {', '.join(o.name for o in unit['outputs'])} ({duration:.1f} sn)[/dim]")
+                print_single_report(unit['result'])
+
+            log_event(
+                'report_done' if not unit['errors'] else 'report_failed',
+                logging.INFO if not unit['errors'] else logging.ERROR,
+                folder=krm_pdf.parent.name,
+                pdf=krm_pdf.name,
+                outputs=[o.name for o in unit['outputs']],
+                errors=unit['errors'],
+                duration_sec=duration,
+            )
+
+    def start(self) -> None:
+        """Worker thread'lerini başlat."""
+        import threading
+
+        for i in range(self.worker_count):
+            thread = threading.Thread(target=self.worker, name=f"krm-watch-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self) -> None:
+        """Worker'lara durma sinyali gönder ve mevcut işlerin bitmesini bekle."""
+        self.stop_event.set()
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+    def run(self) -> None:
+        """Ctrl+C (veya SIGTERM) gelene kadar izle."""
+        import signal
+        import threading
+
+        # Servis yöneticileri (systemd, Görev Zamanlayıcı) SIGTERM ile durdurur
+        if threading.current_thread() is threading.main_thread() and hasattr(signal, 'SIGTERM'):
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.stop_event.set())
+
+        self.prime()
+        self.start()
+        try:
+            while not self.stop_event.is_set():
+                for pdf in self.poll():
+                    self.dispatch(pdf)
+                self.stop_event.wait(self.interval)
+        except KeyboardInterrupt:
+            console.print("\n[yellow]İzleme durduruluyor (kuyruktaki mevcut iş tamamlanıyor)...[/yellow]")
+        finally:
+            self.stop()
+
+
+def warm_up_caches() -> None:
+    """Font, rapor şablonu, OCR motoru ve logo hash tablosunu önceden yükle."""
+    register_fonts()
+    get_report_template()
+    get_ocr_backend()
+    attach_logo_table(get_logo_table_handle())
+
+
+def run_watch_mode(args: argparse.Namespace) -> int:
+    """
+    Watch modunu çalıştır: ana dizinin alt klasörlerine düşen PDF'leri işle.
+
+    Args:
+        args: parse_args() sonucu
+
+    Returns:
+        Çıkış kodu (işlenen raporlardan biri hata verdiyse EXIT_FAILURES)
+    """
+    base_dir = get_base_dir()
+    warm_up_caches()
+
+    watcher = FolderWatcher(
+        base_dir,
+        interval=args.watch_interval,
+        debounce=args.watch_debounce,
+        workers=args.watch_workers,
+        isolate=args.isolate,
+        timeout=args.timeout,
+        memory_mb=args.worker_memory_mb
+    )
+    if watcher.worker_count < args.watch_workers:
+        console.print("[yellow]⚠ --no-isolation ile PDF kütüphaneleri thread'lerde paralel çalışamaz; "
+                      "tek worker kullanılıyor[/yellow]")
+
+    console.print(f"[cyan]👀 İzleniyor:[/cyan] {base_dir} "
+                  f"[dim](tarama: {watcher.interval:.0f} sn, debounce: {watcher.debounce:.0f} sn, "
+                  f"worker: {watcher.worker_count}) - durdurmak için Ctrl+C[/dim]\n")
+    log_event('watch_started', base_dir=base_dir, interval=watcher.interval,
+              debounce=watcher.debounce, workers=watcher.worker_count)
+
+    watcher.run()
+
+    log_event('watch_stopped', processed=watcher.processed, failed=watcher.failed)
+    console.print(f"[bold]İzleme sona erdi:[/bold] {watcher.processed} rapor işlendi, {watcher.failed} hata")
+    return EXIT_FAILURES if watcher.failed else EXIT_OK
+
+
+# ========================================
+# HTTP SERVİS MODU
+# ========================================
+
+SERVE_DEFAULT_HOST = '127.0.0.1'
+SERVE_DEFAULT_PORT = 8765
+SERVE_MAX_UPLOAD_MB = 200  # KRM + Findeks toplamı
+SERVE_REQUEST_TIMEOUT_SEC = 300
+
+
+def service_analyze(krm_name: str, krm_bytes: bytes, findeks_name: Optional[str] = None,
+                    findeks_bytes: Optional[bytes] = None, include_outputs: bool = False) -> Dict[str, Any]:
+    """
+    Yüklenen PDF'leri worker süreçte analiz et.
+
+    Dosyalar geçici dizine sabit adlarla (krm.pdf, findeks.pdf) yazılır;
+    iki yükleme aynı adı taşısa da birbirinin üzerine yazılmaz. Yüklenen
+    adlar yalnızca sonuçta ve hata mesajlarında görünür.
+
+    Args:
+        krm_name: KRM dosya adı (rapor/çıktı adlarında kullanılır)
+        krm_bytes: KRM PDF içeriği
+        findeks_name: Findeks dosya adı (opsiyonel)
+        findeks_bytes: Findeks PDF içeriği (opsiyonel)
+        include_outputs: PDF/XLSX çıktıları da üretilip döndürülsün mü?
+
+    Returns:
+        {'result': analiz sonucu, 'outputs': {'pdf': bytes, 'xlsx': bytes}}
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory(prefix='krm_service_') as tmp:
+        tmp_dir = Path(tmp)
+        krm_path = tmp_dir / 'krm.pdf'
+        findeks_path = tmp_dir / 'findeks.pdf' if findeks_bytes else None
+        try:
+            krm_path.write_bytes(krm_bytes)
+            is_valid, error_msg = validate_pdf_file(krm_path)
+            if not is_valid:
+                return {'result': {'pdf_name': krm_name, 'success': False, 'error': f"KRM: {error_msg}"}, 'outputs': {}}
+
+            if findeks_path is not None:
+                findeks_path.write_bytes(findeks_bytes)
+                is_valid, error_msg = validate_pdf_file(findeks_path)
+                if not is_valid:
+                    return {'result': {'pdf_name': krm_name, 'success': False, 'error': f"Findeks: {error_msg}"}, 'outputs': {}}
+
+            result = analyze_report(krm_path, findeks_path)
+            result['pdf_name'] = krm_name
+
+            outputs: Dict[str, bytes] = {}
+            if include_outputs and result['success']:
+                output_dir = tmp_dir / "output"
+                output_dir.mkdir()
+                created, errors = write_report_outputs(result, output_dir)
+                for output in created:
+                    outputs[output.suffix.lstrip('.')] = output.read_bytes()
+                if errors:
+                    result['output_errors'] = errors
+
+            return {'result': result, 'outputs': outputs}
+        finally:
+            # Geçici dosyaların bellek kopyaları worker'da birikmesin
+            drop_pdf_buffers(krm_path, findeks_path)
+
+
+def parse_multipart_pdfs(content_type: str, body: bytes) -> Dict[str, Tuple[str, bytes]]:
+    """
+    multipart/form-data gövdesinden dosya alanlarını çıkar (stdlib email parser).
+
+    Returns:
+        {alan_adı: (dosya_adı, içerik)}
+    """
+    from email.parser import BytesParser
+    from email.policy import default as default_policy
+
+    message = BytesParser(policy=default_policy).parsebytes(
+        b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body
+    )
+
+    files: Dict[str, Tuple[str, bytes]] = {}
+    if not message.is_multipart():
+        return files
+
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        if not name:
+            continue
+        filename = Path(part.get_filename() or f"{name}.pdf").name
+        payload = part.get_payload(decode=True) or b''
+        files[name] = (filename, payload)
+    return files
+
+
+def safe_upload_name(filename: str, fallback: str) -> str:
+    """Yüklenen dosya adını geçici dizinde güvenle kullanılabilir hale getir."""
+    stem = sanitize_logo_filename(Path(filename).stem)[:80]
+    return f"{stem or fallback}.pdf"
+
+
+class AnalysisService:
+    """
+    Isıtılmış izole worker süreçleri üzerinde sınırlı kuyruklu analiz servisi.
+
+    Her worker bir IsolatedAnalyzer sürecidir (font, logo indeksi,
+    Tesseract sıcak kalır). Aynı anda en fazla `max_pending` istek kabul
+    edilir (çalışan + bekleyen); fazlası 503 + Retry-After ile geri
+    çevrilir (backpressure). Zaman aşımına uğrayan analizin süreci (Tesseract
+    alt süreçleriyle birlikte) öldürülür ve worker yenisiyle devam eder;
+    takılan bir PDF worker'ı ve kuyruk yerini kalıcı olarak tutamaz.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float,
+                 memory_mb: float = ISOLATED_MEMORY_MB) -> None:
+        import queue
+        import threading
+
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(self.max_pending)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+
+        self.analyzers = [IsolatedAnalyzer(timeout, memory_mb, service=True) for _ in range(self.workers)]
+        self.idle: Any = queue.Queue()
+        # Tüm worker'ları şimdi başlat (ilk istek başlangıç maliyetini ödemesin)
+        for analyzer in self.analyzers:
+            analyzer.start()
+            self.idle.put(analyzer)
+
+    def try_acquire(self) -> bool:
+        """Kuyrukta yer varsa ayır."""
+        if not self.slots.acquire(blocking=False):
+            return False
+        with self.lock:
+            self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def run(self, *task_args: Any) -> Dict[str, Any]:
+        """
+        service_analyze'ı boş bir worker'da çalıştır.
+
+        try_acquire() ile ayrılan yeri devralır ve iş bitince bırakır.
+        Boş worker beklemesi ve analizin kendisi ayrı ayrı `timeout` ile
+        sınırlıdır.
+
+        Raises:
+            TimeoutError: Boş worker bulunamadı veya analiz zaman aşımına uğradı
+            RuntimeError: Worker süreci çöktü veya bellek sınırını aştı
+        """
+        import queue
+
+        try:
+            try:
+                analyzer = self.idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise TimeoutError(f"{self.timeout:.0f} sn içinde boş worker bulunamadı")
+            try:
+                return analyzer.analyze_upload(*task_args)
+            finally:
+                self.idle.put(analyzer)
+        finally:
+            self.release()
+
+    def shutdown(self) -> None:
+        """Boştaki worker'ları kapat, hâlâ çalışanları öldür."""
+        import queue
+
+        idle = set()
+        while True:
+            try:
+                idle.add(id(self.idle.get_nowait()))
+            except queue.Empty:
+                break
+        for analyzer in self.analyzers:
+            if id(analyzer) in idle:
+                analyzer.close()
+            elif analyzer.process is not None:
+                analyzer._kill()
+
+
+def make_service_handler(service: AnalysisService) -> Any:
+    """AnalysisService'e bağlı BaseHTTPRequestHandler sınıfı üret."""
+    import base64
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import urlparse, parse_qs
+
+    class ServiceHandler(BaseHTTPRequestHandler):
+        server_version = "KRMAnaliz/3"
+
+        def send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload, ensure_ascii=False, default=json_default).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            log_event('http_request', client=self.client_address[0], message=format % args)
+
+        def do_GET(self) -> None:
+            if urlparse(self.path).path != '/health':
+                self.send_json(404, {'error': 'Bulunamadı'})
+                return
+            self.send_json(200, {
+                'status': 'ok',
+                'workers': service.workers,
+                'in_flight': service.in_flight,
+                'capacity': service.max_pending,
+            })
+
+        def do_POST(self) -> None:
+            url = urlparse(self.path)
+            if url.path != '/analyze':
+                self.send_json(404, {'error': 'Bulunamadı'})
+                return
+
+            length = int(self.headers.get('Content-Length') or 0)
+            if length <= 0:
+                self.send_json(411, {'error': 'Content-Length gerekli'})
+                return
+            if length > SERVE_MAX_UPLOAD_MB * 1024 * 1024:
+                self.send_json(413, {'error': f'İstek çok büyük (> {SERVE_MAX_UPLOAD_MB} MB)'})
+                return
+
+            # Backpressure: kuyruk doluysa gövdeyi okumadan reddet
+            if not service.try_acquire():
+                self.close_connection = True
+                self.send_json(503, {'error': 'Servis meşgul, daha sonra tekrar deneyin'}, {'Retry-After': '1'})
+                return
+
+            # Yer, service.run() işi devralana kadar bu handler'ındır
+            holds_slot = True
+            try:
+                body = self.rfile.read(length)
+                content_type = self.headers.get('Content-Type', '')
+
+                if content_type.startswith('multipart/form-data'):
+                    files = parse_multipart_pdfs(content_type, body)
+                elif content_type.startswith('application/pdf'):
+                    files = {'krm': ('KRM.pdf', body)}
+                else:
+                    self.send_json(415, {'error': 'multipart/form-data (krm, findeks) veya application/pdf bekleniyor'})
+                    return
+
+                if 'krm' not in files:
+                    self.send_json(400, {'error': "'krm' dosya alanı gerekli"})
+                    return
+
+                krm_name, krm_bytes = files['krm']
+                findeks_name, findeks_bytes = files.get('findeks', (None, None))
+                include_outputs = parse_qs(url.query).get('outputs', ['0'])[0] in ('1', 'true', 'yes')
+
+                holds_slot = False
+                try:
+                    response = service.run(
+                        safe_upload_name(krm_name, 'KRM'),
+                        krm_bytes,
+                        safe_upload_name(findeks_name, 'Findeks') if findeks_name else None,
+                        findeks_bytes,
+                        include_outputs
+                    )
+                except TimeoutError:
+                    self.send_json(504, {'error': f'Analiz {service.timeout:.0f} sn içinde tamamlanamadı'})
+                    return
+                except Exception as e:
+                    self.send_json(500, {'error': f'Analiz hatası: {e}'})
+                    return
+
+                result = response['result']
+                payload: Dict[str, Any] = {'result': result}
+                if include_outputs:
+                    payload['outputs'] = {
+                        kind: base64.b64encode(data).decode('ascii')
+                        for kind, data in response['outputs'].items()
+                    }
+                self.send_json(200 if result['success'] else 422, payload)
+            finally:
+                if holds_slot:
+                    service.release()
+
+    return ServiceHandler
+
+
+def run_serve_mode(args: argparse.Namespace) -> int:
+    """
+    HTTP servis modunu çalıştır.
+
+    Endpoint'ler:
+        GET  /health              → durum ve kuyruk doluluğu
+        POST /analyze[?outputs=1] → multipart/form-data 'krm' (+ opsiyonel 'findeks')
+                                    veya application/pdf gövde; sonuç JSON,
+                                    outputs=1 ise base64 PDF/XLSX
+
+    Args:
+        args: parse_args() sonucu
+
+    Returns:
+        Çıkış kodu
+    """
+    import signal
+    from http.server import ThreadingHTTPServer
+
+    console.print(f"[cyan]⚙ {args.serve_workers} worker başlatılıyor (font, logo indeksi, Tesseract)...[/cyan]")
+    service = AnalysisService(args.serve_workers, args.serve_queue, args.serve_timeout, args.worker_memory_mb)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_service_handler(service))
+    server.daemon_threads = True
+
+    console.print(f"[green]✓ Servis hazır:[/green] http://{args.host}:{args.port} "
+                  f"[dim](POST /analyze, GET /health - durdurmak için Ctrl+C)[/dim]")
+    log_event('serve_started', host=args.host, port=args.port,
+              workers=service.workers, capacity=service.max_pending)
+
+    # SIGTERM'de de worker süreçleri düzgün kapatılsın (yetim süreç kalmasın)
+    def raise_interrupt(signum: int, frame: Any) -> None:
+        raise KeyboardInterrupt
+
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, raise_interrupt)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Servis durduruluyor...[/yellow]")
+    finally:
+        server.server_close()
+        service.shutdown()
+
+    log_event('serve_stopped')
+    return EXIT_OK
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Komut satırı argümanlarını parse et.
+
+    Args:
+        argv: Argüman listesi (None ise sys.argv)
+
+    Returns:
+        argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        prog='krm.py',
+        description='KRM Rapor Analiz Aracı - klasör bazlı KRM/Findeks analizi'
+    )
+    parser.add_argument(
+        'pdf', nargs='?', type=Path, default=None,
+        help='Yalnızca bu KRM PDF\'ini analiz et (aynı klasördeki Findeks kullanılır, çıktılar klasörün output/ dizinine)'
+    )
+    parser.add_argument(
+        '--portfolio', action='store_true',
+        help='Tüm raporları ayrıca tek bir portföy PDF\'inde birleştir (output/ altında)'
+    )
+    parser.add_argument(
+        '--batch', '--quiet', dest='batch', action='store_true',
+        help='Headless mod: terminal çıktısı ve Enter beklemesi yok, '
+             'stderr\'e JSON loglar, stdout\'a JSON özet; hata varsa çıkış kodu 1'
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help='Sürekli çalış: alt klasörlere yeni gelen/değişen KRM ve Findeks PDF\'lerini işle (Ctrl+C ile dur)'
+    )
+    parser.add_argument(
+        '--watch-interval', type=float, default=WATCH_POLL_INTERVAL_SEC, metavar='SN',
+        help=f'Watch modu tarama aralığı (varsayılan: {WATCH_POLL_INTERVAL_SEC:.0f} sn)'
+    )
+    parser.add_argument(
+        '--watch-debounce', type=float, default=WATCH_DEBOUNCE_SEC, metavar='SN',
+        help=f'Dosya bu süre boyunca değişmeden kalınca işlenir (varsayılan: {WATCH_DEBOUNCE_SEC:.0f} sn)'
+    )
+    parser.add_argument(
+        '--watch-workers', type=int, default=1, metavar='N',
+        help='Watch modunda paralel worker sayısı; her worker kendi izole sürecinde analiz yapar (varsayılan: 1)'
+    )
+    parser.add_argument(
+        '--serve', action='store_true',
+        help='HTTP analiz servisi olarak çalış (POST /analyze, GET /health)'
+    )
+    parser.add_argument('--host', default=SERVE_DEFAULT_HOST, help=f'Servis adresi (varsayılan: {SERVE_DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=SERVE_DEFAULT_PORT, help=f'Servis portu (varsayılan: {SERVE_DEFAULT_PORT})')
+    parser.add_argument(
+        '--serve-workers', type=int, default=2, metavar='N',
+        help='Servis analiz süreci sayısı (varsayılan: 2)'
+    )
+    parser.add_argument(
+        '--serve-queue', type=int, default=8, metavar='N',
+        help='Aynı anda kabul edilen en fazla istek (çalışan + bekleyen); fazlası 503 (varsayılan: 8)'
+    )
+    parser.add_argument(
+        '--serve-timeout', type=float, default=SERVE_REQUEST_TIMEOUT_SEC, metavar='SN',
+        help=f'İstek başına analiz zaman aşımı; aşılırsa worker süreci öldürülüp yenilenir (varsayılan: {SERVE_REQUEST_TIMEOUT_SEC} sn)'
+    )
+    parser.add_argument(
+        '--rules', type=Path, default=None, metavar='DOSYA',
+        help='Anomali kural dosyası (JSON/YAML; varsayılan: ana dizindeki anomaly_rules.json varsa o)'
+    )
+    parser.add_argument(
+        '--no-history', dest='history', action='store_false',
+        help=f'Sonuçları geçmiş deposuna ({HISTORY_DB_FILENAME}) yazma, trend bölümü üretme'
+    )
+    parser.add_argument(
+        '--history-db', type=Path, default=None, metavar='DOSYA',
+        help=f'Geçmiş deposu yolu (varsayılan: ana dizinde {HISTORY_DB_FILENAME})'
+    )
+    parser.add_argument(
+        '--diff', action='store_true',
+        help='Klasördeki aynı firmaya ait ardışık raporlar için değişim PDF\'i (<rapor>_fark.pdf) üret'
+    )
+    parser.add_argument(
+        '--results-jsonl', type=Path, default=None, metavar='DOSYA',
+        help='Her raporun sonucunu tamamlanır tamamlanmaz bu dosyaya JSON satırı olarak ekle'
+    )
+    parser.add_argument(
+        '--max-memory-mb', type=float, default=None, metavar='MB',
+        help='Bellek sınırı: klasör aralarında RSS bu değeri aşarsa cache bırakılır, yine aşılıyorsa çalıştırma durur'
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help=f'Yarıda kalan çalıştırmaya devam et: {JOURNAL_FILENAME} içinde tamamlanmış raporları atla, hatalıları yeniden dene'
+    )
+    parser.add_argument(
+        '--max-attempts', type=int, default=JOURNAL_MAX_ATTEMPTS, metavar='N',
+        help=f'--resume ile bir raporun en fazla deneme sayısı (varsayılan: {JOURNAL_MAX_ATTEMPTS})'
+    )
+    parser.add_argument(
+        '--timeout', type=float, default=ISOLATED_TIMEOUT_SEC, metavar='SN',
+        help=f'Rapor başına analiz zaman aşımı; aşılırsa rapor hatalı sayılır (varsayılan: {ISOLATED_TIMEOUT_SEC} sn)'
+    )
+    parser.add_argument(
+        '--worker-memory-mb', type=float, default=ISOLATED_MEMORY_MB, metavar='MB',
+        help=f'Analiz sürecinin bellek sınırı, 0 = sınırsız (varsayılan: {ISOLATED_MEMORY_MB})'
+    )
+    parser.add_argument(
+        '--no-isolation', dest='isolate', action='store_false',
+        help='Raporları ayrı süreçte değil ana süreçte analiz et (zaman aşımı/bellek sınırı uygulanmaz)'
+    )
+    parser.add_argument(
+        '--staged', action='store_true',
+        help='Önce tüm klasörlerin KRM analizini ve çıktılarını üret; Findeks OCR düşük öncelikli ayrı süreçlerde '
+             'çalışsın, bitince raporlar eşleştirmelerle güncellensin'
+    )
+    parser.add_argument(
+        '--ocr-workers', type=int, default=1, metavar='N',
+        help='--staged modunda Findeks OCR süreç sayısı (varsayılan: 1)'
+    )
+    parser.add_argument(
+        '--ocr-backend', choices=OCR_BACKENDS, default='auto',
+        help='Findeks OCR motoru: auto (tesserocr kuruluysa kalıcı motor, yoksa pytesseract), '
+             'tesserocr veya pytesseract (varsayılan: auto)'
+    )
+    parser.add_argument(
+        '--bench-parse', action='store_true',
+        help='Parse mikro-benchmark\'ını çalıştır (eski satır içi regex ve önceden derlenmiş desen yollarını karşılaştırır; batch modunda tablo stderr\'e yazılır) ve çık'
+    )
+    parser.add_argument(
+        '--profile', action='store_true',
+        help=f'Çalıştırmayı cProfile ile profille: {PROFILE_DIRNAME}/ altına .pstats ve flamegraph için '
+             f'.collapsed yaz, sonda en sıcak fonksiyonları göster (analiz izole süreç yerine bu süreçte yapılır)'
+    )
+    parser.add_argument(
+        '--profile-memory', action='store_true',
+        help='--profile ile birlikte tracemalloc anlık görüntüsü de al (satır bazında bellek ayırmaları)'
+    )
+    parser.add_argument(
+        '--profile-top', type=int, default=PROFILE_TOP_N, metavar='N',
+        help=f'Profil tablosunda gösterilecek fonksiyon sayısı (varsayılan: {PROFILE_TOP_N})'
+    )
+    return parser.parse_args(argv)
+
+def main(args: Optional[argparse.Namespace] = None) -> int:
+    """
+    Ana program fonksiyonu.
+
+    Alt klasörleri tarar, her klasördeki KRM ve Findeks raporlarını analiz eder.
+
+    Args:
+        args: parse_args() sonucu (None ise varsayılan ayarlar)
+
+    Returns:
+        Çıkış kodu (EXIT_OK, EXIT_FAILURES, EXIT_NO_REPORTS veya EXIT_INVALID_RULES)
+    """
+    if args is None:
+        args = parse_args([])
+
+    batch = args.batch
+    if batch:
+        setup_batch_logging()
+
+    if args.bench_parse:
+        return run_parse_benchmark()
+
+    # cProfile yalnızca bu süreci görür: profil modunda analiz süreç içinde yapılır
+    if args.profile and args.isolate:
+        args.isolate = False
+        console.print("[dim]--profile: izole analiz kapatıldı (parse/OCR bu süreçte profillenir)[/dim]")
+
+    run_started = time.perf_counter()
+    log_event('run_started')
+
+    console.print(Panel.fit(
+        "[bold cyan]KRM Rapor Analiz Aracı v3[/bold cyan]\n"
+        f"Tarih: {datetime.now().strftime('%d.%m.%Y %H:%M')}\n"
         "[dim]Klasör bazlı analiz, Findeks eşleştirmesi, PDF raporlama[/dim]",
         border_style="cyan"
     ))
@@ -2400,15 +7705,53 @@ def main() -> None:
     # Logo kontrolü ve indirme (ilk çalıştırma)
     check_and_download_logos()
 
+    # Kurum kaydı: Excel değiştiyse worker'lar başlamadan bir kez derlenir
+    get_institution_registry()
+
+    # Logo hash tablosu bir kez hesaplanıp worker süreçlerine paylaşımlı bellekle verilir
+    if args.isolate or args.staged or args.serve:
+        publish_logo_table(Path("logos"))
+
     # Türkçe font desteğini aktifleştir
     register_fonts()
 
+    # Anomali kurallarını bir kez derle (tüm raporlarda kullanılır)
+    try:
+        rules = load_anomaly_rules(args.rules)
+    except ValueError as e:
+        console.print(f"[red]✗ {e}[/red]")
+        log_event('rules_invalid', logging.ERROR, path=str(args.rules), error=str(e))
+        if batch:
+            print(json.dumps({'status': 'invalid_rules', 'error': str(e)}, ensure_ascii=False))
+        return EXIT_INVALID_RULES
+    log_event('rules_loaded', version=rules.version, source=rules.source, rules=len(rules.rules))
+    configure_ocr_backend(args.ocr_backend)
+
+    # Geçmiş deposu (firma/kaynak/tarih bazlı trend için)
+    if args.history and not args.serve:
+        open_history_store(args.history_db)
+
+    # Watch modu: sürekli izle, tek seferlik taramayı atla
+    if args.watch:
+        return run_watch_mode(args)
+
+    # Servis modu: klasör taraması yok, istekleri bekle
+    if args.serve:
+        return run_serve_mode(args)
+
+    # Tek PDF: klasör taraması yok
+    if args.pdf is not None:
+        return run_single_report(args)
+
     # Alt klasörlerdeki raporları bul
     folders_with_reports = find_folders_with_reports()
 
     if not folders_with_reports:
         console.print("[red]✗ Analiz edilecek klasör bulunamadı![/red]")
-        return
+        log_event('no_reports', logging.WARNING)
+        if batch:
+            print(json.dumps({'status': 'no_reports', 'folders': 0, 'reports': 0}, ensure_ascii=False))
+        return EXIT_NO_REPORTS
 
     # Tree view ile klasör yapısını göster
     show_folder_tree(folders_with_reports)
@@ -2416,10 +7759,20 @@ def main() -> None:
     console.print(f"[bold cyan]{'='*80}[/bold cyan]")
     console.print(f"[bold]Toplam {len(folders_with_reports)} klasör işlenecek[/bold]\n")
 
-    # Her klasör için analiz yap
-    all_results = []
-
-    # Progress bar ile analiz
+    # Her klasör için analiz yap: sonuçlar biriktirilmez, yalnızca toplamlar tutulur
+    totals = RunTotals()
+    portfolio_entries: List[Dict[str, Any]] = []
+    failures: List[Dict[str, Any]] = []
+    total_diffs = 0
+    memory_guard = MemoryGuard(args.max_memory_mb)
+    stream = ResultStreamWriter(args.results_jsonl) if args.results_jsonl else None
+    stopped_early = False
+    journal = RunJournal(get_base_dir() / JOURNAL_FILENAME, max_attempts=args.max_attempts)
+    resumed = 0
+    analyzer = IsolatedAnalyzer(args.timeout, args.worker_memory_mb) if args.isolate else None
+    ocr_scheduler = FindeksScheduler(args.ocr_workers, args.timeout, args.worker_memory_mb) if args.staged else None
+
+    # Progress bar ile analiz (batch modunda hiç render edilmez)
     with Progress(
         SpinnerColumn(),
         TextColumn("[bold blue]{task.description}"),
@@ -2428,9 +7781,65 @@ def main() -> None:
         TextColumn("•"),
         TimeRemainingColumn(),
         console=console,
-        transient=False
+        transient=False,
+        disable=batch
     ) as progress:
 
+        def finish_ocr_job(job: Dict[str, Any], findeks_data: List[Dict[str, Any]], ocr_error: Optional[str],
+                           ocr_task: Optional[Any] = None) -> None:
+            """OCR'ı biten klasörün bekletilen raporlarını eşleştir, yeniden yaz ve kaydet."""
+            if ocr_error:
+                progress.console.print(f"[yellow]⚠ {job['folder']}: Findeks OCR hatası ({ocr_error}) - raporlar eşleştirmesiz kaldı[/yellow]")
+                log_event('findeks_failed', logging.WARNING, folder=job['folder'], error=ocr_error)
+            # Klasörün tüm KRM raporları aynı indeksi (isim memo'su dahil) paylaşır
+            findeks_index = FindeksIndex(findeks_data)
+
+            for entry in FindeksScheduler.pending_entries(job):
+                result = entry['result']
+                krm_pdf = entry['krm_pdf']
+                # Findeks verisi yoksa ilk aşamanın çıktıları zaten nihai
+                outputs, output_errors = entry['outputs'], []
+                if findeks_index:
+                    attach_findeks_matches(result, findeks_index)
+                    outputs, output_errors = write_report_outputs(result, job['output_dir'])
+                if ocr_error:
+                    # Eşleştirmesiz çıktılar yerinde kalır, ama rapor tamamlanmış sayılmaz:
+                    # --resume yeniden dener, batch çıkış kodu hatayı gösterir
+                    output_errors = output_errors + [f"Findeks OCR hatası: {ocr_error}"]
+
+                if output_errors:
+                    failures.append({'folder': job['folder'], 'pdf': krm_pdf.name, 'errors': output_errors})
+                log_event('findeks_matched', folder=job['folder'], pdf=krm_pdf.name,
+                          matches=len(result['findeks_matches']), errors=output_errors)
+
+                if entry['unit_key'] is not None:
+                    journal.record(
+                        entry['unit_key'], 'failed' if output_errors else 'done',
+                        folder=job['folder'], pdf=krm_pdf.name,
+                        outputs=[o.name for o in outputs], errors=output_errors
+                    )
+                if stream is not None:
+                    stream.write(job['folder'], result, outputs)
+                if args.portfolio:
+                    portfolio_entries.append({'folder': job['folder'], 'result': compact_result(result)})
+                if ocr_task is not None:
+                    progress.update(ocr_task, advance=1)
+
+            if job['pending'] and not ocr_error:
+                progress.console.print(f"[cyan]🔗 {job['folder']}:[/cyan] {job['pending']} rapor Findeks eşleştirmesiyle güncellendi")
+            job['pending'] = 0
+
+        def memory_exceeded(folder_name: str) -> bool:
+            """Bellek sınırı aşıldıysa hatayı kaydet ve True döndür (çalıştırma durur)."""
+            try:
+                memory_guard.check()
+            except MemoryCeilingExceeded as e:
+                progress.console.print(f"[red]✗ {e} - kalan raporlar işlenmeyecek[/red]")
+                log_event('memory_ceiling_exceeded', logging.ERROR, error=str(e), folder=folder_name)
+                failures.append({'folder': folder_name, 'pdf': None, 'errors': [str(e)]})
+                return True
+            return False
+
         # Ana klasör progress task'ı
         folder_task = progress.add_task(
             "[cyan]📂 Klasörler işleniyor...",
@@ -2454,6 +7863,13 @@ def main() -> None:
             else:
                 progress.console.print("[dim]📝 Findeks raporu yok[/dim]")
 
+            # Aşamalı mod: OCR arka planda (düşük öncelik), KRM analizi Findeks'siz devam eder
+            analysis_findeks = findeks_pdf
+            if ocr_scheduler is not None and findeks_pdf:
+                ocr_scheduler.register(folder.name, findeks_pdf, output_dir)
+                analysis_findeks = None
+                progress.console.print("[dim]   Findeks OCR arka planda yapılacak; eşleştirmeler KRM raporlarından sonra eklenecek[/dim]")
+
             progress.console.print()
 
             # Bu klasördeki her KRM raporunu analiz et
@@ -2467,42 +7883,101 @@ def main() -> None:
             )
 
             for pdf_idx, krm_pdf in enumerate(krm_pdfs, 1):
+                # Büyük klasörlerde de raporlar arasında bellek sınırını kontrol et
+                if pdf_idx > 1 and memory_exceeded(folder.name):
+                    stopped_early = True
+                    break
+
                 # Mevcut PDF'i göster
                 progress.update(
                     pdf_task,
                     description=f"[yellow]  ↳ {krm_pdf.name[:40]}..."
                 )
 
+                # Journal: --resume ile tamamlanmış işleri atla, deneme sınırını uygula
+                try:
+                    unit_key = RunJournal.unit_key(folder.name, krm_pdf.name, journal_fingerprint(krm_pdf, findeks_pdf))
+                except (OSError, ValueError) as e:
+                    unit_key = None
+                    progress.console.print(f"    [yellow]⚠ Journal anahtarı hesaplanamadı: {e}[/yellow]")
+
+                if args.resume and unit_key is not None:
+                    skip = journal.skip_reason(unit_key, output_dir)
+                    if skip == 'done':
+                        resumed += 1
+                        progress.console.print(f"    [dim]↷ {krm_pdf.name}: önceki çalıştırmada tamamlandı, atlandı[/dim]")
+                        log_event('report_skipped', folder=folder.name, pdf=krm_pdf.name)
+                        progress.update(pdf_task, advance=1)
+                        continue
+                    if skip == 'exhausted':
+                        error = f"Deneme sınırı ({journal.max_attempts}) doldu, atlandı"
+                        progress.console.print(f"    [red]✗ {krm_pdf.name}: {error}[/red]")
+                        failures.append({'folder': folder.name, 'pdf': krm_pdf.name, 'errors': [error]})
+                        log_event('report_exhausted', logging.ERROR, folder=folder.name, pdf=krm_pdf.name)
+                        progress.update(pdf_task, advance=1)
+                        continue
+
+                if unit_key is not None:
+                    journal.record(unit_key, 'started', folder=folder.name, pdf=krm_pdf.name)
+
                 # Live status devre dışı - Progress bar ile çakışıyor (Rich limitation)
                 # show_live = (folder_idx == 1 and pdf_idx == 1)
-                result = analyze_report_with_live_status(krm_pdf, findeks_pdf, show_live=False)
+                if analyzer is not None:
+                    result = analyzer.analyze(krm_pdf, analysis_findeks)
+                else:
+                    result = analyze_report_with_live_status(krm_pdf, analysis_findeks, show_live=False)
+                drop_pdf_buffers(krm_pdf)
                 folder_results.append(result)
-                all_results.append({
-                    'folder': folder.name,
-                    'result': result
-                })
+                totals.add(result)
 
+                outputs: List[Path] = []
                 if result['success']:
-                    # PDF oluştur
-                    try:
-                        pdf_output = generate_pdf(result, output_dir)
-                        progress.console.print(f"    [green]✓ PDF:[/green] {pdf_output.name}")
-                    except Exception as e:
-                        import traceback
-                        progress.console.print(f"    [red]✗ PDF oluşturma hatası:[/red] {e}")
-                        progress.console.print(f"    [dim]{traceback.format_exc()}[/dim]")
-
-                    # Excel oluştur (Findeks bağımsız - sadece KRM verisi yeterli)
-                    try:
-                        excel_output = generate_excel(result, output_dir)
-                        progress.console.print(f"    [green]✓ Excel:[/green] {excel_output.name}")
-                    except Exception as e:
-                        import traceback
-                        progress.console.print(f"    [red]✗ Excel oluşturma hatası:[/red] {e}")
-                        progress.console.print(f"    [dim]{traceback.format_exc()}[/dim]")
+                    record_history(result)
+                    outputs, output_errors = write_report_outputs(result, output_dir)
+                    for output in outputs:
+                        label = 'PDF' if output.suffix == '.pdf' else 'Excel'
+                        progress.console.print(f"    [green]✓ {label}:[/green] {output.name}")
+                    for error in output_errors:
+                        progress.console.print(f"    [red]✗ {error}[/red]")
                 else:
+                    output_errors = [result.get('error', 'Hata')]
                     progress.console.print(f"    [red]✗ {krm_pdf.name}: {result.get('error', 'Hata')}[/red]")
 
+                if output_errors:
+                    failures.append({'folder': folder.name, 'pdf': krm_pdf.name, 'errors': output_errors})
+
+                log_event(
+                    'report_done' if not output_errors else 'report_failed',
+                    logging.INFO if not output_errors else logging.ERROR,
+                    folder=folder.name,
+                    pdf=krm_pdf.name,
+                    success=result['success'],
+                    outputs=[o.name for o in outputs],
+                    errors=output_errors,
+                    critical=sum(1 for a in result.get('anomalies', []) if a['severity'] == 'CRITICAL'),
+                    warning=sum(1 for a in result.get('anomalies', []) if a['severity'] == 'WARNING'),
+                    malformed=result.get('parse_issues', {}),
+                )
+
+                if analysis_findeks is None and findeks_pdf and result['success']:
+                    # Findeks eşleştirmesi bekleniyor: kayıt/akış/portföy ikinci aşamada
+                    ocr_scheduler.defer(folder.name, {
+                        'result': result, 'unit_key': unit_key, 'krm_pdf': krm_pdf, 'outputs': outputs
+                    })
+                    progress.update(pdf_task, advance=1)
+                    continue
+
+                if unit_key is not None:
+                    journal.record(
+                        unit_key, 'failed' if output_errors else 'done',
+                        folder=folder.name, pdf=krm_pdf.name,
+                        outputs=[o.name for o in outputs], errors=output_errors
+                    )
+                if stream is not None:
+                    stream.write(folder.name, result, outputs)
+                if args.portfolio and result['success']:
+                    portfolio_entries.append({'folder': folder.name, 'result': compact_result(result)})
+
                 # PDF progress'i güncelle
                 progress.update(pdf_task, advance=1)
 
@@ -2510,53 +7985,163 @@ def main() -> None:
             progress.update(pdf_task, visible=False)
             progress.remove_task(pdf_task)
 
-            # Bu klasör için özet
-            progress.console.print(f"\n[bold]📊 {folder.name} - Özet:[/bold]")
-            for result in folder_results:
-                if result['success']:
-                    print_single_report(result)
+            # Bu klasör için özet (batch modunda terminal özeti render edilmez)
+            if not batch:
+                progress.console.print(f"\n[bold]📊 {folder.name} - Özet:[/bold]")
+                for result in folder_results:
+                    if result['success']:
+                        print_single_report(result)
+
+            # Aynı firmanın ardışık raporları arasındaki fark (zaten parse edilmiş sonuçlardan)
+            if args.diff:
+                for old_result, new_result in pair_successive_reports(folder_results):
+                    diff = diff_reports(old_result, new_result)
+                    try:
+                        diff_pdf = generate_diff_pdf(diff, output_dir)
+                        total_diffs += 1
+                        print_diff_summary(diff)
+                        progress.console.print(f"    [green]✓ Fark PDF:[/green] {diff_pdf.name}")
+                        log_event('diff_done', folder=folder.name, old_pdf=diff['old_pdf'], new_pdf=diff['new_pdf'],
+                                  output=diff_pdf.name, changes=diff_change_count(diff))
+                    except Exception as e:
+                        progress.console.print(f"    [red]✗ Fark PDF oluşturma hatası: {e}[/red]")
+                        failures.append({'folder': folder.name, 'pdf': diff['new_pdf'], 'errors': [f"Fark PDF oluşturma hatası: {e}"]})
 
             # Klasör progress'i güncelle
             progress.update(folder_task, advance=1)
 
+            # Klasör sonuçlarını ve PDF kopyalarını bırak, bellek sınırını kontrol et
+            del folder_results
+            drop_pdf_buffers(*pdfs_dict['krm'], *pdfs_dict['findeks'])
+            if ocr_scheduler is not None:
+                # OCR'ı bu arada biten klasörleri hemen tamamla (bekleyen sonuçlar birikmesin)
+                for job, findeks_data, ocr_error in ocr_scheduler.completed(wait=False):
+                    finish_ocr_job(job, findeks_data, ocr_error)
+            if stopped_early or memory_exceeded(folder.name):
+                stopped_early = True
+                break
+
         # Ana task tamamlandı
         progress.update(folder_task, description="[bold green]✓ Tüm klasörler tamamlandı!")
 
+        # İkinci aşama: OCR'ı biten klasörlerin raporlarını Findeks eşleştirmesiyle güncelle
+        if ocr_scheduler is not None:
+            if stopped_early:
+                ocr_scheduler.cancel()
+            ocr_task = progress.add_task("[magenta]🔗 Findeks eşleştirmeleri...", total=ocr_scheduler.pending_count())
+
+            for job, findeks_data, ocr_error in ocr_scheduler.completed():
+                finish_ocr_job(job, findeks_data, ocr_error, ocr_task)
+
+            ocr_scheduler.shutdown()
+
     # Genel özet
     console.print(f"\n[bold cyan]{'='*80}[/bold cyan]")
     console.print(f"[bold]GENEL ÖZET - TÜM KLASÖRLER[/bold]")
     console.print(f"[bold cyan]{'='*80}[/bold cyan]\n")
 
-    successful_results = [r['result'] for r in all_results if r['result']['success']]
+    journal.close()
+    if stream is not None:
+        stream.close()
+    if analyzer is not None:
+        analyzer.close()
 
     total_folders = len(folders_with_reports)
-    total_reports = len(all_results)
-    total_active = sum(len(r['active_sources']) for r in successful_results)
-    total_passive = sum(len(r['passive_sources']) for r in successful_results)
-    total_critical = sum(len([a for a in r['anomalies'] if a['severity'] == 'CRITICAL']) for r in successful_results)
-    total_warnings = sum(len([a for a in r['anomalies'] if a['severity'] == 'WARNING']) for r in successful_results)
+    total_reports = totals.reports
+    total_active = totals.active
+    total_passive = totals.passive
+    total_critical = totals.critical
+    total_warnings = totals.warnings
 
     console.print(f"İşlenen Klasör Sayısı: [cyan]{total_folders}[/cyan]")
     console.print(f"Analiz Edilen Rapor: [cyan]{total_reports}[/cyan]")
+    if resumed:
+        console.print(f"Önceki Çalıştırmadan Atlanan: [dim]{resumed}[/dim]")
     console.print(f"Toplam Aktif Kaynak: [green]{total_active}[/green]")
     console.print(f"Toplam Pasif Kaynak: [dim]{total_passive}[/dim]")
     console.print(f"Toplam Kritik Sorun: [red]{total_critical}[/red]")
     console.print(f"Toplam Uyarı: [yellow]{total_warnings}[/yellow]")
+    if totals.malformed:
+        console.print(f"Okunamayan Hücre: [yellow]{totals.malformed}[/yellow] [dim](0 / boş kabul edildi)[/dim]")
 
     if total_critical == 0 and total_warnings == 0:
         console.print("\n[bold green]🎉 Tüm raporlar temiz![/bold green]")
 
     console.print(f"\n[green]✓ Tüm PDF ve Excel raporlar ilgili klasörlerdeki output/ dizinlerine kaydedildi[/green]")
 
+    # Portföy PDF'i (tüm başarılı raporlar tek dokümanda)
+    portfolio_path = None
+    if args.portfolio:
+        if portfolio_entries:
+            try:
+                portfolio_name = f"KRM_Portfoy_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf"
+                portfolio_path = generate_portfolio_pdf(portfolio_entries, ensure_output_dir() / portfolio_name)
+                console.print(f"[green]✓ Portföy PDF:[/green] {portfolio_path}")
+            except Exception as e:
+                console.print(f"[red]✗ Portföy PDF oluşturma hatası:[/red] {e}")
+                failures.append({'folder': None, 'pdf': None, 'errors': [f"Portföy PDF oluşturma hatası: {e}"]})
+
+    exit_code = EXIT_FAILURES if failures else EXIT_OK
+
+    if batch:
+        summary = {
+            'status': 'failed' if failures else 'ok',
+            'folders': total_folders,
+            'reports': total_reports,
+            'successful': totals.successful,
+            'failed': len(failures),
+            'active_sources': total_active,
+            'passive_sources': total_passive,
+            'critical': total_critical,
+            'warnings': total_warnings,
+            'malformed_values': totals.malformed,
+            'portfolio': portfolio_path,
+            'failures': failures,
+            'rules_version': rules.version,
+            'diffs': total_diffs,
+            'stopped_early': stopped_early,
+            'resumed_skipped': resumed,
+            'worker_recycled': analyzer.recycled if analyzer is not None else 0,
+            'peak_rss_mb': round(memory_guard.peak_mb, 1),
+            'duration_sec': round(time.perf_counter() - run_started, 2),
+        }
+        log_event('run_finished', exit_code=exit_code)
+        print(json.dumps(summary, ensure_ascii=False, default=json_default))
+
+    return exit_code
+
 if __name__ == "__main__":
+    # PyInstaller EXE'de process pool worker'ları için gerekli
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    cli_args = parse_args()
+    exit_code = EXIT_FAILURES
+    profiler = None
+    if cli_args.profile or cli_args.profile_memory:
+        profiler = RunProfiler(get_base_dir() / PROFILE_DIRNAME, memory=cli_args.profile_memory, top_n=cli_args.profile_top)
+        cli_args.profile = True
+        profiler.start()
     try:
-        main()
+        exit_code = main(cli_args)
     except Exception as e:
+        import traceback
+        if cli_args.batch:
+            log_event('run_crashed', logging.CRITICAL, error=str(e), traceback=traceback.format_exc())
         console.print(f"\n[bold red]HATA:[/bold red] {str(e)}")
         console.print("\n[yellow]Detaylar:[/yellow]")
-        import traceback
         console.print(traceback.format_exc())
     finally:
-        # EXE'de hızla kapanmasını engelle
-        console.print("\n[dim]Çıkmak için Enter tuşuna basın...[/dim]")
-        input()
+        if profiler is not None:
+            try:
+                profiler.finish()
+            except Exception as e:
+                console.print(f"[red]✗ Profil yazılamadı: {e}[/red]")
+        close_history_store()
+        close_ocr_backend()
+        close_logo_table()
+        # EXE'de hızla kapanmasını engelle (batch modunda bekleme yok)
+        if not cli_args.batch:
+            console.print("\n[dim]Çıkmak için Enter tuşuna basın...[/dim]")
+            input()
+    sys.exit(exit_code)